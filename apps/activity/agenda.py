@@ -0,0 +1,254 @@
+"""
+The agenda of a user: the activities whose `date` falls in a window of days.
+
+The window is read with a range on `Activity.date`, served by the
+`(owner, date, id)` index, so its cost depends on the activities in the window
+and not on the size of the study plan. The same rows feed the JSON agenda and
+the iCalendar (RFC 5545) feed, which is streamed one event at a time.
+"""
+
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as datetime_timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.db.models import Max, QuerySet
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from apps.activity.models import Activity
+from apps.user.models import User
+from on_way_study.conditional import LIST_VALIDATORS
+
+AGENDA_DAYS = 7
+FEED_DAYS = 60
+FEED_PAST_DAYS = 7
+MAX_DAYS = 366
+
+AGENDA_FIELDS = (
+    "id",
+    "name",
+    "status",
+    "weight",
+    "result",
+    "date",
+    "created_at",
+    "updated_at",
+    "discipline_id",
+    "discipline__name",
+    "discipline__curso_id",
+    "discipline__curso__name",
+    "discipline__curso__acronym",
+)
+AGENDA_VALIDATORS = {
+    **LIST_VALIDATORS,
+    "names_modified": Max(
+        Greatest(
+            Coalesce("discipline__updated_at", "discipline__created_at"),
+            Coalesce("discipline__curso__updated_at", "discipline__curso__created_at"),
+        )
+    ),
+}
+
+ICS_LINE_OCTETS = 75
+ICS_UID_DOMAIN = "on-way-study"
+
+
+def get_agenda_window(
+    query_params, days: int = AGENDA_DAYS, past_days: int = 0
+) -> Tuple[datetime, datetime]:
+    """
+    Reads the window of the agenda from the `start` and `days` query parameters.
+
+    Both ends are midnights in the current timezone, so the window of a day does
+    not move while the day lasts and a day of the window is a calendar day.
+
+    Args:
+        query_params: The query parameters of the request.
+        days: The number of days when `days` is not given.
+        past_days: How many days before today the window starts when `start`
+            is not given.
+
+    Raises:
+        ValidationError: If `start` is not a date or `days` is not between 1
+            and `MAX_DAYS`.
+
+    Returns:
+        The start (inclusive) and the end (exclusive) of the window.
+    """
+    start = query_params.get("start")
+
+    try:
+        first_day = parse_date(start) if start else None
+    except ValueError:
+        first_day = None
+
+    if start and first_day is None:
+        raise ValidationError({"start": "A valid date is required."})
+
+    if first_day is None:
+        first_day = timezone.localdate() - timedelta(days=past_days)
+
+    value = query_params.get("days", str(days))
+
+    if not value.isdigit() or not 1 <= int(value) <= MAX_DAYS:
+        raise ValidationError({"days": f"The days must be between 1 and {MAX_DAYS}."})
+
+    return _midnight(first_day), _midnight(first_day + timedelta(days=int(value)))
+
+
+def get_agenda_queryset(user: User, start: datetime, end: datetime) -> QuerySet:
+    """Returns the user's activities dated in `[start, end)`."""
+    return Activity.objects.filter(owner=user, date__gte=start, date__lt=end)
+
+
+def get_agenda_validators(queryset: QuerySet) -> Tuple[int, Optional[datetime]]:
+    """
+    Returns the count and the latest modification of the agenda, in one query.
+
+    Renaming a course or a discipline changes the agenda too, so their
+    modification times are part of the latest modification.
+    """
+    summary = queryset.aggregate(**AGENDA_VALIDATORS)
+    modified = [
+        value
+        for value in (summary["last_modified"], summary["names_modified"])
+        if value is not None
+    ]
+
+    return summary["count"], max(modified, default=None)
+
+
+def iter_agenda_rows(queryset: QuerySet, chunk_size: int = 500) -> Iterator[dict]:
+    """Yields the activities of the agenda, by date, with their course and discipline."""
+    rows = queryset.order_by("date", "id").values(*AGENDA_FIELDS)
+
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def group_agenda_by_day(rows: Iterator[dict]) -> List[Dict[str, object]]:
+    """
+    Groups the agenda rows by their local day.
+
+    Only the days with activities are listed.
+
+    Returns:
+        A list of `{"date": ..., "activities": [...]}`, by date.
+    """
+    days = []
+
+    for row in rows:
+        day = timezone.localtime(row["date"]).date()
+
+        if not days or days[-1]["date"] != day:
+            days.append({"date": day, "activities": []})
+
+        days[-1]["activities"].append(
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "status": row["status"],
+                "weight": _decimal(row["weight"]),
+                "result": _decimal(row["result"]),
+                "date": timezone.localtime(row["date"]),
+                "discipline": {
+                    "id": row["discipline_id"],
+                    "name": row["discipline__name"],
+                },
+                "course": {
+                    "id": row["discipline__curso_id"],
+                    "name": row["discipline__curso__name"],
+                    "acronym": row["discipline__curso__acronym"],
+                },
+            }
+        )
+
+    return days
+
+
+def iter_ics(user: User, rows: Iterator[dict]) -> Iterator[str]:
+    """
+    Yields the agenda as an iCalendar document, one event per chunk.
+
+    Every activity is an event at its `date` whose UID only depends on the
+    activity, so calendar apps update the events in place when they poll.
+
+    Args:
+        user: The owner of the agenda.
+        rows: The rows of `iter_agenda_rows`.
+    """
+    name = f"On Way Study - {user.nickname}"
+    yield _ics_lines(
+        [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//On Way Study//Agenda//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_ics_text(name)}",
+        ]
+    )
+
+    for row in rows:
+        course = row["discipline__curso__acronym"] or row["discipline__curso__name"]
+        description = f"{course} - {row['discipline__name']}"
+        yield _ics_lines(
+            [
+                "BEGIN:VEVENT",
+                f"UID:activity-{row['id']}@{ICS_UID_DOMAIN}",
+                f"DTSTAMP:{_ics_datetime(row['updated_at'] or row['created_at'])}",
+                f"DTSTART:{_ics_datetime(row['date'])}",
+                f"SUMMARY:{_ics_text(row['name'])}",
+                f"DESCRIPTION:{_ics_text(description)}",
+                f"CATEGORIES:{_ics_text(course)}",
+                "END:VEVENT",
+            ]
+        )
+
+    yield _ics_lines(["END:VCALENDAR"])
+
+
+def _midnight(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _decimal(value: Optional[Decimal]) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _ics_datetime(value: datetime) -> str:
+    return value.astimezone(datetime_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ics_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _ics_lines(lines: List[str]) -> str:
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def _fold(line: str) -> str:
+    """Folds a content line at 75 octets without splitting a UTF-8 character."""
+    parts = []
+    octets = 0
+    limit = ICS_LINE_OCTETS
+
+    for char in line:
+        size = len(char.encode())
+
+        if octets + size > limit:
+            parts.append("\r\n ")
+            octets = 0
+            limit = ICS_LINE_OCTETS - 1
+
+        parts.append(char)
+        octets += size
+
+    return "".join(parts)
@@ -0,0 +1,96 @@
+from datetime import datetime, time
+from typing import Dict
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from apps.activity.models import Activity
+
+ACTIVITY_ORDERINGS = {
+    "created_at": ("created_at", "id"),
+    "-created_at": ("-created_at", "-id"),
+    "date": ("date", "id"),
+    "-date": ("-date", "-id"),
+}
+
+
+class ActivityFilterBackend(BaseFilterBackend):
+    """
+    Filters the activities by the query parameters of the request.
+
+    Every combination of the filters is served by an index of `Activity` (see
+    `check_activity_filter_indexes`), whatever `ordering` the page uses.
+
+    Query parameters:
+        status: One or more statuses, comma separated, e.g. `PENDING,IN_PROGRESS`.
+        date_after: Activities whose `date` is at or after this date or datetime.
+        date_before: Activities whose `date` is before this date or datetime.
+        discipline: The id of the discipline.
+        course: The id of the course.
+
+    A date without a time means midnight in the current timezone, so
+    `date_after=2026-10-12&date_before=2026-10-19` is the week of October 12th.
+    """
+
+    DATE_FILTERS = {"date_after": "date__gte", "date_before": "date__lt"}
+    ID_FILTERS = {"discipline": "discipline_id", "course": "discipline__curso_id"}
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.filter(**self.get_filters(request.query_params))
+
+    def get_filters(self, query_params) -> Dict[str, object]:
+        """
+        Reads the filters of the query parameters.
+
+        Raises:
+            ValidationError: If a filter value is invalid.
+
+        Returns:
+            The keyword arguments of the `filter()` call.
+        """
+        filters = {}
+        status = query_params.get("status")
+
+        if status:
+            statuses = status.split(",")
+            invalid = [s for s in statuses if s not in Activity.StatusChoices.values]
+
+            if invalid:
+                raise ValidationError(
+                    {"status": f'"{invalid[0]}" is not a valid choice.'}
+                )
+
+            filters["status__in"] = statuses
+
+        for param, lookup in self.ID_FILTERS.items():
+            value = query_params.get(param)
+
+            if value is not None:
+                if not value.isdigit():
+                    raise ValidationError({param: "A valid integer is required."})
+                filters[lookup] = int(value)
+
+        for param, lookup in self.DATE_FILTERS.items():
+            value = query_params.get(param)
+
+            if value is not None:
+                filters[lookup] = self._parse_datetime(param, value)
+
+        return filters
+
+    def _parse_datetime(self, param: str, value: str) -> datetime:
+        try:
+            parsed = parse_datetime(value)
+
+            if parsed is None and parse_date(value) is not None:
+                parsed = datetime.combine(parse_date(value), time.min)
+        except ValueError:
+            parsed = None
+
+        if parsed is None:
+            raise ValidationError({param: "A valid date or datetime is required."})
+
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+
+        return parsed
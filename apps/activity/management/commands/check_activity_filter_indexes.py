@@ -0,0 +1,106 @@
+import re
+from datetime import timedelta
+from itertools import combinations
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils import timezone
+from apps.activity.filters import ACTIVITY_ORDERINGS, ActivityFilterBackend
+from apps.activity.models import Activity
+from on_way_study.conditional import LIST_VALIDATORS
+
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (?!CONSTANT ROW)")
+INDEX_NAME = re.compile(
+    r"(?:USING (?:COVERING )?INDEX|Index (?:Only )?Scan(?: Backward)? using"
+    r"|Bitmap Index Scan on) (\w+)"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN on the activity list queries for every combination of the "
+        "filters and orderings, and fails when one of them scans a whole table."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ("postgresql", "sqlite"):
+            raise CommandError(f"EXPLAIN is not checked on {connection.vendor}.")
+
+        failures = []
+
+        for params, ordering in self.combinations():
+            filters = ActivityFilterBackend().get_filters(params)
+            queryset = Activity.objects.filter(owner_id=1, **filters)
+            queries = {
+                "page": queryset.order_by(*ordering)[:51],
+                "validators": queryset.values("owner_id").annotate(**LIST_VALIDATORS),
+            }
+
+            for name, query in queries.items():
+                plan = self.explain(query)
+                label = (
+                    f"{'&'.join(params) or '(no filter)'} ordering={ordering[0]} {name}"
+                )
+                indexes = ", ".join(dict.fromkeys(INDEX_NAME.findall(plan)))
+
+                if self.scans_table(plan):
+                    failures.append(f"{label} scans a table:\n{plan}")
+                    self.stdout.write(self.style.ERROR(f"{label:80} full scan"))
+                else:
+                    self.stdout.write(f"{label:80} {indexes}")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+
+        self.stdout.write(self.style.SUCCESS("Every activity filter uses an index."))
+
+    def combinations(self):
+        """
+        Yields every combination of the filters with every ordering field.
+
+        The descending orderings are left out: they read the same indexes backwards.
+        """
+        now = timezone.now()
+        values = {
+            "status": "PENDING",
+            "date_after": (now - timedelta(days=7)).isoformat(),
+            "date_before": now.isoformat(),
+            "discipline": "1",
+            "course": "1",
+        }
+        orderings = [
+            fields
+            for fields in ACTIVITY_ORDERINGS.values()
+            if not fields[0].startswith("-")
+        ]
+
+        for size in range(len(values) + 1):
+            for names in combinations(values, size):
+                params = QueryDict(mutable=True)
+                params.update({name: values[name] for name in names})
+
+                for ordering in orderings:
+                    yield params, ordering
+
+    def explain(self, queryset) -> str:
+        """
+        Returns the plan of the query.
+
+        On PostgreSQL sequential scans are disabled first, so that a sequential
+        scan in the plan means that no index can serve the query, rather than
+        that the table is too small for an index to pay off.
+        """
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+            return queryset.explain()
+
+    def scans_table(self, plan: str) -> bool:
+        if connection.vendor == "postgresql":
+            return "Seq Scan" in plan
+
+        return bool(SQLITE_FULL_SCAN.search(plan))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from apps.activity.summaries import recompute_grade_summaries
+from apps.discipline.models import Discipline
+
+
+class Command(BaseCommand):
+    help = "Recomputes the discipline and course grade summaries from the activities."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--discipline",
+            type=int,
+            action="append",
+            dest="disciplines",
+            help="Only recompute this discipline id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        disciplines = None
+
+        if options["disciplines"]:
+            disciplines = Discipline.objects.filter(pk__in=options["disciplines"])
+
+        total = recompute_grade_summaries(disciplines)
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {total} discipline(s)."))
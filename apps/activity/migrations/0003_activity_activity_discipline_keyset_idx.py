@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0002_activity_created_at_activity_updated_at"),
+        ("discipline", "0002_discipline_created_at_discipline_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["discipline", "created_at", "id"],
+                name="activity_discipline_keyset_idx",
+            ),
+        ),
+    ]
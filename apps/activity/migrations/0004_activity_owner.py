@@ -0,0 +1,67 @@
+from django.db import migrations, models, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+import django.db.models.deletion
+from on_way_study.migration_operations import AlterFieldNotNull
+
+BATCH_SIZE = 5000
+
+
+def backfill_activity_owner(apps, schema_editor):
+    """
+    Copies the owner from the parent discipline in primary key ranges of BATCH_SIZE rows.
+
+    Each batch is committed on its own, so the table is never locked as a whole.
+    """
+    Activity = apps.get_model("activity", "Activity")
+    Discipline = apps.get_model("discipline", "Discipline")
+    owner = Subquery(
+        Discipline.objects.filter(pk=OuterRef("discipline_id")).values("owner_id")[:1]
+    )
+    bounds = Activity.objects.aggregate(low=Min("id"), high=Max("id"))
+
+    if bounds["low"] is None:
+        return
+
+    for start in range(bounds["low"], bounds["high"] + 1, BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Activity.objects.filter(
+                id__gte=start, id__lt=start + BATCH_SIZE, owner__isnull=True
+            ).update(owner_id=owner)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("activity", "0003_activity_activity_discipline_keyset_idx"),
+        ("discipline", "0004_discipline_owner"),
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activity",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="activities",
+                to="user.user",
+            ),
+        ),
+        migrations.RunPython(backfill_activity_owner, migrations.RunPython.noop),
+        AlterFieldNotNull(
+            model_name="activity",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="activities",
+                to="user.user",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+from on_way_study.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("activity", "0004_activity_owner"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="activity",
+            index=models.Index(
+                fields=["owner", "created_at", "id"], name="activity_owner_keyset_idx"
+            ),
+        ),
+    ]
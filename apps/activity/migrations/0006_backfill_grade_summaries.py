@@ -0,0 +1,79 @@
+from django.db import migrations
+from django.db.models import Count, DecimalField, F, Q, Sum
+
+BATCH_SIZE = 1000
+SUMMARY_FIELDS = (
+    "total_weight",
+    "graded_weight",
+    "weighted_result_sum",
+    "completed_count",
+    "pending_count",
+)
+
+
+def _store(model, rows, key):
+    batch = []
+
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        instance = model(pk=row[key])
+
+        for field in SUMMARY_FIELDS:
+            setattr(instance, field, row[field] or 0)
+
+        batch.append(instance)
+
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_update(batch, SUMMARY_FIELDS)
+            batch = []
+
+    if batch:
+        model.objects.bulk_update(batch, SUMMARY_FIELDS)
+
+
+def backfill_grade_summaries(apps, schema_editor):
+    Activity = apps.get_model("activity", "Activity")
+    Discipline = apps.get_model("discipline", "Discipline")
+    Course = apps.get_model("course", "Course")
+    completed = Q(status="COMPLETED")
+
+    _store(
+        Discipline,
+        Activity.objects.values("discipline")
+        .annotate(
+            total_weight=Sum("weight"),
+            graded_weight=Sum(
+                "weight", filter=Q(weight__isnull=False, result__isnull=False)
+            ),
+            weighted_result_sum=Sum(
+                F("weight") * F("result"),
+                output_field=DecimalField(max_digits=16, decimal_places=4),
+            ),
+            completed_count=Count("id", filter=completed),
+            pending_count=Count("id", filter=~completed),
+        )
+        .order_by(),
+        "discipline",
+    )
+    _store(
+        Course,
+        Discipline.objects.values("curso")
+        .annotate(**{field: Sum(field) for field in SUMMARY_FIELDS})
+        .order_by(),
+        "curso",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0005_activity_owner_keyset_idx"),
+        ("course", "0007_course_completed_count_course_graded_weight_and_more"),
+        (
+            "discipline",
+            "0006_discipline_completed_count_discipline_graded_weight_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_grade_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:47
+
+from django.db import migrations, models
+from on_way_study.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("activity", "0006_backfill_grade_summaries"),
+        (
+            "discipline",
+            "0006_discipline_completed_count_discipline_graded_weight_and_more",
+        ),
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="activity",
+            index=models.Index(
+                fields=["owner", "date", "id"], name="activity_owner_date_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="activity",
+            index=models.Index(
+                fields=["owner", "status", "date"],
+                name="activity_owner_status_date_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="activity",
+            index=models.Index(
+                fields=["discipline", "date", "id"], name="activity_discipline_date_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="activity",
+            index=models.Index(
+                fields=["discipline", "status", "created_at", "id"],
+                name="activity_discipline_status_idx",
+            ),
+        ),
+    ]
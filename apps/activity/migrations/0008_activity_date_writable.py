@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0007_activity_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="activity",
+            name="date",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
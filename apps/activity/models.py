@@ -1,7 +1,15 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from django.db import models, transaction
+from django.utils import timezone
+from apps.course.models import Course
 from apps.discipline.models import Discipline
+from apps.user.models import User
 from environment import get_timezone
 
+GradeState = Tuple[int, Dict[str, object]]
+
 
 class Activity(models.Model):
     class StatusChoices(models.TextChoices):
@@ -15,16 +23,158 @@ class Activity(models.Model):
     )
     weight = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     result = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(default=timezone.now)
     discipline = models.ForeignKey(
         Discipline, on_delete=models.CASCADE, related_name="activities"
     )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="activities",
+        db_index=False,
+        editable=False,
+    )
     created_at = models.DateTimeField(blank=True, default=get_timezone)
     updated_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = "activity"
         managed = True
+        indexes = [
+            models.Index(
+                fields=["discipline", "created_at", "id"],
+                name="activity_discipline_keyset_idx",
+            ),
+            models.Index(
+                fields=["owner", "created_at", "id"],
+                name="activity_owner_keyset_idx",
+            ),
+            models.Index(
+                fields=["owner", "date", "id"], name="activity_owner_date_idx"
+            ),
+            models.Index(
+                fields=["owner", "status", "date"],
+                name="activity_owner_status_date_idx",
+            ),
+            models.Index(
+                fields=["discipline", "date", "id"],
+                name="activity_discipline_date_idx",
+            ),
+            models.Index(
+                fields=["discipline", "status", "created_at", "id"],
+                name="activity_discipline_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        if not instance.get_deferred_fields() & {
+            "status",
+            "weight",
+            "result",
+            "discipline_id",
+        }:
+            instance._loaded_grade = instance.grade_state()
+
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Keeps the denormalized `owner` equal to the discipline owner and applies the
+        change of this activity's grade contribution to its discipline and course.
+        """
+        self.owner_id = self.discipline.owner_id
+        previous = None if self._state.adding else self.loaded_grade_state()
+        current = self.grade_state()
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "owner"}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.apply_grade_changes([(previous, current)])
+
+        self._loaded_grade = current
+
+    def delete(self, *args, **kwargs):
+        """Deletes the activity and removes its grade contribution."""
+        previous = self.loaded_grade_state()
+
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            self.apply_grade_changes([(previous, None)])
+
+        return deleted
+
+    def grade_contribution(self) -> Dict[str, object]:
+        """
+        Returns what this activity adds to the grade summary of its discipline and course.
+
+        Returns:
+            A dictionary with a value for each field of `GradeSummary.SUMMARY_FIELDS`.
+        """
+        weight = Decimal(self.weight) if self.weight is not None else None
+        result = Decimal(self.result) if self.result is not None else None
+        graded = weight is not None and result is not None
+        completed = self.status == self.StatusChoices.COMPLETED
+
+        return {
+            "total_weight": weight or Decimal(0),
+            "graded_weight": weight if graded else Decimal(0),
+            "weighted_result_sum": weight * result if graded else Decimal(0),
+            "completed_count": int(completed),
+            "pending_count": int(not completed),
+        }
+
+    def grade_state(self) -> GradeState:
+        """Returns the discipline this activity counts for and its grade contribution."""
+        return (self.discipline_id, self.grade_contribution())
+
+    def loaded_grade_state(self) -> GradeState:
+        """
+        Returns the grade state this activity had when it was read from the database.
+
+        It is captured by `from_db`, and only re-read when the instance was loaded
+        with deferred fields.
+        """
+        if hasattr(self, "_loaded_grade"):
+            return self._loaded_grade
+
+        return Activity.objects.get(pk=self.pk).grade_state()
+
+    @staticmethod
+    def apply_grade_changes(
+        changes: Iterable[Tuple[Optional[GradeState], Optional[GradeState]]],
+    ):
+        """
+        Applies grade state changes to the discipline and course summaries.
+
+        The deltas are summed per discipline first, so a batch of changes costs two
+        UPDATE statements per discipline involved, whatever the number of activities.
+
+        Args:
+            changes: Pairs of (previous, current) grade states. `previous` is None
+                for a created activity and `current` is None for a deleted one.
+        """
+        deltas = defaultdict(lambda: defaultdict(int))
+
+        for previous, current in changes:
+            for state, sign in ((previous, -1), (current, 1)):
+                if state is None:
+                    continue
+
+                for field, value in state[1].items():
+                    deltas[state[0]][field] += sign * value
+
+        for discipline_id, values in deltas.items():
+            Discipline.add_to_summaries(
+                Discipline.objects.filter(pk=discipline_id), values
+            )
+            Course.add_to_summaries(
+                Course.objects.filter(disciplines__id=discipline_id), values
+            )
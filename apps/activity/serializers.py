@@ -1,9 +1,169 @@
-from rest_framework.serializers import ModelSerializer
+from django.db import transaction
+from rest_framework.serializers import (
+    CharField,
+    DateTimeField,
+    DecimalField,
+    IntegerField,
+    ListSerializer,
+    ModelSerializer,
+    Serializer,
+    ValidationError,
+)
 from apps.activity.models import Activity
+from apps.discipline.models import Discipline
+from environment import get_modification_time
+from on_way_study.metrics import TimedSerializerMixin
+from on_way_study.response_cache import ResponseCacheInvalidationMixin
 
 
-class ActivitySerializer(ModelSerializer):
+class ActivitySerializer(
+    TimedSerializerMixin, ResponseCacheInvalidationMixin, ModelSerializer
+):
 
     class Meta:
         model = Activity
         fields = "__all__"
+        read_only_fields = ["created_at", "updated_at"]
+
+    def get_fields(self):
+        """
+        Restricts the `discipline` choices to the disciplines owned by the request user.
+
+        The ownership is proven by the same indexed query that resolves the
+        discipline primary key, so no extra query is needed to check it.
+        """
+        fields = super().get_fields()
+        request = self.context.get("request")
+        fields["discipline"].queryset = Discipline.objects.filter(
+            owner=getattr(request, "user", None)
+        )
+
+        return fields
+
+    def create(self, validated_data):
+        validated_data["updated_at"] = get_modification_time()
+
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data["updated_at"] = get_modification_time()
+
+        return super().update(instance, validated_data)
+
+
+class ActivityBulkListSerializer(ResponseCacheInvalidationMixin, ListSerializer):
+    """
+    Writes a validated batch of activities with `bulk_create`/`bulk_update`.
+
+    The whole batch is written in one transaction and the grade summaries receive
+    the summed deltas of the batch, so the number of statements depends on the
+    number of disciplines involved and not on the number of activities.
+    """
+
+    BATCH_SIZE = 1000
+
+    def validate(self, attrs):
+        ids = [item["id"] for item in attrs if "id" in item]
+
+        if len(ids) != len(set(ids)):
+            raise ValidationError("Each activity can only appear once in a batch.")
+
+        return attrs
+
+    def create(self, validated_data):
+        owner_id = self.context["request"].user.pk
+        now = get_modification_time()
+        activities = [
+            Activity(**attrs, owner_id=owner_id, updated_at=now)
+            for attrs in validated_data
+        ]
+
+        with transaction.atomic():
+            activities = Activity.objects.bulk_create(
+                activities, batch_size=self.BATCH_SIZE
+            )
+            Activity.apply_grade_changes(
+                (None, activity.grade_state()) for activity in activities
+            )
+
+        return activities
+
+    def update(self, instance, validated_data):
+        activities = {activity.pk: activity for activity in instance}
+        now = get_modification_time()
+        changes = []
+        fields = {"updated_at"}
+
+        for attrs in validated_data:
+            activity = activities[attrs.pop("id")]
+            previous = activity.loaded_grade_state()
+
+            for attr, value in attrs.items():
+                setattr(activity, attr, value)
+
+            activity.updated_at = now
+            fields.update(attrs)
+            changes.append((previous, activity.grade_state()))
+
+        with transaction.atomic():
+            Activity.objects.bulk_update(
+                activities.values(), fields, batch_size=self.BATCH_SIZE
+            )
+            Activity.apply_grade_changes(changes)
+
+        return list(activities.values())
+
+
+class ActivityBulkSerializer(ModelSerializer):
+    """
+    Item serializer of the bulk endpoints.
+
+    It has the same representation as `ActivitySerializer`, but the disciplines are
+    resolved from the `disciplines` map of the context, preloaded with one query for
+    the whole batch, instead of one query per item.
+    """
+
+    id = IntegerField(required=False)
+    discipline = IntegerField(source="discipline_id")
+
+    class Meta:
+        model = Activity
+        fields = "__all__"
+        read_only_fields = ["created_at", "updated_at"]
+        list_serializer_class = ActivityBulkListSerializer
+
+    def validate_discipline(self, value):
+        if value not in self.context["disciplines"]:
+            raise ValidationError(f'Invalid pk "{value}" - object does not exist.')
+
+        return value
+
+    def validate_id(self, value):
+        if self.parent.instance is not None and value not in self.context["activities"]:
+            raise ValidationError(f'Invalid pk "{value}" - object does not exist.')
+
+        return value
+
+    def validate(self, attrs):
+        if self.parent.instance is not None and "id" not in attrs:
+            raise ValidationError({"id": "This field is required."})
+
+        if self.parent.instance is None:
+            attrs.pop("id", None)
+
+        return attrs
+
+
+class ActivityTreeSerializer(Serializer):
+    """
+    Lean read-only representation of an activity inside a user's study plan tree.
+    """
+
+    id = IntegerField(read_only=True)
+    name = CharField(read_only=True)
+    status = CharField(read_only=True)
+    weight = DecimalField(max_digits=5, decimal_places=2, read_only=True)
+    result = DecimalField(max_digits=5, decimal_places=2, read_only=True)
+    date = DateTimeField(read_only=True)
+    created_at = DateTimeField(read_only=True)
+    updated_at = DateTimeField(read_only=True)
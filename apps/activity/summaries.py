@@ -0,0 +1,99 @@
+from typing import Dict, Optional
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, QuerySet, Sum
+from apps.activity.models import Activity
+from apps.course.models import Course, GradeSummary
+from apps.discipline.models import Discipline
+from environment import get_modification_time
+
+BATCH_SIZE = 1000
+
+_COMPLETED = Q(status=Activity.StatusChoices.COMPLETED)
+_GRADED = Q(weight__isnull=False, result__isnull=False)
+
+ACTIVITY_AGGREGATES = {
+    "total_weight": Sum("weight"),
+    "graded_weight": Sum("weight", filter=_GRADED),
+    "weighted_result_sum": Sum(
+        F("weight") * F("result"),
+        output_field=DecimalField(max_digits=16, decimal_places=4),
+    ),
+    "completed_count": Count("id", filter=_COMPLETED),
+    "pending_count": Count("id", filter=~_COMPLETED),
+}
+
+DISCIPLINE_AGGREGATES = {field: Sum(field) for field in GradeSummary.SUMMARY_FIELDS}
+
+
+def recompute_grade_summaries(disciplines: Optional[QuerySet] = None) -> int:
+    """
+    Rebuilds the grade summaries from scratch with one aggregate query per level.
+
+    The activities are grouped by discipline in a single query and the disciplines
+    are then grouped by course, so the cost does not depend on how many writes
+    happened since the last recompute. It is used after bulk writes that bypass
+    `Activity.save()` and to repair summaries that drifted.
+
+    Args:
+        disciplines: The disciplines to recompute. All of them when omitted.
+
+    Returns:
+        int: The number of disciplines recomputed.
+    """
+    if disciplines is None:
+        disciplines = Discipline.objects.all()
+        courses = Course.objects.all()
+    else:
+        courses = Course.objects.filter(
+            pk__in=disciplines.values("curso_id").distinct()
+        )
+
+    with transaction.atomic():
+        total = disciplines.update(**_zeroes())
+        _store(
+            Discipline,
+            Activity.objects.filter(discipline__in=disciplines)
+            .values("discipline")
+            .annotate(**ACTIVITY_AGGREGATES)
+            .order_by(),
+            "discipline",
+        )
+
+        courses.update(**_zeroes())
+        _store(
+            Course,
+            Discipline.objects.filter(curso__in=courses)
+            .values("curso")
+            .annotate(**DISCIPLINE_AGGREGATES)
+            .order_by(),
+            "curso",
+        )
+
+    return total
+
+
+def _store(model, rows, key: str):
+    """Writes the aggregated rows into the summary columns in batches."""
+    batch = []
+
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        instance = model(pk=row[key])
+
+        for field in GradeSummary.SUMMARY_FIELDS:
+            setattr(instance, field, row[field] or 0)
+
+        batch.append(instance)
+
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_update(batch, GradeSummary.SUMMARY_FIELDS)
+            batch = []
+
+    if batch:
+        model.objects.bulk_update(batch, GradeSummary.SUMMARY_FIELDS)
+
+
+def _zeroes() -> Dict[str, object]:
+    return {
+        **{field: 0 for field in GradeSummary.SUMMARY_FIELDS},
+        "updated_at": get_modification_time(),
+    }
@@ -0,0 +1,400 @@
+from datetime import timedelta
+from datetime import timezone as datetime_timezone
+from unittest import mock
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.activity.filters import ActivityFilterBackend
+from apps.activity.management.commands.check_activity_filter_indexes import (
+    INDEX_NAME,
+    Command,
+)
+from apps.activity.models import Activity
+from apps.activity.summaries import recompute_grade_summaries
+from apps.activity.views import ActivityViewSet
+from apps.course.models import Course, GradeSummary
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+from on_way_study.conditional import LIST_VALIDATORS
+from on_way_study.testing import ApiTestCase, create_study_plan
+from security.tokens import issue_feed_token
+
+
+class ActivityFilterIndexTests(TestCase):
+    """
+    Checks the plans of the activity list queries for every filter combination.
+
+    Each combination of `status`, `date_after`, `date_before`, `discipline` and
+    `course`, with every ordering, must read the page and the list validators
+    through an index of `Activity`.
+    """
+
+    def test_every_filter_combination_uses_an_index(self):
+        command = Command()
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Activity._meta.db_table
+            )
+
+        index_names = {name for name, info in constraints.items() if info["index"]}
+
+        for params, ordering in command.combinations():
+            filters = ActivityFilterBackend().get_filters(params)
+            queryset = Activity.objects.filter(owner_id=1, **filters)
+            queries = {
+                "page": queryset.order_by(*ordering)[:51],
+                "validators": queryset.values("owner_id").annotate(**LIST_VALIDATORS),
+            }
+
+            for name, query in queries.items():
+                with self.subTest(
+                    params=params.urlencode(), ordering=ordering, query=name
+                ):
+                    plan = command.explain(query)
+
+                    self.assertFalse(command.scans_table(plan), plan)
+                    self.assertTrue(
+                        index_names & set(INDEX_NAME.findall(plan)),
+                        f"No index of activity in the plan:\n{plan}",
+                    )
+
+
+class ActivityDateFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(nickname="date-filter", password="x")
+        institution = Institution.objects.create(name="Institution", user=cls.user)
+        course = Course.objects.create(
+            name="Course", acronym="C", semesters=1, instituition=institution
+        )
+        discipline = Discipline.objects.create(name="Discipline", curso=course)
+        cls.next_week = Activity.objects.create(
+            name="Next week",
+            discipline=discipline,
+            date=timezone.now() + timedelta(days=7),
+        )
+
+    def test_date_filters_use_the_activity_date_and_not_its_creation(self):
+        start = timezone.localdate() + timedelta(days=6)
+        params = {
+            "date_after": start.isoformat(),
+            "date_before": (start + timedelta(days=2)).isoformat(),
+        }
+        filters = ActivityFilterBackend().get_filters(params)
+
+        self.assertEqual(
+            [self.next_week], list(Activity.objects.filter(owner=self.user, **filters))
+        )
+
+        filters = ActivityFilterBackend().get_filters(
+            {"date_before": timezone.localdate().isoformat()}
+        )
+
+        self.assertFalse(Activity.objects.filter(owner=self.user, **filters).exists())
+
+
+class ActivityOwnershipTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("activity-owner", activities=3)
+        self.other = create_study_plan("activity-other", activities=3)
+        self.client = self.api_client(self.plan[User])
+
+    def test_list_query_count_does_not_grow_with_the_activities(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/activities/")
+
+        self.assertEqual(3, len(response.json()["results"]))
+        Activity.objects.bulk_create(
+            Activity(
+                name=f"More {i}",
+                discipline=self.plan[Discipline],
+                owner=self.plan[User],
+            )
+            for i in range(20)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/activities/",
+                {"name": "Last", "discipline": self.plan[Discipline].pk},
+            )
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/activities/")
+
+        self.assertEqual(24, len(response.json()["results"]))
+        self.assertEqual(
+            {self.plan[User].pk},
+            {activity["owner"] for activity in response.json()["results"]},
+        )
+
+    def test_retrieve_of_another_user_activity_is_not_found_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/activities/{self.other[Activity].pk}/")
+
+        self.assertEqual(404, response.status_code)
+
+    def test_create_rejects_a_discipline_of_another_user(self):
+        response = self.client.post(
+            "/api/activities/",
+            {"name": "Foreign", "discipline": self.other[Discipline].pk},
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn("discipline", response.json())
+
+
+class ActivityBulkTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("activity-bulk", activities=2)
+        self.other = create_study_plan("activity-bulk-other", activities=1)
+        self.client = self.api_client(self.plan[User])
+        self.second_discipline = Discipline.objects.create(
+            name="Second", curso=self.plan[Course]
+        )
+
+    def item(self, name, discipline=None, **fields):
+        discipline = discipline or self.plan[Discipline]
+        return {"name": name, "discipline": discipline.pk, **fields}
+
+    def send(self, method, data=None, path="/api/activities/bulk/"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(path, data, format="json")
+
+    def errors_by_index(self, response):
+        # DRF 3.18 keys the errors by index, older releases list them in order.
+        errors = response.json()
+
+        if isinstance(errors, list):
+            return {index: error for index, error in enumerate(errors) if error}
+
+        return {int(index): error for index, error in errors.items()}
+
+    def summaries(self):
+        return {
+            (model.__name__, row.pop("pk")): row
+            for model in (Discipline, Course)
+            for row in model.objects.filter(owner=self.plan[User]).values(
+                "pk", *GradeSummary.SUMMARY_FIELDS
+            )
+        }
+
+    def assertSummariesMatchRecompute(self):
+        incremental = self.summaries()
+        recompute_grade_summaries()
+
+        self.assertEqual(self.summaries(), incremental)
+
+    def test_errors_are_reported_by_item_index(self):
+        response = self.send(
+            "post",
+            [
+                self.item("Valid"),
+                {"discipline": self.plan[Discipline].pk},
+                self.item("Foreign", self.other[Discipline]),
+            ],
+        )
+        errors = self.errors_by_index(response)
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual([1, 2], sorted(errors))
+        self.assertEqual(["name"], list(errors[1]))
+        self.assertEqual(["discipline"], list(errors[2]))
+        self.assertEqual(2, Activity.objects.filter(owner=self.plan[User]).count())
+
+    def test_cross_owner_ids_are_rejected(self):
+        response = self.send(
+            "patch", [{"id": self.other[Activity].pk, "name": "Taken over"}]
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn("id", self.errors_by_index(response)[0])
+        self.assertNotEqual(
+            "Taken over", Activity.objects.get(pk=self.other[Activity].pk).name
+        )
+
+    def test_batch_is_rolled_back_when_its_write_fails(self):
+        with mock.patch.object(
+            Activity, "apply_grade_changes", side_effect=RuntimeError("failed")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.send("post", [self.item("First"), self.item("Second")])
+
+        self.assertEqual(2, Activity.objects.filter(owner=self.plan[User]).count())
+
+    def test_batch_size_is_limited(self):
+        with mock.patch.object(ActivityViewSet, "BULK_MAX_ITEMS", 2):
+            response = self.send("post", [self.item(f"A{i}") for i in range(3)])
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(2, Activity.objects.filter(owner=self.plan[User]).count())
+
+    def test_delete_runs_a_single_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send(
+                "delete",
+                path=f"/api/activities/bulk/?discipline={self.plan[Discipline].pk}",
+            )
+
+        deletes = [q for q in queries.captured_queries if q["sql"].startswith("DELETE")]
+
+        self.assertEqual({"deleted": 2}, response.json())
+        self.assertEqual(1, len(deletes))
+        self.assertEqual(1, Activity.objects.count())
+
+    def test_summary_deltas_match_a_recompute(self):
+        created = self.send(
+            "post",
+            [
+                self.item("Graded", status="COMPLETED", weight="2.00", result="7.50"),
+                self.item("Pending", self.second_discipline, weight="3.00"),
+                self.item("Done", self.second_discipline, status="COMPLETED"),
+            ],
+        )
+        self.assertEqual(201, created.status_code)
+        self.assertSummariesMatchRecompute()
+
+        ids = [activity["id"] for activity in created.json()]
+        updated = self.send(
+            "patch",
+            [
+                {"id": ids[0], "result": "9.00"},
+                {"id": ids[1], "status": "COMPLETED", "result": "6.00"},
+                {"id": ids[2], "discipline": self.plan[Discipline].pk},
+            ],
+        )
+        self.assertEqual(200, updated.status_code)
+        self.assertSummariesMatchRecompute()
+
+        deleted = self.send("delete", path="/api/activities/bulk/?status=COMPLETED")
+        self.assertEqual({"deleted": 3}, deleted.json())
+        self.assertSummariesMatchRecompute()
+
+
+class ActivityCalendarTests(ApiTestCase):
+    NAME = "Prova; Cálculo, parte 1\\2 " + "x" * 60
+
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("calendar", activities=0)
+        self.other = create_study_plan("calendar-other", activities=0)
+        self.date = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.activity = Activity.objects.create(
+            name=self.NAME, discipline=self.plan[Discipline], date=self.date
+        )
+        self.past = Activity.objects.create(
+            name="Past",
+            discipline=self.plan[Discipline],
+            date=self.date - timedelta(days=30),
+        )
+        Activity.objects.create(
+            name="Other", discipline=self.other[Discipline], date=self.date
+        )
+        # Calendar apps send neither the API signature nor an Authorization header.
+        self.feed_client = Client()
+
+    def feed_url(self) -> str:
+        response = self.api_client(self.plan[User]).post(
+            "/api/activities/calendar/token/"
+        )
+        self.assertEqual(201, response.status_code)
+
+        return response.json()["url"]
+
+    def events(self, response) -> list:
+        body = b"".join(response.streaming_content).decode()
+        lines = body.split("\r\n")
+
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+
+        events = []
+        event = None
+
+        for line in body.replace("\r\n ", "").split("\r\n"):
+            if line == "BEGIN:VEVENT":
+                event = {}
+            elif line == "END:VEVENT":
+                events.append(event)
+                event = None
+            elif event is not None:
+                key, value = line.split(":", 1)
+                event[key] = value
+
+        return events
+
+    def test_feed_url_serves_the_events_of_the_window(self):
+        url = self.feed_url()
+        response = self.feed_client.get(url)
+
+        self.assertIn("/api/activities/calendar.ics?token=", url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("text/calendar; charset=utf-8", response["Content-Type"])
+        self.assertEqual(
+            [
+                {
+                    "UID": f"activity-{self.activity.pk}@on-way-study",
+                    "DTSTAMP": self.activity.created_at.astimezone(
+                        datetime_timezone.utc
+                    ).strftime("%Y%m%dT%H%M%SZ"),
+                    "DTSTART": self.date.astimezone(datetime_timezone.utc).strftime(
+                        "%Y%m%dT%H%M%SZ"
+                    ),
+                    "SUMMARY": "Prova\\; Cálculo\\, parte 1\\\\2 " + "x" * 60,
+                    "DESCRIPTION": "C - calendar discipline",
+                    "CATEGORIES": "C",
+                }
+            ],
+            self.events(response),
+        )
+
+    def test_start_and_days_select_the_window(self):
+        start = timezone.localtime(self.past.date).date()
+        response = self.feed_client.get(
+            f"{self.feed_url()}&start={start.isoformat()}&days=1"
+        )
+
+        self.assertEqual(
+            [f"activity-{self.past.pk}@on-way-study"],
+            [event["UID"] for event in self.events(response)],
+        )
+
+    def test_unchanged_feed_is_not_modified(self):
+        url = self.feed_url()
+        etag = self.feed_client.get(url)["ETag"]
+
+        with self.assertNumQueries(2):
+            response = self.feed_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client(self.plan[User]).patch(
+                f"/api/activities/{self.activity.pk}/", {"name": "Renamed"}
+            )
+
+        self.assertEqual(
+            200, self.feed_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+        )
+
+    def test_revoked_tokens_are_rejected(self):
+        url = self.feed_url()
+        response = self.api_client(self.plan[User]).delete(
+            "/api/activities/calendar/token/"
+        )
+
+        self.assertEqual(204, response.status_code)
+        self.assertEqual(403, self.feed_client.get(url).status_code)
+        self.assertEqual(200, self.feed_client.get(self.feed_url()).status_code)
+
+    def test_feed_requires_a_valid_token(self):
+        token = issue_feed_token(self.plan[User])
+
+        for params in ({"token": token[:-1] + "x"}, {"token": ""}, {}):
+            with self.subTest(params=params):
+                response = self.feed_client.get("/api/activities/calendar.ics", params)
+
+                self.assertEqual(403, response.status_code)
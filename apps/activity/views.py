@@ -0,0 +1,329 @@
+from urllib.parse import urlencode
+from rest_framework.viewsets import GenericViewSet
+from rest_framework.mixins import (
+    CreateModelMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+)
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT
+from apps.activity.agenda import (
+    FEED_DAYS,
+    FEED_PAST_DAYS,
+    get_agenda_queryset,
+    get_agenda_validators,
+    get_agenda_window,
+    group_agenda_by_day,
+    iter_agenda_rows,
+    iter_ics,
+)
+from apps.activity.filters import ACTIVITY_ORDERINGS, ActivityFilterBackend
+from apps.activity.models import Activity
+from apps.activity.serializers import ActivityBulkSerializer, ActivitySerializer
+from apps.activity.summaries import ACTIVITY_AGGREGATES
+from apps.discipline.models import Discipline
+from apps.user.models import User
+from on_way_study.async_views import OwnedObjectAsyncReadView
+from on_way_study.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from on_way_study.lean import LeanListMixin
+from on_way_study.renderers import ICalendarRenderer
+from on_way_study.response_cache import CachedResponseMixin, response_cache
+from security.authentication import (
+    OnWayStudyBaseAuthentication,
+    OnWayStudyFeedTokenAuthentication,
+    OnWayStudyTokenAuthentication,
+)
+from security.tokens import issue_feed_token
+
+
+class ActivityAsyncReadView(OwnedObjectAsyncReadView):
+    """Async list and retrieve of `ActivityViewSet`."""
+
+    model = Activity
+    serializer_class = ActivitySerializer
+    filter_backends = [ActivityFilterBackend]
+    keyset_orderings = ACTIVITY_ORDERINGS
+    lean_list = True
+
+
+class ActivityViewSet(
+    CachedResponseMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    LeanListMixin,
+    GenericViewSet,
+    CreateModelMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+):
+    """
+    The activities of the request user.
+
+    `GET activities/` is filtered by `ActivityFilterBackend` (`status`,
+    `date_after`, `date_before`, `discipline` and `course`) and can be ordered
+    by `created_at` or `date`, ascending or descending, with `ordering`.
+    `GET activities/agenda/` and `GET activities/calendar/` read the activities
+    of a window of days, as JSON grouped by day and as an iCalendar feed. The
+    feed URL, with its token, is issued by `POST activities/calendar/token/`.
+    """
+
+    serializer_class = ActivitySerializer
+    filter_backends = [ActivityFilterBackend]
+    keyset_orderings = ACTIVITY_ORDERINGS
+    lean_list = True
+    async_read_view = ActivityAsyncReadView
+    query_budgets = {"list": 2, "retrieve": 1, "agenda": 2, "calendar": 2}
+    authentication_classes = [
+        OnWayStudyTokenAuthentication,
+        OnWayStudyBaseAuthentication,
+    ]
+    BULK_MAX_ITEMS = 5000
+
+    def get_queryset(self):
+        self.queryset = Activity.objects.filter(owner=self.request.user)
+        return super().get_queryset()
+
+    @action(detail=False, methods=["get"])
+    def agenda(self, request, *args, **kwargs):
+        """
+        Returns the request user's activities of the coming days, grouped by day.
+
+        `GET activities/agenda/?start=<date>&days=<1-366>`
+
+        The window starts at midnight of `start` (today by default) and lasts
+        `days` days (7 by default). Each activity comes with the names of its
+        discipline and course. The response has an `ETag`, and requests with a
+        matching `If-None-Match` are answered with `304 Not Modified`.
+        """
+        start, end = get_agenda_window(request.query_params)
+        queryset = get_agenda_queryset(request.user, start, end)
+        etag = self._get_agenda_etag(request, queryset, start)
+        not_modified = self.get_not_modified_response(request, etag, None)
+
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(
+            {
+                "start": start,
+                "end": end,
+                "days": group_agenda_by_day(iter_agenda_rows(queryset)),
+            }
+        )
+
+        return self.set_validators(response, etag, None)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, ICalendarRenderer],
+        authentication_classes=[
+            OnWayStudyFeedTokenAuthentication,
+            OnWayStudyTokenAuthentication,
+            OnWayStudyBaseAuthentication,
+        ],
+    )
+    def calendar(self, request, *args, **kwargs):
+        """
+        Streams the request user's activities as an iCalendar feed for calendar apps.
+
+        `GET activities/calendar.ics?token=<feed token>&start=<date>&days=<1-366>`
+
+        Calendar apps authenticate with the feed token of the URL and without
+        the API signature header. API clients may use their usual credentials.
+        By default the feed covers the last week and the next 60 days. It is
+        streamed one event at a time and supports the same conditional
+        requests as `agenda`, so polling an unchanged feed costs one query
+        besides the feed token check.
+        """
+        start, end = get_agenda_window(request.query_params, FEED_DAYS, FEED_PAST_DAYS)
+        queryset = get_agenda_queryset(request.user, start, end)
+        etag = self._get_agenda_etag(request, queryset, start)
+        not_modified = self.get_not_modified_response(request, etag, None)
+
+        if not_modified is not None:
+            return not_modified
+
+        response = StreamingHttpResponse(
+            iter_ics(request.user, iter_agenda_rows(queryset)),
+            content_type="text/calendar; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'inline; filename="{request.user.nickname}-agenda.ics"'
+        )
+
+        return self.set_validators(response, etag, None)
+
+    @action(detail=False, methods=["post"], url_path="calendar/token")
+    def calendar_token(self, request, *args, **kwargs):
+        """
+        Issues the token and the URL of the request user's calendar feed.
+
+        `POST activities/calendar/token/`. The tokens do not expire:
+        `DELETE activities/calendar/token/` revokes all of them.
+        """
+        user = User.objects.get(pk=request.user.pk)
+        token = issue_feed_token(user)
+        url = request.build_absolute_uri(
+            reverse("activity-calendar", kwargs={"format": "ics"})
+        )
+
+        return Response(
+            {"token": token, "url": f"{url}?{urlencode({'token': token})}"},
+            status=HTTP_201_CREATED,
+        )
+
+    @calendar_token.mapping.delete
+    def revoke_calendar_token(self, request, *args, **kwargs):
+        """Revokes every calendar feed token of the request user."""
+        User.objects.filter(pk=request.user.pk).update(
+            calendar_feed_version=F("calendar_feed_version") + 1
+        )
+
+        return Response(status=HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Creates a batch of activities in a single transaction.
+
+        `POST activities/bulk/` with a list of activities. When any item is invalid,
+        nothing is written and the response reports the errors of each invalid
+        item by its index in the payload.
+        """
+        items = self._get_bulk_items(request)
+        serializer = self._get_bulk_serializer(items)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Partially updates a batch of activities, identified by `id`, in a single transaction.
+
+        `PATCH activities/bulk/` with a list of activities.
+        """
+        items = self._get_bulk_items(request)
+        activities = list(
+            self.get_queryset().filter(pk__in=self._collect_ids(items, "id"))
+        )
+        serializer = self._get_bulk_serializer(items, activities)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=HTTP_200_OK)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        """
+        Deletes every activity matching the filters with a single DELETE statement.
+
+        `DELETE activities/bulk/?discipline=<id>&status=<status>`. At least one
+        filter is required.
+        """
+        activities = self.get_queryset().filter(**self._get_bulk_filters(request))
+
+        with transaction.atomic():
+            removed = [
+                ((row.pop("discipline"), {f: v or 0 for f, v in row.items()}), None)
+                for row in activities.values("discipline")
+                .annotate(**ACTIVITY_AGGREGATES)
+                .order_by()
+            ]
+            deleted, _ = activities.delete()
+            Activity.apply_grade_changes(removed)
+            response_cache.invalidate(request.user.pk)
+
+        return Response({"deleted": deleted}, status=HTTP_200_OK)
+
+    def _get_agenda_etag(self, request, queryset, start) -> str:
+        """
+        Builds the ETag of an agenda window.
+
+        The start of the window is part of the ETag, since a default window
+        moves every day while the URL stays the same. Like the lists, the agenda
+        has no `Last-Modified`: deleting an activity does not move it.
+        """
+        count, last_modified = get_agenda_validators(queryset)
+
+        return self.build_etag(request, f"{start.isoformat()}|{count}", last_modified)
+
+    def _get_bulk_items(self, request):
+        return request.data if isinstance(request.data, list) else []
+
+    def _get_bulk_serializer(self, items, activities=None):
+        """
+        Builds the list serializer of a bulk write.
+
+        The disciplines referenced by the batch (and, for updates, the activities)
+        are loaded with one query each and handed to the item serializer.
+        """
+        disciplines = Discipline.objects.filter(
+            owner=self.request.user, pk__in=self._collect_ids(items, "discipline")
+        ).values_list("pk", flat=True)
+        context = {
+            **self.get_serializer_context(),
+            "disciplines": set(disciplines),
+            "activities": {activity.pk for activity in activities or ()},
+        }
+
+        return ActivityBulkSerializer(
+            activities,
+            data=self.request.data,
+            many=True,
+            partial=activities is not None,
+            max_length=self.BULK_MAX_ITEMS,
+            context=context,
+        )
+
+    def _get_bulk_filters(self, request):
+        """
+        Reads the `discipline` and `status` filters of the bulk delete.
+
+        Raises:
+            ValidationError: If no filter is given or a filter value is invalid.
+        """
+        filters = {}
+        discipline = request.query_params.get("discipline")
+        status = request.query_params.get("status")
+
+        if discipline is not None:
+            if not discipline.isdigit():
+                raise ValidationError({"discipline": "A valid integer is required."})
+            filters["discipline_id"] = int(discipline)
+
+        if status is not None:
+            if status not in Activity.StatusChoices.values:
+                raise ValidationError({"status": f'"{status}" is not a valid choice.'})
+            filters["status"] = status
+
+        if not filters:
+            raise ValidationError(
+                "At least one filter ('discipline' or 'status') is required."
+            )
+
+        return filters
+
+    def _collect_ids(self, items, key: str):
+        ids = set()
+
+        for item in items:
+            value = item.get(key) if isinstance(item, dict) else None
+
+            if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+                ids.add(int(value))
+
+        return ids
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0003_course_created_at_course_updated_at"),
+        ("institution", "0008_institution_unique_institution_user_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["instituition", "created_at", "id"],
+                name="course_institution_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations, models, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+import django.db.models.deletion
+from on_way_study.migration_operations import AlterFieldNotNull
+
+BATCH_SIZE = 5000
+
+
+def backfill_course_owner(apps, schema_editor):
+    """
+    Copies the owner from the parent institution in primary key ranges of BATCH_SIZE rows.
+
+    Each batch is committed on its own, so the table is never locked as a whole.
+    """
+    Course = apps.get_model("course", "Course")
+    Institution = apps.get_model("institution", "Institution")
+    owner = Subquery(
+        Institution.objects.filter(pk=OuterRef("instituition_id")).values("user_id")[:1]
+    )
+    bounds = Course.objects.aggregate(low=Min("id"), high=Max("id"))
+
+    if bounds["low"] is None:
+        return
+
+    for start in range(bounds["low"], bounds["high"] + 1, BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Course.objects.filter(
+                id__gte=start, id__lt=start + BATCH_SIZE, owner__isnull=True
+            ).update(owner_id=owner)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("course", "0004_course_course_institution_keyset_idx"),
+        ("institution", "0009_institution_institution_user_keyset_idx"),
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="courses",
+                to="user.user",
+            ),
+        ),
+        migrations.RunPython(backfill_course_owner, migrations.RunPython.noop),
+        AlterFieldNotNull(
+            model_name="course",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="courses",
+                to="user.user",
+            ),
+        ),
+    ]
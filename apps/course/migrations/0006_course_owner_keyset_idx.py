@@ -0,0 +1,20 @@
+from django.db import migrations, models
+from on_way_study.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("course", "0005_course_owner"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="course",
+            index=models.Index(
+                fields=["owner", "created_at", "id"], name="course_owner_keyset_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0006_course_owner_keyset_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="completed_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="graded_weight",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="pending_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="total_weight",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="weighted_result_sum",
+            field=models.DecimalField(
+                decimal_places=4, default=0, editable=False, max_digits=16
+            ),
+        ),
+    ]
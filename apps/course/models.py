@@ -1,21 +1,154 @@
-from django.db import models
+from decimal import Decimal
+from typing import Dict, Optional
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import F, QuerySet
 from apps.institution.models import Institution
-from environment import get_timezone
+from apps.user.models import User
+from environment import get_modification_time, get_timezone
 
 
-class Course(models.Model):
+class GradeSummary(models.Model):
+    """
+    Grade summary columns kept up to date with delta arithmetic on activity writes.
+
+    `weighted_result_sum` and `graded_weight` only account for activities that have
+    both a weight and a result, so `weighted_grade` is the weighted average of the
+    graded activities.
+    """
+
+    SUMMARY_FIELDS = (
+        "total_weight",
+        "graded_weight",
+        "weighted_result_sum",
+        "completed_count",
+        "pending_count",
+    )
+
+    total_weight = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False
+    )
+    graded_weight = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False
+    )
+    weighted_result_sum = models.DecimalField(
+        max_digits=16, decimal_places=4, default=0, editable=False
+    )
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def weighted_grade(self) -> Optional[Decimal]:
+        if not self.graded_weight:
+            return None
+
+        return (self.weighted_result_sum / self.graded_weight).quantize(Decimal("0.01"))
+
+    @property
+    def completion_percentage(self) -> Optional[Decimal]:
+        total = self.completed_count + self.pending_count
+
+        if not total:
+            return None
+
+        return (Decimal(self.completed_count) * 100 / total).quantize(Decimal("0.01"))
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the row without its summary columns, unless `update_fields` names them.
+
+        The summaries only change through `add_to_summaries` deltas and
+        `recompute_grade_summaries`. Writing back the values loaded with the
+        instance would undo the deltas committed since it was read.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SUMMARY_FIELDS
+            ]
+
+        super().save(*args, **kwargs)
+
+    def summary_values(self) -> Dict[str, object]:
+        return {field: getattr(self, field) for field in self.SUMMARY_FIELDS}
+
+    @classmethod
+    def add_to_summaries(cls, queryset: QuerySet, values: Dict[str, object], sign=1):
+        """
+        Adds (or subtracts, with `sign=-1`) summary values to every row of the queryset.
+
+        The update is done with F() expressions in a single statement, so concurrent
+        writers never lose each other's deltas. `updated_at` is touched as well, so
+        the ETag of the changed rows changes with their summaries.
+
+        Args:
+            queryset: The rows whose summaries must change.
+            values: The amount to add to each summary field.
+            sign: 1 to add the values or -1 to subtract them.
+        """
+        changes = {
+            field: F(field) + sign * value for field, value in values.items() if value
+        }
+
+        if changes:
+            queryset.update(**changes, updated_at=get_modification_time())
+
+
+class Course(GradeSummary):
     name = models.CharField(max_length=200)
     acronym = models.CharField(max_length=10)
     semesters = models.PositiveIntegerField()
     instituition = models.ForeignKey(
         Institution, on_delete=models.CASCADE, related_name="courses"
     )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="courses",
+        db_index=False,
+        editable=False,
+    )
     created_at = models.DateTimeField(blank=True, default=get_timezone)
     updated_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = "course"
         managed = True
+        indexes = [
+            models.Index(
+                fields=["instituition", "created_at", "id"],
+                name="course_institution_keyset_idx",
+            ),
+            models.Index(
+                fields=["owner", "created_at", "id"], name="course_owner_keyset_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.acronym})"
+
+    def save(self, *args, **kwargs):
+        """
+        Keeps the denormalized `owner` equal to the institution's user.
+
+        When the course is moved to an institution of another user, the new owner
+        is also written to its disciplines and activities, in the same transaction.
+        """
+        previous_owner_id = self.owner_id
+        self.owner_id = self.instituition.user_id
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "owner"}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if previous_owner_id is not None and previous_owner_id != self.owner_id:
+                self.disciplines.update(owner_id=self.owner_id)
+                apps.get_model("activity", "Activity").objects.filter(
+                    discipline__curso=self
+                ).update(owner_id=self.owner_id)
@@ -1,9 +1,75 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import (
+    CharField,
+    DateTimeField,
+    DecimalField,
+    IntegerField,
+    ModelSerializer,
+    Serializer,
+)
 from apps.course.models import Course
+from apps.institution.models import Institution
+from environment import get_modification_time
+from on_way_study.metrics import TimedSerializerMixin
+from on_way_study.response_cache import ResponseCacheInvalidationMixin
+from apps.discipline.serializers import DisciplineTreeSerializer
 
 
-class CourseSerializer(ModelSerializer):
+class CourseSerializer(
+    TimedSerializerMixin, ResponseCacheInvalidationMixin, ModelSerializer
+):
+    weighted_grade = DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    completion_percentage = DecimalField(max_digits=5, decimal_places=2, read_only=True)
 
     class Meta:
         model = Course
         fields = "__all__"
+        read_only_fields = ["created_at", "updated_at"]
+
+    def get_fields(self):
+        """
+        Restricts the `instituition` choices to the institutions owned by the request user.
+
+        The ownership is checked by the same query that resolves the primary key,
+        so a course can never be attached to another user's institution.
+        """
+        fields = super().get_fields()
+        request = self.context.get("request")
+        fields["instituition"].queryset = Institution.objects.filter(
+            user=getattr(request, "user", None)
+        )
+
+        return fields
+
+    def create(self, validated_data):
+        validated_data["updated_at"] = get_modification_time()
+
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data["updated_at"] = get_modification_time()
+
+        return super().update(instance, validated_data)
+
+
+class CourseTreeSerializer(Serializer):
+    """
+    Lean read-only representation of a course inside a user's study plan tree.
+
+    The nested `disciplines` are dropped when the `depth` in the context is 2 or less.
+    """
+
+    id = IntegerField(read_only=True)
+    name = CharField(read_only=True)
+    acronym = CharField(read_only=True)
+    semesters = IntegerField(read_only=True)
+    created_at = DateTimeField(read_only=True)
+    updated_at = DateTimeField(read_only=True)
+    disciplines = DisciplineTreeSerializer(many=True, read_only=True)
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if self.context.get("depth", 4) <= 2:
+            fields.pop("disciplines")
+
+        return fields
@@ -0,0 +1,50 @@
+from apps.course.models import Course
+from apps.institution.models import Institution
+from apps.user.models import User
+from on_way_study.testing import ApiTestCase, create_study_plan
+
+
+class CourseOwnershipTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("course-owner")
+        self.other = create_study_plan("course-other")
+        self.client = self.api_client(self.plan[User])
+
+    def test_list_only_returns_the_user_courses_with_a_fixed_query_count(self):
+        Course.objects.create(
+            name="Second", acronym="S", semesters=4, instituition=self.plan[Institution]
+        )
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/courses/")
+
+        self.assertEqual(
+            {"course-owner course", "Second"},
+            {course["name"] for course in response.json()["results"]},
+        )
+
+    def test_retrieve_is_scoped_to_the_owner_in_one_query(self):
+        with self.assertNumQueries(1):
+            own = self.client.get(f"/api/courses/{self.plan[Course].pk}/")
+
+        with self.assertNumQueries(1):
+            other = self.client.get(f"/api/courses/{self.other[Course].pk}/")
+
+        self.assertEqual(200, own.status_code)
+        self.assertEqual(404, other.status_code)
+
+    def test_create_rejects_an_institution_of_another_user(self):
+        response = self.client.post(
+            "/api/courses/",
+            {
+                "name": "Foreign",
+                "acronym": "F",
+                "semesters": 2,
+                "instituition": self.other[Institution].pk,
+            },
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn("instituition", response.json())
+        self.assertFalse(Course.objects.filter(name="Foreign").exists())
@@ -0,0 +1,11 @@
+from rest_framework.routers import DefaultRouter
+from django.urls import path, include
+from apps.course.views import CourseViewSet
+
+router = DefaultRouter()
+
+router.register(r"courses", CourseViewSet, basename="course")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
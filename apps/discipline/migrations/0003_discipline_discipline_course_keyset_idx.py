@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0004_course_course_institution_keyset_idx"),
+        ("discipline", "0002_discipline_created_at_discipline_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="discipline",
+            index=models.Index(
+                fields=["curso", "created_at", "id"],
+                name="discipline_course_keyset_idx",
+            ),
+        ),
+    ]
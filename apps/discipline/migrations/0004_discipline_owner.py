@@ -0,0 +1,67 @@
+from django.db import migrations, models, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+import django.db.models.deletion
+from on_way_study.migration_operations import AlterFieldNotNull
+
+BATCH_SIZE = 5000
+
+
+def backfill_discipline_owner(apps, schema_editor):
+    """
+    Copies the owner from the parent course in primary key ranges of BATCH_SIZE rows.
+
+    Each batch is committed on its own, so the table is never locked as a whole.
+    """
+    Discipline = apps.get_model("discipline", "Discipline")
+    Course = apps.get_model("course", "Course")
+    owner = Subquery(
+        Course.objects.filter(pk=OuterRef("curso_id")).values("owner_id")[:1]
+    )
+    bounds = Discipline.objects.aggregate(low=Min("id"), high=Max("id"))
+
+    if bounds["low"] is None:
+        return
+
+    for start in range(bounds["low"], bounds["high"] + 1, BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Discipline.objects.filter(
+                id__gte=start, id__lt=start + BATCH_SIZE, owner__isnull=True
+            ).update(owner_id=owner)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("discipline", "0003_discipline_discipline_course_keyset_idx"),
+        ("course", "0005_course_owner"),
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="discipline",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="disciplines",
+                to="user.user",
+            ),
+        ),
+        migrations.RunPython(backfill_discipline_owner, migrations.RunPython.noop),
+        AlterFieldNotNull(
+            model_name="discipline",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="disciplines",
+                to="user.user",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+from on_way_study.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("discipline", "0004_discipline_owner"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="discipline",
+            index=models.Index(
+                fields=["owner", "created_at", "id"], name="discipline_owner_keyset_idx"
+            ),
+        ),
+    ]
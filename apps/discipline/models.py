@@ -1,20 +1,88 @@
-from django.db import models
-from apps.course.models import Course
+from django.db import models, transaction
+from apps.course.models import Course, GradeSummary
+from apps.user.models import User
 from environment import get_timezone
 
 
-class Discipline(models.Model):
+class Discipline(GradeSummary):
     name = models.CharField(max_length=200)
     extra_information = models.TextField(blank=True, null=True)
     curso = models.ForeignKey(
         Course, on_delete=models.CASCADE, related_name="disciplines"
     )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="disciplines",
+        db_index=False,
+        editable=False,
+    )
     created_at = models.DateTimeField(blank=True, default=get_timezone)
     updated_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = "discipline"
         managed = True
+        indexes = [
+            models.Index(
+                fields=["curso", "created_at", "id"],
+                name="discipline_course_keyset_idx",
+            ),
+            models.Index(
+                fields=["owner", "created_at", "id"],
+                name="discipline_owner_keyset_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_curso_id = instance.__dict__.get("curso_id")
+
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Keeps the denormalized `owner` equal to the course owner.
+
+        When the discipline is moved to a course of another user, its activities
+        follow the new owner. When it is moved to another course, its grade
+        summary is moved along with it.
+        """
+        previous_owner_id = self.owner_id
+        previous_curso_id = getattr(self, "_loaded_curso_id", None)
+        self.owner_id = self.curso.owner_id
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "owner"}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if previous_owner_id is not None and previous_owner_id != self.owner_id:
+                self.activities.update(owner_id=self.owner_id)
+
+            if previous_curso_id is not None and previous_curso_id != self.curso_id:
+                self.refresh_from_db(fields=self.SUMMARY_FIELDS)
+                values = self.summary_values()
+                self.add_to_summaries(
+                    Course.objects.filter(pk=previous_curso_id), values, sign=-1
+                )
+                self.add_to_summaries(Course.objects.filter(pk=self.curso_id), values)
+
+        self._loaded_curso_id = self.curso_id
+
+    def delete(self, *args, **kwargs):
+        """Deletes the discipline and removes its grade summary from the course."""
+        with transaction.atomic():
+            self.refresh_from_db(fields=self.SUMMARY_FIELDS)
+            self.add_to_summaries(
+                Course.objects.filter(pk=self.curso_id),
+                self.summary_values(),
+                sign=-1,
+            )
+
+            return super().delete(*args, **kwargs)
@@ -1,9 +1,73 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import (
+    CharField,
+    DateTimeField,
+    DecimalField,
+    IntegerField,
+    ModelSerializer,
+    Serializer,
+)
+from apps.activity.serializers import ActivityTreeSerializer
 from apps.discipline.models import Discipline
+from apps.course.models import Course
+from environment import get_modification_time
+from on_way_study.metrics import TimedSerializerMixin
+from on_way_study.response_cache import ResponseCacheInvalidationMixin
 
 
-class DisciplineSerializer(ModelSerializer):
+class DisciplineSerializer(
+    TimedSerializerMixin, ResponseCacheInvalidationMixin, ModelSerializer
+):
+    weighted_grade = DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    completion_percentage = DecimalField(max_digits=5, decimal_places=2, read_only=True)
 
     class Meta:
         model = Discipline
         fields = "__all__"
+        read_only_fields = ["created_at", "updated_at"]
+
+    def get_fields(self):
+        """
+        Restricts the `curso` choices to the courses owned by the request user.
+
+        A course of another user is rejected as if it did not exist.
+        """
+        fields = super().get_fields()
+        request = self.context.get("request")
+        fields["curso"].queryset = Course.objects.filter(
+            owner=getattr(request, "user", None)
+        )
+
+        return fields
+
+    def create(self, validated_data):
+        validated_data["updated_at"] = get_modification_time()
+
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data["updated_at"] = get_modification_time()
+
+        return super().update(instance, validated_data)
+
+
+class DisciplineTreeSerializer(Serializer):
+    """
+    Lean read-only representation of a discipline inside a user's study plan tree.
+
+    The nested `activities` are dropped when the `depth` in the context is 3 or less.
+    """
+
+    id = IntegerField(read_only=True)
+    name = CharField(read_only=True)
+    extra_information = CharField(read_only=True)
+    created_at = DateTimeField(read_only=True)
+    updated_at = DateTimeField(read_only=True)
+    activities = ActivityTreeSerializer(many=True, read_only=True)
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if self.context.get("depth", 4) <= 3:
+            fields.pop("activities")
+
+        return fields
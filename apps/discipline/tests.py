@@ -0,0 +1,91 @@
+from decimal import Decimal
+from unittest import mock
+from django.db.models import QuerySet
+from django.test import TestCase
+from apps.activity.models import Activity
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+from on_way_study.testing import ApiTestCase, create_study_plan
+
+
+class GradeSummarySaveTests(TestCase):
+    def setUp(self):
+        self.plan = create_study_plan("summaries", activities=1)
+
+    def test_save_keeps_the_deltas_committed_after_the_instance_was_read(self):
+        discipline = Discipline.objects.get(pk=self.plan[Discipline].pk)
+        course = Course.objects.get(pk=self.plan[Course].pk)
+        Activity.objects.create(
+            name="Concurrent", discipline=discipline, weight=Decimal("3.00")
+        )
+
+        discipline.name = "Renamed discipline"
+        discipline.save()
+        course.name = "Renamed course"
+        course.save()
+
+        discipline.refresh_from_db()
+        course.refresh_from_db()
+
+        self.assertEqual("Renamed discipline", discipline.name)
+        self.assertEqual(Decimal("5.00"), discipline.total_weight)
+        self.assertEqual(2, discipline.pending_count)
+        self.assertEqual("Renamed course", course.name)
+        self.assertEqual(Decimal("5.00"), course.total_weight)
+
+    def test_owner_change_is_rolled_back_when_the_cascade_fails(self):
+        other = User.objects.create(nickname="other-owner", password="x")
+        course = self.plan[Course]
+        course.instituition = Institution.objects.create(name="Other", user=other)
+        update = QuerySet.update
+
+        def failing_update(queryset, **kwargs):
+            if queryset.model is Activity:
+                raise RuntimeError("The activities could not be updated.")
+
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", failing_update):
+            with self.assertRaises(RuntimeError):
+                course.save()
+
+        owner = self.plan[User].pk
+        self.assertEqual(owner, Course.objects.get(pk=course.pk).owner_id)
+        self.assertEqual(
+            owner, Discipline.objects.get(pk=self.plan[Discipline].pk).owner_id
+        )
+
+
+class DisciplineOwnershipTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("discipline-owner")
+        self.other = create_study_plan("discipline-other")
+        self.client = self.api_client(self.plan[User])
+
+    def test_list_only_returns_the_user_disciplines_with_a_fixed_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/disciplines/")
+
+        self.assertEqual(
+            [self.plan[Discipline].pk],
+            [discipline["id"] for discipline in response.json()["results"]],
+        )
+
+    def test_retrieve_and_update_of_another_user_discipline_are_not_found(self):
+        path = f"/api/disciplines/{self.other[Discipline].pk}/"
+
+        with self.assertNumQueries(1):
+            self.assertEqual(404, self.client.get(path).status_code)
+
+        self.assertEqual(404, self.client.patch(path, {"name": "Taken"}).status_code)
+
+    def test_create_rejects_a_course_of_another_user(self):
+        response = self.client.post(
+            "/api/disciplines/", {"name": "Foreign", "curso": self.other[Course].pk}
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn("curso", response.json())
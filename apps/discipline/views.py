@@ -0,0 +1,52 @@
+from rest_framework.viewsets import GenericViewSet
+from rest_framework.mixins import (
+    CreateModelMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+)
+from apps.discipline.models import Discipline
+from apps.discipline.serializers import DisciplineSerializer
+from on_way_study.async_views import OwnedObjectAsyncReadView
+from on_way_study.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from on_way_study.lean import LeanListMixin
+from on_way_study.response_cache import CachedResponseMixin
+from security.authentication import (
+    OnWayStudyBaseAuthentication,
+    OnWayStudyTokenAuthentication,
+)
+
+
+class DisciplineAsyncReadView(OwnedObjectAsyncReadView):
+    """Async list and retrieve of `DisciplineViewSet`."""
+
+    model = Discipline
+    serializer_class = DisciplineSerializer
+    lean_list = True
+
+
+class DisciplineViewSet(
+    CachedResponseMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    LeanListMixin,
+    GenericViewSet,
+    CreateModelMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+):
+    serializer_class = DisciplineSerializer
+    lean_list = True
+    async_read_view = DisciplineAsyncReadView
+    query_budgets = {"list": 2, "retrieve": 1}
+    authentication_classes = [
+        OnWayStudyTokenAuthentication,
+        OnWayStudyBaseAuthentication,
+    ]
+
+    def get_queryset(self):
+        self.queryset = Discipline.objects.filter(owner=self.request.user)
+        return super().get_queryset()
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("institution", "0008_institution_unique_institution_user_name"),
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="institution",
+            index=models.Index(
+                fields=["user", "created_at", "id"], name="institution_user_keyset_idx"
+            ),
+        ),
+    ]
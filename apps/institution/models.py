@@ -19,6 +19,11 @@ class Institution(models.Model):
                 fields=["name", "user"], name="unique_institution_user_name"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"], name="institution_user_keyset_idx"
+            )
+        ]
 
     def __str__(self):
         return self.name
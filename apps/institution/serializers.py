@@ -1,12 +1,23 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import (
+    CharField,
+    DateTimeField,
+    IntegerField,
+    ModelSerializer,
+    Serializer,
+)
+from apps.course.serializers import CourseTreeSerializer
 from apps.institution.models import Institution
 from rest_framework.exceptions import NotAuthenticated, ValidationError
 from django.db import IntegrityError
-from environment import get_timezone
+from environment import get_modification_time
+from on_way_study.metrics import TimedSerializerMixin
+from on_way_study.response_cache import ResponseCacheInvalidationMixin
 from apps.user.models import User
 
 
-class InstitutionSerializer(ModelSerializer):
+class InstitutionSerializer(
+    TimedSerializerMixin, ResponseCacheInvalidationMixin, ModelSerializer
+):
     class Meta:
         model = Institution
         fields = ["id", "name", "user", "created_at", "updated_at"]
@@ -19,6 +30,7 @@ class InstitutionSerializer(ModelSerializer):
 
     def create(self, validated_data):
         validated_data["user"] = self._get_user()
+        validated_data["updated_at"] = get_modification_time()
 
         try:
             return super().create(validated_data)
@@ -29,7 +41,7 @@ class InstitutionSerializer(ModelSerializer):
 
     def update(self, instance, validated_data):
         validated_data.pop("user", None)
-        validated_data["updated_at"] = get_timezone()
+        validated_data["updated_at"] = get_modification_time()
 
         return super().update(instance, validated_data)
 
@@ -50,3 +62,25 @@ class InstitutionSerializer(ModelSerializer):
             raise NotAuthenticated("Invalid request. No user assigned to the request.")
 
         return request.user
+
+
+class InstitutionTreeSerializer(Serializer):
+    """
+    Lean read-only representation of an institution inside a user's study plan tree.
+
+    The nested `courses` are dropped when the `depth` in the context is 1.
+    """
+
+    id = IntegerField(read_only=True)
+    name = CharField(read_only=True)
+    created_at = DateTimeField(read_only=True)
+    updated_at = DateTimeField(read_only=True)
+    courses = CourseTreeSerializer(many=True, read_only=True)
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if self.context.get("depth", 4) <= 1:
+            fields.pop("courses")
+
+        return fields
@@ -6,12 +6,40 @@ from rest_framework.mixins import (
     DestroyModelMixin,
     ListModelMixin,
 )
+from django.http import Http404
 from apps.institution.models import Institution
 from apps.institution.serializers import InstitutionSerializer
-from security.authentication import OnWayStudyBaseAuthentication
+from on_way_study.async_views import AsyncReadView
+from on_way_study.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from on_way_study.lean import LeanListMixin
+from on_way_study.prepared_statements import PreparedStatement
+from on_way_study.response_cache import CachedResponseMixin
+from security.authentication import (
+    OnWayStudyBaseAuthentication,
+    OnWayStudyTokenAuthentication,
+)
+
+institution_by_user_and_name = PreparedStatement(
+    "institution_by_user_and_name", Institution, ["user", "name"]
+)
+
+
+class InstitutionAsyncReadView(AsyncReadView):
+    """Async list and retrieve of `InstitutionViewSet`."""
+
+    serializer_class = InstitutionSerializer
+    lean_list = True
+    lookup_field = "name"
+
+    def get_queryset(self, request):
+        return Institution.objects.filter(user=request.user)
 
 
 class InstitutionViewSet(
+    CachedResponseMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    LeanListMixin,
     GenericViewSet,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -20,9 +48,39 @@ class InstitutionViewSet(
     ListModelMixin,
 ):
     serializer_class = InstitutionSerializer
+    lean_list = True
     lookup_field = "name"
-    authentication_classes = [OnWayStudyBaseAuthentication]
+    async_read_view = InstitutionAsyncReadView
+    query_budgets = {"list": 2, "retrieve": 1}
+    authentication_classes = [
+        OnWayStudyTokenAuthentication,
+        OnWayStudyBaseAuthentication,
+    ]
 
     def get_queryset(self):
         self.queryset = Institution.objects.filter(user=self.request.user)
         return super().get_queryset()
+
+    def get_object(self):
+        """
+        Loads the request user's institution named in the URL.
+
+        The lookup is scoped to the user, so it also proves the ownership, and
+        runs as the `institution_by_user_and_name` prepared statement.
+
+        Raises:
+            Http404: If the user has no institution with that name.
+
+        Returns:
+            The Institution instance.
+        """
+        instance = institution_by_user_and_name.fetch_one(
+            self.request.user.pk, self.kwargs[self.lookup_field]
+        )
+
+        if instance is None:
+            raise Http404("No Institution matches the given query.")
+
+        self.check_object_permissions(self.request, instance)
+
+        return instance
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+from apps.search.index import repair_search_index
+
+
+def repair_search_index_after_migrate(sender, using, **kwargs):
+    repair_search_index(connections[using])
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.search"
+
+    def ready(self):
+        # Without models, this app gets no post_migrate of its own: the index is
+        # checked after the migration of each app, and rebuilt at most once.
+        post_migrate.connect(
+            repair_search_index_after_migrate,
+            dispatch_uid="apps.search.repair_search_index",
+        )
@@ -0,0 +1,188 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+from django.db import connection
+
+TERM = re.compile(r"\w+")
+MAX_TERMS = 8
+
+FULLTEXT = "fulltext"
+SIMILAR = "similar"
+
+Position = Tuple[str, float, int]
+
+
+class SearchBackend:
+    """
+    Ranked search of one user's `search_entry` rows.
+
+    The queries only touch the entries of the owner, through indexes that start
+    with the owner, so their cost depends on the size of the user's study plan
+    and not on the size of the table. Pages are read with a seek on
+    `(score, entry id)`, the position of the last result of the previous page.
+    """
+
+    def search(
+        self,
+        owner_id: int,
+        terms: Sequence[str],
+        kinds: Sequence[str],
+        position: Optional[Position],
+        limit: int,
+    ) -> Tuple[List[dict], str]:
+        """
+        Returns the best matches, the full-text ones first and similar names otherwise.
+
+        Args:
+            owner_id: The user whose tree is searched.
+            terms: The words searched, all required. The last one is a prefix.
+            kinds: The kinds of entries to return.
+            position: The `(mode, score, entry id)` to continue after, if any.
+            limit: How many results to return at most.
+
+        Returns:
+            The rows, best first, and the mode that found them.
+        """
+        mode = position[0] if position else FULLTEXT
+        after = position[1:] if position else None
+
+        if mode == FULLTEXT:
+            rows = self._fetch(
+                self.fulltext_sql(after),
+                self.fulltext_params(owner_id, terms),
+                kinds,
+                after,
+                limit,
+            )
+
+            if rows or after is not None:
+                return rows, FULLTEXT
+
+        rows = self._fetch(
+            self.similar_sql(after),
+            self.similar_params(owner_id, terms),
+            kinds,
+            after,
+            limit,
+        )
+
+        return rows, SIMILAR
+
+    def fulltext_sql(self, after) -> Optional[str]:
+        raise NotImplementedError
+
+    def fulltext_params(self, owner_id: int, terms: Sequence[str]) -> list:
+        raise NotImplementedError
+
+    def similar_sql(self, after) -> Optional[str]:
+        return None
+
+    def similar_params(self, owner_id: int, terms: Sequence[str]) -> list:
+        return []
+
+    def _fetch(self, sql: Optional[str], params: list, kinds, after, limit: int):
+        if sql is None:
+            return []
+
+        sql = sql.format(kinds=", ".join(["%s"] * len(kinds)))
+        seek = [after[0], after[0], after[1]] if after else []
+        params = [*params, *kinds, *seek, limit]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    `tsvector` search ranked with `ts_rank`, falling back to trigram similarity.
+
+    The fallback runs when the full-text search finds nothing, e.g. for a typo,
+    and matches the names whose trigram similarity reaches
+    `pg_trgm.similarity_threshold`.
+    """
+
+    SELECT = (
+        "SELECT entry_id, kind, object_id, name, detail, score FROM ("
+        "SELECT id AS entry_id, kind, object_id, name, detail, {score} AS score "
+        "FROM search_entry WHERE owner_id = %s AND {match} AND kind IN ({{kinds}})"
+        ") AS entries "
+    )
+    SEEK = "WHERE score < %s OR (score = %s AND entry_id > %s) "
+    ORDER = "ORDER BY score DESC, entry_id LIMIT %s"
+
+    def fulltext_sql(self, after) -> str:
+        select = self.SELECT.format(
+            score="ts_rank(document, to_tsquery('simple', unaccent(%s)))",
+            match="document @@ to_tsquery('simple', unaccent(%s))",
+        )
+
+        return select + (self.SEEK if after else "") + self.ORDER
+
+    def fulltext_params(self, owner_id: int, terms: Sequence[str]) -> list:
+        query = " & ".join([*terms[:-1], f"{terms[-1]}:*"])
+
+        return [query, owner_id, query]
+
+    def similar_sql(self, after) -> str:
+        select = self.SELECT.format(
+            score="similarity(normalized_name, lower(unaccent(%s)))",
+            match="normalized_name %% lower(unaccent(%s))",
+        )
+
+        return select + (self.SEEK if after else "") + self.ORDER
+
+    def similar_params(self, owner_id: int, terms: Sequence[str]) -> list:
+        text = " ".join(terms)
+
+        return [text, owner_id, text]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 search ranked with `bm25`, the name weighing more than the detail.
+
+    There is no typo fallback: the last word is matched as a prefix, and the
+    tokenizer ignores case and diacritics.
+    """
+
+    SQL = (
+        "SELECT entry_id, kind, object_id, name, detail, score FROM ("
+        "SELECT rowid AS entry_id, kind, object_id, name, detail, "
+        "-bm25(search_entry, 10.0, 4.0, 0.0) AS score "
+        "FROM search_entry WHERE search_entry MATCH %s"
+        ") WHERE kind IN ({kinds}) "
+    )
+    SEEK = "AND (score < %s OR (score = %s AND entry_id > %s)) "
+    ORDER = "ORDER BY score DESC, entry_id LIMIT %s"
+
+    def fulltext_sql(self, after) -> str:
+        return self.SQL + (self.SEEK if after else "") + self.ORDER
+
+    def fulltext_params(self, owner_id: int, terms: Sequence[str]) -> list:
+        phrases = [f'"{term}"' for term in terms]
+        phrases[-1] += " *"
+
+        return [f"owner : u{owner_id} AND {{name detail}} : ({' AND '.join(phrases)})"]
+
+
+def get_search_backend() -> SearchBackend:
+    """
+    Returns the search backend of the default database.
+
+    Raises:
+        NotImplementedError: If the database is neither PostgreSQL nor SQLite.
+    """
+    if connection.vendor == "postgresql":
+        return PostgreSQLSearchBackend()
+
+    if connection.vendor == "sqlite":
+        return SQLiteSearchBackend()
+
+    raise NotImplementedError(f"Search does not support {connection.vendor}.")
+
+
+def parse_terms(text: str) -> List[str]:
+    """Splits the searched text into at most `MAX_TERMS` lowercase words."""
+    return TERM.findall(text.lower())[:MAX_TERMS]
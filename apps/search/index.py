@@ -0,0 +1,283 @@
+"""
+The `search_entry` index of the names of every institution, course, discipline
+and activity, kept up to date by database triggers.
+
+Triggers rather than model hooks keep the index right for every write path:
+`save()`, `bulk_create`, `QuerySet.update()`, the cascading deletes and the
+`COPY` of `generate_dataset` alike. Each source row has one entry, whose id is
+`source id * 4 + SOURCES index`, so a trigger finds the entry of its row
+without a lookup table.
+
+- PostgreSQL: a regular table with a `tsvector` document (the name weighted
+  `A`, the detail `B`, both unaccented) under a GIN index on
+  `(owner_id, document)`, and a trigram GIN index on `(owner_id,
+  normalized_name)` for the typo fallback. It needs the `btree_gin`,
+  `pg_trgm` and `unaccent` extensions.
+- SQLite: an FTS5 virtual table with the owner as an indexed `u<id>` token,
+  so the owner filter is part of the full-text match.
+
+SQLite drops the triggers of a table when a migration rebuilds it, so after
+every `migrate` the search app rebuilds the index if any trigger is missing
+(see `repair_search_index`).
+"""
+
+from typing import List, NamedTuple, Optional
+from django.db import transaction
+
+
+class SearchSource(NamedTuple):
+    kind: str
+    table: str
+    owner_column: str
+    detail_column: Optional[str]
+
+
+SOURCES = (
+    SearchSource("institution", "institution", "user_id", None),
+    SearchSource("course", "course", "owner_id", "acronym"),
+    SearchSource("discipline", "discipline", "owner_id", "extra_information"),
+    SearchSource("activity", "activity", "owner_id", None),
+)
+KINDS = tuple(source.kind for source in SOURCES)
+POSTGRESQL_COLUMNS = (
+    "id, kind, object_id, owner_id, name, detail, normalized_name, document"
+)
+SQLITE_COLUMNS = "rowid, name, detail, owner, kind, object_id"
+
+
+def install_search_index(connection):
+    """
+    Creates the index table and the triggers of every source, if missing.
+
+    Args:
+        connection: The database connection (`schema_editor.connection` in a
+            migration).
+
+    Raises:
+        NotImplementedError: If the database is neither PostgreSQL nor SQLite.
+    """
+    with connection.cursor() as cursor:
+        for sql in _install_statements(connection.vendor):
+            cursor.execute(sql)
+
+
+def uninstall_search_index(connection):
+    """Drops the triggers and the index table."""
+    with connection.cursor() as cursor:
+        for sql in _uninstall_statements(connection.vendor):
+            cursor.execute(sql)
+
+
+def rebuild_search_index(connection):
+    """
+    Reinstalls the triggers and fills the index again from the source tables.
+
+    Runs in the caller's transaction, if any.
+    """
+    install_search_index(connection)
+    postgresql = connection.vendor == "postgresql"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "TRUNCATE search_entry" if postgresql else "DELETE FROM search_entry"
+        )
+
+        for code, source in enumerate(SOURCES):
+            if postgresql:
+                cursor.execute(
+                    f"INSERT INTO search_entry ({POSTGRESQL_COLUMNS}) "
+                    f"SELECT {_postgresql_values(source, code, '')} "
+                    f'FROM "{source.table}"'
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO search_entry ({SQLITE_COLUMNS}) "
+                    f"SELECT {_sqlite_values(source, code, '')} "
+                    f'FROM "{source.table}"'
+                )
+
+
+def repair_search_index(connection) -> bool:
+    """
+    Rebuilds the index if a migration dropped some of its SQLite triggers.
+
+    The rows written while a trigger was missing were not indexed, so the whole
+    index is filled again rather than only the triggers reinstalled. PostgreSQL
+    keeps the triggers of altered tables, and a database without the index
+    (before the search migration) is left alone.
+
+    Args:
+        connection: The database connection that was migrated.
+
+    Returns:
+        True if the index was rebuilt.
+    """
+    if connection.vendor != "sqlite":
+        return False
+
+    if "search_entry" not in connection.introspection.table_names():
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND name LIKE 'search_entry_%'"
+        )
+        installed = {name for (name,) in cursor.fetchall()}
+
+    expected = {
+        f"search_entry_{source.kind}_{event}"
+        for source in SOURCES
+        for event in ("insert", "update", "delete")
+    }
+
+    if expected <= installed:
+        return False
+
+    with transaction.atomic(using=connection.alias):
+        rebuild_search_index(connection)
+
+    return True
+
+
+def _install_statements(vendor: str) -> List[str]:
+    if vendor == "postgresql":
+        return _postgresql_install_statements()
+
+    if vendor == "sqlite":
+        return _sqlite_install_statements()
+
+    raise NotImplementedError(f"The search index does not support {vendor}.")
+
+
+def _uninstall_statements(vendor: str) -> List[str]:
+    if vendor == "postgresql":
+        return [
+            statement
+            for source in SOURCES
+            for statement in (
+                f'DROP TRIGGER IF EXISTS search_entry_{source.kind} ON "{source.table}"',
+                f"DROP FUNCTION IF EXISTS search_entry_{source.kind}()",
+            )
+        ] + ["DROP TABLE IF EXISTS search_entry"]
+
+    return [
+        f"DROP TRIGGER IF EXISTS search_entry_{source.kind}_{event}"
+        for source in SOURCES
+        for event in ("insert", "update", "delete")
+    ] + ["DROP TABLE IF EXISTS search_entry"]
+
+
+def _postgresql_install_statements() -> List[str]:
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS search_entry (
+            id bigint PRIMARY KEY,
+            kind varchar(20) NOT NULL,
+            object_id bigint NOT NULL,
+            owner_id bigint NOT NULL,
+            name text NOT NULL,
+            detail text,
+            normalized_name text NOT NULL,
+            document tsvector NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS search_entry_document_idx "
+        "ON search_entry USING gin (owner_id, document)",
+        "CREATE INDEX IF NOT EXISTS search_entry_trigram_idx "
+        "ON search_entry USING gin (owner_id, normalized_name gin_trgm_ops)",
+    ]
+
+    for code, source in enumerate(SOURCES):
+        columns = ", ".join(
+            column
+            for column in ("name", source.detail_column, source.owner_column)
+            if column
+        )
+        statements += [
+            f"""
+            CREATE OR REPLACE FUNCTION search_entry_{source.kind}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM search_entry WHERE id = OLD.id * 4 + {code};
+                    RETURN NULL;
+                END IF;
+
+                INSERT INTO search_entry ({POSTGRESQL_COLUMNS})
+                VALUES ({_postgresql_values(source, code, 'NEW.')})
+                ON CONFLICT (id) DO UPDATE SET
+                    owner_id = EXCLUDED.owner_id,
+                    name = EXCLUDED.name,
+                    detail = EXCLUDED.detail,
+                    normalized_name = EXCLUDED.normalized_name,
+                    document = EXCLUDED.document;
+
+                RETURN NULL;
+            END
+            $$
+            """,
+            f'DROP TRIGGER IF EXISTS search_entry_{source.kind} ON "{source.table}"',
+            f"""
+            CREATE TRIGGER search_entry_{source.kind}
+            AFTER INSERT OR DELETE OR UPDATE OF {columns} ON "{source.table}"
+            FOR EACH ROW EXECUTE FUNCTION search_entry_{source.kind}()
+            """,
+        ]
+
+    return statements
+
+
+def _sqlite_install_statements() -> List[str]:
+    statements = ["""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_entry USING fts5(
+            name,
+            detail,
+            owner,
+            kind UNINDEXED,
+            object_id UNINDEXED,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """]
+
+    for code, source in enumerate(SOURCES):
+        insert = (
+            f"INSERT INTO search_entry ({SQLITE_COLUMNS}) "
+            f"VALUES ({_sqlite_values(source, code, 'NEW.')});"
+        )
+        delete = f"DELETE FROM search_entry WHERE rowid = OLD.id * 4 + {code};"
+        columns = ", ".join(
+            column
+            for column in ("name", source.detail_column, source.owner_column)
+            if column
+        )
+        trigger = f"CREATE TRIGGER IF NOT EXISTS search_entry_{source.kind}"
+        statements += [
+            f'{trigger}_insert AFTER INSERT ON "{source.table}" BEGIN {insert} END',
+            f'{trigger}_update AFTER UPDATE OF {columns} ON "{source.table}" '
+            f"BEGIN {delete} {insert} END",
+            f'{trigger}_delete AFTER DELETE ON "{source.table}" BEGIN {delete} END',
+        ]
+
+    return statements
+
+
+def _postgresql_values(source: SearchSource, code: int, row: str) -> str:
+    detail = f"{row}{source.detail_column}" if source.detail_column else "NULL"
+
+    return (
+        f"{row}id * 4 + {code}, '{source.kind}', {row}id, "
+        f"{row}{source.owner_column}, {row}name, {detail}, "
+        f"lower(unaccent({row}name)), "
+        f"setweight(to_tsvector('simple', unaccent({row}name)), 'A') || "
+        f"setweight(to_tsvector('simple', unaccent(coalesce({detail}, ''))), 'B')"
+    )
+
+
+def _sqlite_values(source: SearchSource, code: int, row: str) -> str:
+    detail = f"{row}{source.detail_column}" if source.detail_column else "NULL"
+
+    return (
+        f"{row}id * 4 + {code}, {row}name, {detail}, "
+        f"'u' || {row}{source.owner_column}, '{source.kind}', {row}id"
+    )
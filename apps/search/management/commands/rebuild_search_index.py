@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from apps.search.index import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Reinstalls the search index triggers and fills the index again from the "
+        "institutions, courses, disciplines and activities."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_search_index(connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM search_entry")
+            (count,) = cursor.fetchone()
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} entries."))
@@ -0,0 +1,39 @@
+from django.contrib.postgres.operations import (
+    BtreeGinExtension,
+    TrigramExtension,
+    UnaccentExtension,
+)
+from django.db import migrations
+from apps.search.index import rebuild_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    rebuild_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0007_activity_filter_indexes"),
+        (
+            "course",
+            "0007_course_completed_count_course_graded_weight_and_more",
+        ),
+        (
+            "discipline",
+            "0006_discipline_completed_count_discipline_graded_weight_and_more",
+        ),
+        ("institution", "0009_institution_institution_user_keyset_idx"),
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        BtreeGinExtension(),
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,46 @@
+from unittest import skipUnless
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models.signals import post_migrate
+from django.test import TestCase
+from apps.activity.models import Activity
+from apps.discipline.models import Discipline
+from apps.search.index import repair_search_index
+from on_way_study.testing import create_study_plan
+
+
+@skipUnless(connection.vendor == "sqlite", "Only SQLite drops the triggers.")
+class SearchIndexRepairTests(TestCase):
+    def setUp(self):
+        self.discipline = create_study_plan("search-repair", activities=0)[Discipline]
+
+    def indexed_activities(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM search_entry WHERE kind = 'activity' ORDER BY name"
+            )
+            return [name for (name,) in cursor.fetchall()]
+
+    def test_migrate_rebuilds_an_index_missing_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER search_entry_activity_insert")
+
+        Activity.objects.create(name="Unindexed", discipline=self.discipline)
+        self.assertEqual([], self.indexed_activities())
+
+        app_config = apps.get_app_config("activity")
+        post_migrate.send(
+            sender=app_config,
+            app_config=app_config,
+            verbosity=0,
+            interactive=False,
+            using=DEFAULT_DB_ALIAS,
+            apps=apps,
+            plan=[],
+        )
+        Activity.objects.create(name="Indexed", discipline=self.discipline)
+
+        self.assertEqual(["Indexed", "Unindexed"], self.indexed_activities())
+
+    def test_complete_index_is_left_alone(self):
+        self.assertFalse(repair_search_index(connection))
@@ -0,0 +1,11 @@
+from rest_framework.routers import DefaultRouter
+from django.urls import path, include
+from apps.search.views import SearchViewSet
+
+router = DefaultRouter()
+
+router.register(r"search", SearchViewSet, basename="search")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,111 @@
+import base64
+import json
+from typing import List, Optional
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.viewsets import GenericViewSet
+from apps.search.backends import Position, get_search_backend, parse_terms
+from apps.search.index import KINDS
+from on_way_study.pagination import KeysetCursorPagination
+from security.authentication import (
+    OnWayStudyBaseAuthentication,
+    OnWayStudyTokenAuthentication,
+)
+
+
+class SearchViewSet(GenericViewSet):
+    """
+    Searches the names of the request user's whole study plan.
+
+    `GET search/?q=<text>&kind=<kinds>&page_size=<n>&cursor=<cursor>`
+
+    `q` matches the names, the course acronyms and the discipline extra
+    information; every word is required and the last one may be incomplete.
+    `kind` restricts the results to some of `institution`, `course`,
+    `discipline` and `activity`, comma separated. The results are ranked, best
+    first, and their `match` tells whether they were found by the full-text
+    search or, when it found nothing, by name similarity. Pages only go
+    forward, through `next`.
+    """
+
+    query_budgets = {"list": 2}
+    authentication_classes = [
+        OnWayStudyTokenAuthentication,
+        OnWayStudyBaseAuthentication,
+    ]
+    pagination_class = KeysetCursorPagination
+
+    def list(self, request: Request, *args, **kwargs):
+        terms = parse_terms(request.query_params.get("q", ""))
+
+        if not terms:
+            raise ValidationError({"q": "At least one word is required."})
+
+        kinds = self._get_kinds(request)
+        page_size = self.paginator.get_page_size(request)
+        position = self._decode_cursor(request)
+        rows, match = get_search_backend().search(
+            request.user.pk, terms, kinds, position, page_size + 1
+        )
+        next_link = None
+
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_link = self._encode_cursor(
+                request, (match, rows[-1]["score"], rows[-1]["entry_id"])
+            )
+
+        return Response(
+            {
+                "next": next_link,
+                "previous": None,
+                "results": [
+                    {
+                        "kind": row["kind"],
+                        "id": int(row["object_id"]),
+                        "name": row["name"],
+                        "detail": row["detail"],
+                        "score": row["score"],
+                        "match": match,
+                    }
+                    for row in rows
+                ],
+            }
+        )
+
+    def _get_kinds(self, request: Request) -> List[str]:
+        value = request.query_params.get("kind")
+
+        if not value:
+            return list(KINDS)
+
+        kinds = value.split(",")
+        invalid = [kind for kind in kinds if kind not in KINDS]
+
+        if invalid:
+            raise ValidationError({"kind": f'"{invalid[0]}" is not a valid choice.'})
+
+        return kinds
+
+    def _encode_cursor(self, request: Request, position: Position) -> str:
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+        return replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+
+    def _decode_cursor(self, request: Request) -> Optional[Position]:
+        """
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        cursor = request.query_params.get("cursor")
+
+        if not cursor:
+            return None
+
+        try:
+            match, score, entry_id = json.loads(base64.urlsafe_b64decode(cursor))
+            return str(match), float(score), int(entry_id)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor.")
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class UserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.user"
+
+    def ready(self):
+        from on_way_study.checks import (
+            check_database_pool_driver,
+            check_shared_cache_backends,
+        )
+
+        checks.register(check_shared_cache_backends, checks.Tags.caches, deploy=True)
+        checks.register(check_database_pool_driver, checks.Tags.database)
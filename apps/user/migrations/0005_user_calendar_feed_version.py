@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0004_rename_senha_user_password"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="calendar_feed_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -7,6 +7,8 @@ class User(models.Model):
     password = models.CharField(max_length=255)
     created_at = models.DateTimeField(blank=True, default=get_timezone)
     updated_at = models.DateTimeField(blank=True, null=True)
+    # Bumped to revoke every calendar feed token issued so far.
+    calendar_feed_version = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = "user"
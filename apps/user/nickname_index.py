@@ -0,0 +1,352 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import connection
+from apps.user.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings backed by a `bytearray`.
+
+    It never returns a false negative: `might_contain` returning False means the
+    value was never added. A True answer means "maybe present" and must be confirmed
+    elsewhere.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.false_positive_rate = false_positive_rate
+        self.size_in_bits = max(
+            8,
+            math.ceil(
+                -self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)
+            ),
+        )
+        self.hash_count = max(1, round(self.size_in_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray(math.ceil(self.size_in_bits / 8))
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def might_contain(self, value: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def estimated_false_positive_rate(self) -> float:
+        """
+        Returns the expected false-positive rate for the number of values added so far.
+        """
+        return (
+            1 - math.exp(-self.hash_count * self.count / self.size_in_bits)
+        ) ** self.hash_count
+
+    def memory_footprint(self) -> int:
+        """Returns the size, in bytes, of the bit array."""
+        return len(self._bits)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size_in_bits
+
+
+class NicknameIndex:
+    """
+    Per-process index of existing nicknames used to answer availability checks.
+
+    The Bloom filter is built from the database by a background thread, started
+    with the server (see `on_way_study.wsgi` and `on_way_study.asgi`) or on first
+    use, and kept current by `UserSerializer` (create and rename) and `UserViewSet`
+    (destroy). Because Bloom filters cannot forget values, renamed and deleted
+    nicknames stay as "maybe present" until the next rebuild; the filter is rebuilt
+    when they pile up, when it grows past its capacity, or after `REBUILD_INTERVAL`
+    seconds so that users created by other processes are eventually seen.
+
+    Requests never wait for a build: the current filter keeps answering while
+    the next one is built, and the new filter is swapped in under the lock once
+    the nicknames taken meanwhile are added to it. Until the first build ends,
+    every check consults the database.
+
+    A failed build is logged and the next one waits `retry_backoff` seconds,
+    doubled after each consecutive failure up to `rebuild_interval`, so a
+    database outage does not start a build on every request.
+
+    Only a "maybe present" answer consults the database, so the common case of a
+    free nickname is answered from memory.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100000,
+        false_positive_rate: float = 0.01,
+        rebuild_interval: float = 300.0,
+        retry_backoff: float = 5.0,
+    ):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_interval = rebuild_interval
+        self.retry_backoff = retry_backoff
+        self.lookups = 0
+        self.database_checks = 0
+        self.false_positives = 0
+        self.build_failures = 0
+        self.last_build_error: Optional[str] = None
+        self._filter = None
+        self._stale = 0
+        self._built_at = 0.0
+        self._building = False
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+        self._taken_during_build: List[str] = []
+        self._released_during_build = 0
+        self._lock = threading.Lock()
+
+    def is_available(self, nickname: str) -> bool:
+        """
+        Checks if a nickname is free to be used.
+
+        Args:
+            nickname: The nickname to check.
+
+        Returns:
+            bool: True if no user has this nickname, otherwise False.
+        """
+        bloom_filter = self._get_filter()
+
+        if bloom_filter is None:
+            return not User.objects.filter(nickname=nickname).exists()
+
+        maybe_taken = bloom_filter.might_contain(nickname)
+
+        with self._lock:
+            self.lookups += 1
+
+            if maybe_taken:
+                self.database_checks += 1
+
+        if not maybe_taken:
+            return True
+
+        if User.objects.filter(nickname=nickname).exists():
+            return False
+
+        with self._lock:
+            self.false_positives += 1
+
+        return True
+
+    def add(self, nickname: str):
+        """
+        Records a nickname that has just been taken.
+
+        Args:
+            nickname: The created or renamed-to nickname.
+        """
+        with self._lock:
+            if self._building:
+                self._taken_during_build.append(nickname)
+
+            if self._filter is None:
+                return
+
+            self._filter.add(nickname)
+
+            if self._filter.count > self._filter.capacity:
+                self._built_at = -math.inf
+
+    def discard(self, nickname: str):
+        """
+        Records a nickname that has just been released by a rename or a delete.
+
+        Args:
+            nickname: The released nickname.
+        """
+        with self._lock:
+            if self._building:
+                self._released_during_build += 1
+
+            if self._filter is None:
+                return
+
+            self._stale += 1
+
+            if self._stale > self._filter.count // 10:
+                self._built_at = -math.inf
+
+    def rebuild(self):
+        """
+        Builds a new filter from the database in the calling thread and swaps it in.
+
+        Raises:
+            DatabaseError: If the nicknames cannot be read. The failure is
+                recorded like the failures of the background builds.
+        """
+        with self._lock:
+            self._start_build()
+
+        self._finish_build()
+
+    def start_background_build(self):
+        """
+        Starts building a new filter in a background thread, unless a build is running.
+        """
+        with self._lock:
+            if self._building:
+                return
+
+            self._start_build()
+
+        self._start_build_thread()
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Returns the index size, memory footprint and false-positive rates.
+
+        Returns:
+            A dictionary with the filter parameters, the expected false-positive rate
+            and the false-positive rate observed on the database checks, plus the
+            failed builds. The filter parameters are None until the first build ends.
+        """
+        bloom_filter = self._get_filter()
+
+        with self._lock:
+            lookups = self.lookups
+            database_checks = self.database_checks
+            false_positives = self.false_positives
+            build_failures = self.build_failures
+            last_build_error = self.last_build_error
+
+        free_lookups = lookups - (database_checks - false_positives)
+
+        return {
+            "nicknames": bloom_filter and bloom_filter.count,
+            "capacity": bloom_filter and bloom_filter.capacity,
+            "size_in_bits": bloom_filter and bloom_filter.size_in_bits,
+            "hash_count": bloom_filter and bloom_filter.hash_count,
+            "memory_bytes": bloom_filter and bloom_filter.memory_footprint(),
+            "estimated_false_positive_rate": (
+                bloom_filter and bloom_filter.estimated_false_positive_rate()
+            ),
+            "lookups": lookups,
+            "database_checks": database_checks,
+            "false_positives": false_positives,
+            "observed_false_positive_rate": (
+                false_positives / free_lookups if free_lookups else 0.0
+            ),
+            "build_failures": build_failures,
+            "last_build_error": last_build_error,
+        }
+
+    def _get_filter(self) -> Optional[BloomFilter]:
+        """
+        Returns the current filter, starting a background rebuild when it is due.
+
+        No rebuild starts before `_retry_at` after a failed build.
+        """
+        with self._lock:
+            now = time.monotonic()
+            expired = now - self._built_at > self.rebuild_interval
+            due = (self._filter is None or expired) and now >= self._retry_at
+            start = due and not self._building
+            bloom_filter = self._filter
+
+            if start:
+                self._start_build()
+
+        if start:
+            self._start_build_thread()
+
+        return bloom_filter
+
+    def _start_build(self):
+        self._building = True
+        self._taken_during_build = []
+        self._released_during_build = 0
+
+    def _start_build_thread(self):
+        threading.Thread(
+            target=self._build_in_background,
+            name="nickname-index-build",
+            daemon=True,
+        ).start()
+
+    def _finish_build(self):
+        try:
+            bloom_filter = self._build()
+        except Exception as e:
+            with self._lock:
+                self._building = False
+                self._record_failure(e)
+
+            raise
+
+        with self._lock:
+            self._building = False
+
+            for nickname in self._taken_during_build:
+                bloom_filter.add(nickname)
+
+            self._filter = bloom_filter
+            self._stale = self._released_during_build
+            self._built_at = time.monotonic()
+            self._consecutive_failures = 0
+            self._retry_at = 0.0
+
+    def _record_failure(self, error: Exception):
+        self.build_failures += 1
+        self.last_build_error = f"{type(error).__name__}: {error}"
+        self._consecutive_failures += 1
+        self._retry_at = time.monotonic() + min(
+            self.retry_backoff * 2 ** (self._consecutive_failures - 1),
+            self.rebuild_interval,
+        )
+
+    def _build_in_background(self):
+        try:
+            self._finish_build()
+        except Exception:
+            logger.exception(
+                "The nickname index build failed; retrying in %.0f seconds.",
+                self._retry_at - time.monotonic(),
+            )
+        finally:
+            connection.close()
+
+    def _build(self) -> BloomFilter:
+        total = User.objects.count()
+        bloom_filter = BloomFilter(
+            max(self.capacity, total * 2), self.false_positive_rate
+        )
+
+        for nickname in User.objects.values_list("nickname", flat=True).iterator(
+            chunk_size=5000
+        ):
+            bloom_filter.add(nickname)
+
+        return bloom_filter
+
+
+_index_settings = getattr(settings, "ON_WAY_STUDY_NICKNAME_INDEX", {})
+
+nickname_index = NicknameIndex(
+    capacity=_index_settings.get("CAPACITY", 100000),
+    false_positive_rate=_index_settings.get("FALSE_POSITIVE_RATE", 0.01),
+    rebuild_interval=_index_settings.get("REBUILD_INTERVAL", 300),
+    retry_backoff=_index_settings.get("RETRY_BACKOFF", 5),
+)
@@ -1,12 +1,18 @@
 import random
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
 from .models import User
-from django.contrib.auth.hashers import make_password
+from .nickname_index import nickname_index
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import IntegrityError, transaction
 from typing import List, Dict
-from environment import get_timezone
+from environment import get_modification_time
+from on_way_study.metrics import TimedSerializerMixin
+from security import tokens
+from security.credential_cache import credential_cache
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -19,11 +25,24 @@ class UserSerializer(serializers.ModelSerializer):
             },
         }
 
+    SUGGESTIONS_COUNT = 5
+    SUGGESTIONS_BATCH_SIZE = 25
+    SUGGESTIONS_MAX_BATCHES = 3
+
     def create(self, validated_data):
         self._validate_nickname(validated_data)
         self._validate_password(validated_data)
+        validated_data["updated_at"] = get_modification_time()
+
+        try:
+            with transaction.atomic():
+                instance = self.Meta.model.objects.create(**validated_data)
+        except IntegrityError:
+            self._raise_nickname_taken(validated_data["nickname"])
+
+        nickname_index.add(instance.nickname)
 
-        return self.Meta.model.objects.create(**validated_data)
+        return instance
 
     def update(self, instance, validated_data):
         if "password" in validated_data:
@@ -32,9 +51,33 @@ class UserSerializer(serializers.ModelSerializer):
         if "nickname" in validated_data:
             self._validate_nickname(validated_data)
 
-        validated_data["updated_at"] = get_timezone()
+        credentials_changed = (
+            "password" in validated_data or "nickname" in validated_data
+        )
+        previous_nickname = instance.nickname
+        validated_data["updated_at"] = get_modification_time()
+        previous_values = {field: getattr(instance, field) for field in validated_data}
+
+        try:
+            with transaction.atomic():
+                instance = super().update(instance, validated_data)
+        except IntegrityError:
+            for field, value in previous_values.items():
+                setattr(instance, field, value)
+
+            if validated_data.get("nickname", previous_nickname) == previous_nickname:
+                raise
+
+            self._raise_nickname_taken(validated_data["nickname"])
 
-        return super().update(instance, validated_data)
+        if credentials_changed:
+            credential_cache.invalidate(previous_nickname)
+
+        if instance.nickname != previous_nickname:
+            nickname_index.add(instance.nickname)
+            nickname_index.discard(previous_nickname)
+
+        return instance
 
     def _validate_password(self, validated_data: Dict[str, str]):
         """
@@ -59,17 +102,17 @@ class UserSerializer(serializers.ModelSerializer):
 
     def _validate_nickname(self, validated_data: Dict[str, str]):
         """
-        Validates if the nickname already exists and offers suggestions.
+        Validates that the nickname has been provided.
 
-        If the nickname is already in use, it calls the
-        _build_nicknames_suggestions method to generate alternatives
-        and raises a validation exception with these suggestions.
+        Uniqueness is not checked here: it is enforced by the unique index on
+        `user.nickname` when the row is written, which avoids a race between
+        the check and the insert (see `_raise_nickname_taken`).
 
         Args:
             validated_data: The dictionary of validated data from the serializer.
 
         Raises:
-            serializers.ValidationError: If the nickname already exists or is empty.
+            serializers.ValidationError: If the nickname is empty.
         """
         nickname = validated_data.get("nickname")
 
@@ -80,21 +123,31 @@ class UserSerializer(serializers.ModelSerializer):
                 }
             )
 
-        if User.objects.filter(nickname=nickname).exists():
-            raise serializers.ValidationError(
-                {
-                    "nickname": "This nickname already exists. Try one of these:",
-                    "suggestions": self._build_nicknames_suggestions(nickname),
-                }
-            )
+    def _raise_nickname_taken(self, nickname: str):
+        """
+        Raises the validation error for a nickname that already exists, with suggestions.
+
+        Args:
+            nickname: The nickname rejected by the unique constraint.
+
+        Raises:
+            serializers.ValidationError: Always.
+        """
+        raise serializers.ValidationError(
+            {
+                "nickname": "This nickname already exists. Try one of these:",
+                "suggestions": self._build_nicknames_suggestions(nickname),
+            }
+        )
 
     def _build_nicknames_suggestions(self, nickname: str) -> List[str]:
         """
         Generates a list of unique nicknames as suggestions.
 
-        It searches for nicknames by concatenating the original name with a random
-        numeric suffix and checks if the generated suggestion already
-        exists in the database before adding it to the list.
+        It builds a batch of candidates by concatenating the original name with
+        random numeric suffixes and checks the whole batch against the database
+        with a single `nickname__in` query. Another batch is only tried when the
+        first one does not yield enough free nicknames.
 
         Args:
             nickname: The original nickname that already exists.
@@ -102,19 +155,90 @@ class UserSerializer(serializers.ModelSerializer):
         Returns:
             A list of up to 5 strings with suggested unique nicknames.
         """
-        generated_suggestions = set()
-        attempts = 0
+        max_length = User._meta.get_field("nickname").max_length
+        base = nickname[: max_length - 3]
+        suffixes = list(range(100, 1000))
+        random.shuffle(suffixes)
+        generated_suggestions = []
+
+        for batch in range(self.SUGGESTIONS_MAX_BATCHES):
+            offset = batch * self.SUGGESTIONS_BATCH_SIZE
+            candidates = [
+                f"{base}{suffix}"
+                for suffix in suffixes[offset : offset + self.SUGGESTIONS_BATCH_SIZE]
+            ]
+            taken = set(
+                User.objects.filter(nickname__in=candidates).values_list(
+                    "nickname", flat=True
+                )
+            )
+            generated_suggestions += [c for c in candidates if c not in taken]
+
+            if len(generated_suggestions) >= self.SUGGESTIONS_COUNT:
+                break
+
+        return generated_suggestions[: self.SUGGESTIONS_COUNT]
 
-        while len(generated_suggestions) < 5 and attempts < 100:
-            random_suffix = random.randint(100, 999)
-            new_nickname = f"{nickname}{random_suffix}"
 
-            if (
-                new_nickname not in generated_suggestions
-                and not User.objects.filter(nickname=new_nickname).exists()
-            ):
-                generated_suggestions.add(new_nickname)
+class TokenObtainSerializer(serializers.Serializer):
+    nickname = serializers.CharField()
+    password = serializers.CharField(write_only=True, style={"input_type": "password"})
+
+    def validate(self, attrs):
+        """
+        Exchanges a nickname and password for a pair of signed tokens.
+
+        Args:
+            attrs: The dictionary with the `nickname` and `password` fields.
+
+        Raises:
+            AuthenticationFailed: If the user does not exist or the password is incorrect.
+
+        Returns:
+            The dictionary with the issued `access` and `refresh` tokens.
+        """
+        nickname, password = attrs["nickname"], attrs["password"]
+        cache_key = credential_cache.build_key(nickname, password)
+        user = credential_cache.get(cache_key)
+
+        if user is None:
+            user = User.objects.filter(nickname=nickname).first()
+
+            if user is None or not check_password(password, user.password):
+                raise AuthenticationFailed("Invalid nickname or password.")
+
+            credential_cache.set(cache_key, user)
+
+        return tokens.issue_tokens(user)
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        """
+        Exchanges a refresh token for a new pair of signed tokens.
+
+        The refresh token is only accepted while the user still exists and its
+        nickname and password have not changed since the token was issued.
+
+        Args:
+            attrs: The dictionary with the `refresh` field.
+
+        Raises:
+            AuthenticationFailed: If the refresh token is invalid, expired or revoked.
+
+        Returns:
+            The dictionary with the issued `access` and `refresh` tokens.
+        """
+        try:
+            payload = tokens.read_token(attrs["refresh"], tokens.REFRESH_TOKEN)
+        except tokens.InvalidToken as e:
+            raise AuthenticationFailed(f"Invalid refresh token. {e}")
+
+        user = User.objects.filter(pk=payload["sub"]).first()
 
-            attempts += 1
+        if user is None or not tokens.is_fingerprint_valid(user, payload["fpr"]):
+            raise AuthenticationFailed("The refresh token has been revoked.")
 
-        return list(generated_suggestions)
+        return tokens.issue_tokens(user)
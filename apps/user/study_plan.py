@@ -0,0 +1,324 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from apps.activity.models import Activity
+from apps.activity.summaries import recompute_grade_summaries
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+RECORD_TYPES = {
+    "institution": (Institution, None, ["name", "created_at", "updated_at"]),
+    "course": (
+        Course,
+        "instituition",
+        ["name", "acronym", "semesters", "created_at", "updated_at"],
+    ),
+    "discipline": (
+        Discipline,
+        "curso",
+        ["name", "extra_information", "created_at", "updated_at"],
+    ),
+    "activity": (
+        Activity,
+        "discipline",
+        ["name", "status", "weight", "result", "date", "created_at", "updated_at"],
+    ),
+}
+PARENT_TYPES = {
+    "course": "institution",
+    "discipline": "course",
+    "activity": "discipline",
+}
+
+CSV_COLUMNS = ["type", "id", "parent"] + list(
+    dict.fromkeys(field for _, _, fields in RECORD_TYPES.values() for field in fields)
+)
+
+
+class StudyPlanImportError(Exception):
+    """Raised when a record of an imported study plan is invalid."""
+
+    def __init__(self, line: int, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+def export_study_plan(user: User, output: str, chunk_size: int = 2000) -> Iterator[str]:
+    """
+    Yields the user's whole study plan as NDJSON lines or CSV rows.
+
+    Institutions come first, then courses, disciplines and activities, so every
+    record refers to a parent that was already emitted. Each level is read with
+    `.values().iterator(chunk_size=...)`, so memory stays flat whatever the size
+    of the plan.
+
+    Args:
+        user: The owner of the study plan.
+        output: `ndjson` or `csv`.
+        chunk_size: How many rows are fetched from the database at a time.
+
+    Returns:
+        An iterator of text chunks, one record per chunk.
+    """
+    if output == CSV:
+        yield _csv_line(CSV_COLUMNS)
+
+    for record in _iter_records(user, chunk_size):
+        if output == CSV:
+            yield _csv_line([_to_text(record.get(column)) for column in CSV_COLUMNS])
+        else:
+            yield json.dumps(record, default=_to_text) + "\n"
+
+
+def parse_study_plan(
+    lines: Iterable[bytes], input_format: str
+) -> Iterator[Tuple[int, dict]]:
+    """
+    Parses an exported study plan incrementally, one record at a time.
+
+    Args:
+        lines: The raw lines of the uploaded document.
+        input_format: `ndjson` or `csv`.
+
+    Raises:
+        StudyPlanImportError: If a line is not UTF-8, is not valid JSON or CSV,
+            or does not hold a record object.
+
+    Returns:
+        An iterator of `(line number, record)` pairs, records in the export
+        layout. The line numbers are those of the document, the CSV header
+        and the blank lines included.
+    """
+    if input_format == CSV:
+        yield from _parse_csv(lines)
+        return
+
+    for number, line in enumerate(lines, start=1):
+        try:
+            text = line.decode("utf-8")
+
+            if not text.strip():
+                continue
+
+            record = json.loads(text)
+        except ValueError as e:
+            raise StudyPlanImportError(number, f"Invalid JSON. {e}")
+
+        if not isinstance(record, dict):
+            raise StudyPlanImportError(number, "The record must be a JSON object.")
+
+        yield number, record
+
+
+class StudyPlanImporter:
+    """
+    Writes parsed study plan records into the user's plan in batched transactions.
+
+    Records are buffered per type and written with `bulk_create` in batches of
+    `BATCH_SIZE`, each batch in its own transaction. The exported ids are only
+    used to link children to their parents: new ids are assigned on import.
+    Institutions whose name already exists for the user are reused, so the
+    `unique_institution_user_name` constraint is respected.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, user: User):
+        self.user = user
+        self.counts = {record_type: 0 for record_type in RECORD_TYPES}
+        self._ids: Dict[str, Dict[int, int]] = {t: {} for t in RECORD_TYPES}
+        self._buffer: List[tuple] = []
+        self._buffer_type = None
+        self._touched_disciplines: Set[int] = set()
+        self._institutions = dict(
+            Institution.objects.filter(user=user).values_list("name", "pk")
+        )
+
+    def run(self, records: Iterable[Tuple[int, dict]]) -> Dict[str, int]:
+        """
+        Imports every record and recomputes the grade summaries it changed.
+
+        Only the disciplines that received activities, and their courses, are
+        recomputed, so importing into a large plan does not rebuild all of it.
+
+        Args:
+            records: The `(line number, record)` pairs, parents before children,
+                as yielded by `parse_study_plan`.
+
+        Raises:
+            StudyPlanImportError: If a record is invalid. The batches written before
+                the invalid record are kept, and their grade summaries recomputed.
+
+        Returns:
+            How many records of each type were imported.
+        """
+        try:
+            for line, record in records:
+                self._add(line, record)
+
+            self._flush()
+        finally:
+            if self._touched_disciplines:
+                recompute_grade_summaries(
+                    Discipline.objects.filter(pk__in=self._touched_disciplines)
+                )
+
+        return self.counts
+
+    def _add(self, line: int, record: dict):
+        record_type = record.get("type")
+
+        if record_type not in RECORD_TYPES:
+            raise StudyPlanImportError(line, f"Unknown record type '{record_type}'.")
+
+        if record_type != self._buffer_type or len(self._buffer) >= self.BATCH_SIZE:
+            self._flush()
+            self._buffer_type = record_type
+
+        instance = self._build(line, record_type, record)
+
+        if instance is not None:
+            self._buffer.append((record.get("id"), instance))
+
+    def _build(self, line: int, record_type: str, record: dict):
+        """Builds and validates the unsaved model instance of a record."""
+        model, parent_field, fields = RECORD_TYPES[record_type]
+        instance = model(
+            **{f: record.get(f) for f in fields if record.get(f) is not None}
+        )
+
+        if parent_field is None:
+            instance.user_id = self.user.pk
+
+            if any(pending.name == instance.name for _, pending in self._buffer):
+                self._flush()
+                self._buffer_type = record_type
+
+            if instance.name in self._institutions:
+                self._ids[record_type][_to_int(record.get("id"))] = self._institutions[
+                    instance.name
+                ]
+                return None
+        else:
+            parent_id = self._ids[PARENT_TYPES[record_type]].get(
+                _to_int(record.get("parent"))
+            )
+
+            if parent_id is None:
+                raise StudyPlanImportError(
+                    line, f"The {record_type} refers to an unknown parent."
+                )
+
+            setattr(instance, f"{parent_field}_id", parent_id)
+            instance.owner_id = self.user.pk
+
+        try:
+            instance.clean_fields(exclude=[parent_field or "user", "owner"])
+        except ValidationError as e:
+            raise StudyPlanImportError(line, e.message_dict)
+
+        return instance
+
+    def _flush(self):
+        if not self._buffer:
+            return
+
+        model = RECORD_TYPES[self._buffer_type][0]
+        instances = [instance for _, instance in self._buffer]
+
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=self.BATCH_SIZE)
+
+        for old_id, instance in self._buffer:
+            self._ids[self._buffer_type][_to_int(old_id)] = instance.pk
+
+            if model is Institution:
+                self._institutions[instance.name] = instance.pk
+            elif model is Activity:
+                self._touched_disciplines.add(instance.discipline_id)
+
+        self.counts[self._buffer_type] += len(self._buffer)
+        self._buffer = []
+
+
+def _parse_csv(lines: Iterable[bytes]) -> Iterator[Tuple[int, dict]]:
+    """
+    Parses CSV lines, numbering each record with the document line it ends on.
+    """
+    decoded = _decode_lines(lines)
+    reader = csv.DictReader(decoded)
+
+    try:
+        for record in reader:
+            yield reader.line_num, {
+                key: (value if value != "" else None) for key, value in record.items()
+            }
+    except csv.Error as e:
+        raise StudyPlanImportError(reader.line_num, f"Invalid CSV. {e}")
+
+
+def _decode_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    for number, line in enumerate(lines, start=1):
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise StudyPlanImportError(number, f"Invalid UTF-8. {e}")
+
+
+def _iter_records(user: User, chunk_size: int) -> Iterator[dict]:
+    for record_type, (model, parent_field, fields) in RECORD_TYPES.items():
+        if parent_field is None:
+            queryset = model.objects.filter(user=user)
+            columns = ["id", *fields]
+        else:
+            queryset = model.objects.filter(owner=user)
+            columns = ["id", f"{parent_field}_id", *fields]
+
+        for row in (
+            queryset.order_by("id").values(*columns).iterator(chunk_size=chunk_size)
+        ):
+            record = {"type": record_type, "id": row.pop("id")}
+
+            if parent_field is not None:
+                record["parent"] = row.pop(f"{parent_field}_id")
+
+            record.update(row)
+            yield record
+
+
+def _csv_line(values: List[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+
+    return buffer.getvalue()
+
+
+def _to_text(value):
+    if value is None:
+        return None
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    if isinstance(value, Decimal):
+        return str(value)
+
+    return value
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
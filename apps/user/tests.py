@@ -0,0 +1,383 @@
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import DatabaseError, IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+import csv
+import io
+import json
+from apps.activity.models import Activity
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+from apps.user.nickname_index import NicknameIndex
+from apps.user.serializers import UserSerializer
+from on_way_study.testing import ApiTestCase, create_study_plan
+from apps.user.study_plan import (
+    CSV,
+    CSV_COLUMNS,
+    NDJSON,
+    StudyPlanImporter,
+    StudyPlanImportError,
+    parse_study_plan,
+)
+
+
+class StudyPlanImporterTests(TestCase):
+    RECORDS = [
+        {"type": "institution", "id": 1, "name": "Institution"},
+        {
+            "type": "course",
+            "id": 1,
+            "parent": 1,
+            "name": "Course",
+            "acronym": "C",
+            "semesters": 2,
+        },
+        {"type": "discipline", "id": 1, "parent": 1, "name": "Discipline"},
+        {
+            "type": "activity",
+            "id": 1,
+            "parent": 1,
+            "name": "Graded",
+            "status": "COMPLETED",
+            "weight": "2.00",
+            "result": "8.00",
+        },
+        {"type": "activity", "id": 2, "parent": 1, "name": "Pending"},
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create(nickname="importer", password="x")
+
+    def test_import_computes_the_grade_summaries(self):
+        counts = StudyPlanImporter(self.user).run(enumerate(self.RECORDS, start=1))
+        discipline = Discipline.objects.get(owner=self.user)
+
+        self.assertEqual(2, counts["activity"])
+        self.assertEqual((1, 1), (discipline.completed_count, discipline.pending_count))
+        self.assertEqual(Decimal("8.00"), discipline.weighted_grade)
+
+    def test_partial_import_recomputes_the_grade_summaries_of_the_written_batches(
+        self,
+    ):
+        importer = StudyPlanImporter(self.user)
+        importer.BATCH_SIZE = 1
+        records = self.RECORDS + [
+            {"type": "activity", "id": 3, "parent": 99, "name": "Orphan"}
+        ]
+
+        with self.assertRaises(StudyPlanImportError) as raised:
+            importer.run(enumerate(records, start=1))
+
+        discipline = Discipline.objects.select_related("curso").get(owner=self.user)
+
+        self.assertEqual(6, raised.exception.line)
+        self.assertEqual(2, discipline.activities.count())
+        self.assertEqual((1, 1), (discipline.completed_count, discipline.pending_count))
+        self.assertEqual(Decimal("2.00"), discipline.total_weight)
+        self.assertEqual(Decimal("16.0000"), discipline.curso.weighted_result_sum)
+
+    def ndjson_lines(self, records):
+        return [json.dumps(record).encode() + b"\n" for record in records]
+
+    def csv_lines(self, records):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(records)
+
+        return [line.encode() for line in buffer.getvalue().splitlines(keepends=True)]
+
+    def import_lines(self, lines, input_format):
+        with self.assertRaises(StudyPlanImportError) as raised:
+            StudyPlanImporter(self.user).run(parse_study_plan(lines, input_format))
+
+        return raised.exception.line
+
+    def test_undecodable_lines_are_reported_with_their_number(self):
+        for input_format, lines in (
+            (NDJSON, self.ndjson_lines(self.RECORDS[:2])),
+            (CSV, self.csv_lines(self.RECORDS[:2])),
+        ):
+            with self.subTest(input_format=input_format):
+                lines.insert(2, b'{"type": "discipline", "name": "\xff"}\n')
+
+                self.assertEqual(3, self.import_lines(lines, input_format))
+
+    def test_records_that_are_not_objects_are_rejected(self):
+        for record in (b"[1, 2]\n", b'"institution"\n', b"null\n"):
+            with self.subTest(record=record):
+                lines = self.ndjson_lines(self.RECORDS[:1]) + [b"\n", record]
+
+                self.assertEqual(3, self.import_lines(lines, NDJSON))
+
+    def test_csv_errors_report_the_document_line(self):
+        lines = self.csv_lines(
+            self.RECORDS[:3] + [{"type": "activity", "id": 3, "parent": 99}]
+        )
+
+        self.assertEqual(5, self.import_lines(lines, CSV))
+
+    def test_import_only_recomputes_the_disciplines_it_touched(self):
+        StudyPlanImporter(self.user).run(enumerate(self.RECORDS, start=1))
+        existing = Discipline.objects.get(owner=self.user)
+        Discipline.objects.filter(pk=existing.pk).update(pending_count=42)
+        records = [
+            dict(record, name=f"Other {record['name']}") for record in self.RECORDS
+        ]
+
+        StudyPlanImporter(self.user).run(enumerate(records, start=1))
+
+        self.assertEqual(42, Discipline.objects.get(pk=existing.pk).pending_count)
+        self.assertEqual(
+            1,
+            Discipline.objects.exclude(pk=existing.pk)
+            .get(owner=self.user)
+            .pending_count,
+        )
+
+
+class NicknameIndexTests(TestCase):
+    def setUp(self):
+        User.objects.create(nickname="taken", password="x")
+        self.index = NicknameIndex(capacity=100)
+        self.thread = self.enterContext(
+            mock.patch("apps.user.nickname_index.threading.Thread")
+        )
+
+    def test_checks_do_not_wait_for_the_first_build(self):
+        with self.assertNumQueries(2):
+            self.assertFalse(self.index.is_available("taken"))
+            self.assertTrue(self.index.is_available("free"))
+
+        self.thread.return_value.start.assert_called_once_with()
+
+    def test_expired_filter_answers_while_rebuilding(self):
+        self.index.rebuild()
+        self.index.rebuild_interval = 0
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.index.is_available("free"))
+
+        self.thread.return_value.start.assert_called_once_with()
+        self.assertEqual((1, 0), (self.index.lookups, self.index.database_checks))
+
+    def test_rebuild_keeps_the_nicknames_taken_meanwhile(self):
+        build = self.index._build
+
+        def build_while_taking():
+            bloom_filter = build()
+            self.index.add("taken-meanwhile")
+            return bloom_filter
+
+        with mock.patch.object(self.index, "_build", build_while_taking):
+            self.index.rebuild()
+
+        self.assertTrue(self.index._filter.might_contain("taken"))
+        self.assertTrue(self.index._filter.might_contain("taken-meanwhile"))
+
+    def test_failed_build_is_logged_and_retried_after_a_backoff(self):
+        self.index.retry_backoff = 5
+        self.enterContext(mock.patch("apps.user.nickname_index.connection"))
+        clock = self.enterContext(
+            mock.patch("apps.user.nickname_index.time.monotonic", return_value=1000)
+        )
+
+        def check_and_run_build():
+            self.assertTrue(self.index.is_available("free"))
+            self.thread.call_args.kwargs["target"]()
+
+        with mock.patch.object(
+            self.index, "_build", side_effect=DatabaseError("unreachable")
+        ):
+            with self.assertLogs("apps.user.nickname_index", "ERROR"):
+                check_and_run_build()
+
+            self.index.is_available("free")
+            self.assertEqual(1, self.thread.return_value.start.call_count)
+
+            clock.return_value = 1005
+            with self.assertLogs("apps.user.nickname_index", "ERROR"):
+                check_and_run_build()
+
+        self.assertEqual(2, self.index.build_failures)
+        self.assertEqual("DatabaseError: unreachable", self.index.last_build_error)
+
+        clock.return_value = 1014
+        self.index.is_available("free")
+        self.assertEqual(2, self.thread.return_value.start.call_count)
+
+        clock.return_value = 1015
+        check_and_run_build()
+        self.assertIsNotNone(self.index._filter)
+        self.assertEqual(0, self.index._retry_at)
+
+
+class NicknameAvailabilityStatsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(nickname="operator", password="x")
+
+    def test_stats_are_restricted_to_staff(self):
+        client = self.api_client(self.user)
+
+        self.assertEqual(403, client.get("/api/users/availability/stats/").status_code)
+
+        with override_settings(ON_WAY_STUDY_STAFF={"NICKNAMES": ["operator"]}):
+            response = client.get("/api/users/availability/stats/")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(0, response.json()["build_failures"])
+
+
+class UserSerializerUpdateTests(TestCase):
+    def setUp(self):
+        User.objects.create(nickname="taken", password="x")
+        self.user = User.objects.create(
+            nickname="renaming", password=make_password("old-password")
+        )
+
+    def update(self, data):
+        serializer = UserSerializer(self.user, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.save()
+
+    def test_taken_nickname_restores_every_assigned_field(self):
+        with self.assertRaises(serializers.ValidationError) as raised:
+            self.update({"nickname": "taken", "password": "new-password"})
+
+        self.assertIn("suggestions", raised.exception.detail)
+        self.assertEqual("renaming", self.user.nickname)
+        self.assertTrue(check_password("old-password", self.user.password))
+        self.assertIsNone(self.user.updated_at)
+
+    def test_other_integrity_errors_are_not_reported_as_a_taken_nickname(self):
+        update = mock.patch(
+            "rest_framework.serializers.ModelSerializer.update",
+            side_effect=IntegrityError("another constraint"),
+        )
+
+        for data in ({"password": "new-password"}, {"nickname": "renaming"}):
+            with self.subTest(data=data), update:
+                with self.assertRaises(IntegrityError):
+                    self.update(data)
+
+                self.assertTrue(check_password("old-password", self.user.password))
+
+    def test_suggestions_are_free_and_checked_in_few_batches(self):
+        User.objects.bulk_create(
+            User(nickname=f"taken{suffix}", password="x") for suffix in range(100, 140)
+        )
+
+        with mock.patch("apps.user.serializers.random.shuffle"):
+            with CaptureQueriesContext(connection) as queries:
+                suggestions = UserSerializer()._build_nicknames_suggestions("taken")
+
+        batches = [q for q in queries.captured_queries if " IN (" in q["sql"]]
+
+        self.assertLessEqual(len(batches), UserSerializer.SUGGESTIONS_MAX_BATCHES)
+        self.assertEqual(UserSerializer.SUGGESTIONS_COUNT, len(suggestions))
+        self.assertFalse(User.objects.filter(nickname__in=suggestions).exists())
+
+
+class StudyPlanTreeTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("tree", activities=2)
+        self.client = self.api_client(self.plan[User])
+
+    def grow(self, institutions: int):
+        user = self.plan[User]
+        offset = Institution.objects.filter(user=user).count()
+        created = Institution.objects.bulk_create(
+            Institution(name=f"Grown {offset + i}", user=user)
+            for i in range(institutions)
+        )
+        courses = Course.objects.bulk_create(
+            Course(name="C", acronym="C", semesters=2, instituition=i, owner=user)
+            for i in created
+        )
+        disciplines = Discipline.objects.bulk_create(
+            Discipline(name="D", curso=course, owner=user) for course in courses
+        )
+        Activity.objects.bulk_create(
+            Activity(name=f"A{i}", discipline=discipline, owner=user)
+            for discipline in disciplines
+            for i in range(3)
+        )
+
+    def get_tree(self, **params):
+        response = self.client.get("/api/users/tree/tree/", params)
+
+        if response.streaming:
+            return json.loads(b"".join(response.streaming_content))
+
+        return response.json()
+
+    def test_query_count_does_not_grow_with_the_plan(self):
+        for params in ({}, {"stream": "true"}):
+            with self.subTest(params=params):
+                with self.assertNumQueries(4):
+                    self.get_tree(**params)
+
+                self.grow(10)
+
+                with self.assertNumQueries(4):
+                    tree = self.get_tree(**params)
+
+                self.assertEqual(
+                    Activity.objects.filter(owner=self.plan[User]).count(),
+                    sum(
+                        len(discipline["activities"])
+                        for institution in tree["institutions"]
+                        for course in institution["courses"]
+                        for discipline in course["disciplines"]
+                    ),
+                )
+
+    def test_payload_nests_every_level(self):
+        tree = self.get_tree()
+        institution = tree["institutions"][0]
+        course = institution["courses"][0]
+        discipline = course["disciplines"][0]
+
+        self.assertEqual("tree", tree["nickname"])
+        self.assertEqual(
+            {"id", "name", "created_at", "updated_at", "courses"}, set(institution)
+        )
+        self.assertEqual(self.plan[Course].pk, course["id"])
+        self.assertEqual(self.plan[Discipline].pk, discipline["id"])
+        self.assertEqual(
+            {
+                "id",
+                "name",
+                "status",
+                "weight",
+                "result",
+                "date",
+                "created_at",
+                "updated_at",
+            },
+            set(discipline["activities"][0]),
+        )
+        self.assertEqual(2, len(discipline["activities"]))
+
+    def test_depth_drops_the_lower_levels(self):
+        for depth, params in ((1, {}), (2, {"stream": "true"})):
+            with self.subTest(depth=depth, **params):
+                tree = self.get_tree(depth=depth, **params)
+                institution = tree["institutions"][0]
+
+                if depth == 1:
+                    self.assertNotIn("courses", institution)
+                else:
+                    self.assertNotIn("disciplines", institution["courses"][0])
+
+        self.assertEqual(
+            400, self.client.get("/api/users/tree/tree/", {"depth": 5}).status_code
+        )
@@ -1,10 +1,11 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from apps.user.views import UserViewSet
+from apps.user.views import UserViewSet, TokenViewSet
 
 router = DefaultRouter()
 
 router.register(r"users", UserViewSet, basename="user")
+router.register(r"tokens", TokenViewSet, basename="token")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,3 +1,4 @@
+import json
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.mixins import (
     CreateModelMixin,
@@ -5,12 +6,61 @@ from rest_framework.mixins import (
     UpdateModelMixin,
     DestroyModelMixin,
 )
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from rest_framework.parsers import BaseParser
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.status import HTTP_200_OK
+from apps.activity.models import Activity
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.institution.serializers import InstitutionTreeSerializer
 from apps.user.models import User
-from apps.user.serializers import UserSerializer
-from security.authentication import OnWayStudyBaseAuthentication
+from apps.user.nickname_index import nickname_index
+from apps.user.study_plan import (
+    CSV,
+    NDJSON,
+    StudyPlanImporter,
+    StudyPlanImportError,
+    export_study_plan,
+    parse_study_plan,
+)
+from apps.user.serializers import (
+    UserSerializer,
+    TokenObtainSerializer,
+    TokenRefreshSerializer,
+)
+from on_way_study.async_views import AsyncReadView
+from on_way_study.conditional import ConditionalRetrieveMixin
+from on_way_study.response_cache import response_cache
+from security.authentication import (
+    OnWayStudyBaseAuthentication,
+    OnWayStudyTokenAuthentication,
+)
+from security.credential_cache import credential_cache
+from security.permissions import IsStaff
+
+
+class UserAsyncReadView(AsyncReadView):
+    """Async retrieve of `UserViewSet`, only allowed for the user itself."""
+
+    serializer_class = UserSerializer
+    lookup_field = "nickname"
+
+    def get_queryset(self, request):
+        return User.objects.all()
+
+    def check_object_permissions(self, request, instance):
+        if instance.pk != request.user.pk:
+            raise PermissionDenied("You do not have permission to perform this action.")
 
 
 class UserViewSet(
+    ConditionalRetrieveMixin,
     GenericViewSet,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -20,4 +70,258 @@ class UserViewSet(
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = "nickname"
-    authentication_classes = [OnWayStudyBaseAuthentication]
+    async_read_view = UserAsyncReadView
+    query_budgets = {
+        "retrieve": 1,
+        "tree": 4,
+        "export": 4,
+        "availability": 2,
+        "availability_stats": 2,
+    }
+    authentication_classes = [
+        OnWayStudyTokenAuthentication,
+        OnWayStudyBaseAuthentication,
+    ]
+    TREE_MAX_DEPTH = 4
+    TREE_STREAM_CHUNK_SIZE = 100
+
+    def perform_destroy(self, instance):
+        credential_cache.invalidate(instance.nickname)
+        super().perform_destroy(instance)
+        response_cache.invalidate(instance.pk)
+        nickname_index.discard(instance.nickname)
+
+    @action(detail=True, methods=["get"])
+    def tree(self, request, *args, **kwargs):
+        """
+        Returns the user's whole study plan: institutions, courses, disciplines and activities.
+
+        `GET users/<nickname>/tree/?depth=<1-4>&stream=<true|false>`
+
+        The hierarchy is loaded with one query per level (at most 4 queries),
+        whatever its size. `depth` limits how many levels are returned and
+        `stream=true` streams the JSON document institution by institution, so
+        very large plans are never held in memory at once.
+        """
+        self._check_own_nickname(request, kwargs)
+        depth = self._get_tree_depth(request)
+        institutions = self._get_tree_queryset(request.user, depth)
+        context = {**self.get_serializer_context(), "depth": depth}
+
+        if request.query_params.get("stream", "").lower() in ("1", "true"):
+            return StreamingHttpResponse(
+                self._stream_tree(request.user, institutions, context),
+                content_type="application/json",
+            )
+
+        serializer = InstitutionTreeSerializer(institutions, many=True, context=context)
+
+        return Response(
+            {"nickname": request.user.nickname, "institutions": serializer.data}
+        )
+
+    @action(detail=True, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """
+        Streams the user's whole study plan for backup or migration.
+
+        `GET users/<nickname>/export/?output=<ndjson|csv>`
+
+        Records are emitted parents first (institutions, courses, disciplines and
+        activities), one per line, while they are read from the database.
+        """
+        self._check_own_nickname(request, kwargs)
+        output = request.query_params.get("output", NDJSON)
+
+        if output not in (NDJSON, CSV):
+            raise ValidationError({"output": "The output must be 'ndjson' or 'csv'."})
+
+        content_type = "text/csv" if output == CSV else "application/x-ndjson"
+        response = StreamingHttpResponse(
+            export_study_plan(request.user, output), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{request.user.nickname}-study-plan.{output}"'
+        )
+
+        return response
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[BaseParser],
+    )
+    def import_plan(self, request, *args, **kwargs):
+        """
+        Imports a study plan produced by the export action into the user's plan.
+
+        `POST users/<nickname>/import/` with an NDJSON body, or a CSV body sent as
+        `text/csv`. The body is parsed line by line and written in batched
+        transactions.
+        """
+        self._check_own_nickname(request, kwargs)
+        input_format = CSV if request.content_type.startswith("text/csv") else NDJSON
+        importer = StudyPlanImporter(request.user)
+
+        try:
+            counts = importer.run(parse_study_plan(request.stream or [], input_format))
+        except StudyPlanImportError as e:
+            raise ValidationError(
+                {"line": e.line, "error": e.message, "imported": importer.counts}
+            )
+        finally:
+            response_cache.invalidate(request.user.pk)
+
+        return Response({"imported": counts}, status=HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], authentication_classes=[])
+    def availability(self, request, *args, **kwargs):
+        """
+        Checks if a nickname is free, answering from the in-memory nickname index.
+
+        `GET users/availability/?nickname=<nickname>`
+        """
+        nickname = request.query_params.get("nickname")
+
+        if not nickname:
+            raise ValidationError(
+                {"nickname": "The query parameter 'nickname' is required."}
+            )
+
+        return Response(
+            {"nickname": nickname, "available": nickname_index.is_available(nickname)}
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="availability/stats",
+        permission_classes=[IsStaff],
+    )
+    def availability_stats(self, request, *args, **kwargs):
+        """
+        Reports the nickname index memory footprint, false-positive rates and failed builds.
+
+        `GET users/availability/stats/`, restricted to the staff nicknames.
+        """
+        return Response(nickname_index.stats())
+
+    def _check_own_nickname(self, request, kwargs):
+        """
+        Checks that a detail action targets the authenticated user itself.
+
+        It compares nicknames instead of loading the user, saving a query.
+
+        Raises:
+            PermissionDenied: If the nickname in the URL is not the request user's.
+        """
+        if kwargs[self.lookup_field] != request.user.nickname:
+            raise PermissionDenied("You do not have permission to perform this action.")
+
+    def _get_tree_depth(self, request) -> int:
+        """
+        Reads the `depth` query parameter of the tree action.
+
+        Raises:
+            ValidationError: If the depth is not an integer between 1 and 4.
+
+        Returns:
+            int: How many levels of the hierarchy must be returned.
+        """
+        try:
+            depth = int(request.query_params.get("depth", self.TREE_MAX_DEPTH))
+        except ValueError:
+            depth = 0
+
+        if not 1 <= depth <= self.TREE_MAX_DEPTH:
+            raise ValidationError(
+                {"depth": f"The depth must be between 1 and {self.TREE_MAX_DEPTH}."}
+            )
+
+        return depth
+
+    def _get_tree_queryset(self, user: User, depth: int):
+        """
+        Builds the institutions queryset prefetching the levels below it up to `depth`.
+
+        Args:
+            user: The owner of the study plan.
+            depth: How many levels of the hierarchy must be loaded.
+
+        Returns:
+            The institutions queryset, with one prefetch query per extra level.
+        """
+        levels = [
+            ("courses", Course.objects.all()),
+            ("disciplines", Discipline.objects.all()),
+            ("activities", Activity.objects.all()),
+        ][: depth - 1]
+        prefetch = None
+
+        for related_name, queryset in reversed(levels):
+            queryset = queryset.order_by("created_at", "id")
+
+            if prefetch is not None:
+                queryset = queryset.prefetch_related(prefetch)
+
+            prefetch = Prefetch(related_name, queryset=queryset)
+
+        institutions = Institution.objects.filter(user=user).order_by(
+            "created_at", "id"
+        )
+
+        if prefetch is not None:
+            institutions = institutions.prefetch_related(prefetch)
+
+        return institutions
+
+    def _stream_tree(self, user: User, institutions, context):
+        """
+        Yields the tree JSON document one institution at a time.
+
+        The institutions are read in chunks and the prefetches run per chunk,
+        so memory is bounded by the chunk size rather than by the plan size.
+        """
+        yield f'{{"nickname": {json.dumps(user.nickname)}, "institutions": ['
+        separator = ""
+
+        for institution in institutions.iterator(
+            chunk_size=self.TREE_STREAM_CHUNK_SIZE
+        ):
+            data = InstitutionTreeSerializer(institution, context=context).data
+            yield separator + json.dumps(data, cls=JSONEncoder)
+            separator = ", "
+
+        yield "]}"
+
+
+class TokenViewSet(GenericViewSet):
+    """
+    Issues signed bearer tokens in exchange for the user's nickname and password.
+
+    `POST tokens/` returns a new pair of access and refresh tokens and
+    `POST tokens/refresh/` exchanges a refresh token for a new pair.
+    """
+
+    serializer_class = TokenObtainSerializer
+    authentication_classes = []
+
+    def get_serializer_class(self):
+        if self.action == "refresh":
+            return TokenRefreshSerializer
+
+        return super().get_serializer_class()
+
+    def create(self, request, *args, **kwargs):
+        return self._issue_tokens(request)
+
+    @action(detail=False, methods=["post"])
+    def refresh(self, request, *args, **kwargs):
+        return self._issue_tokens(request)
+
+    def _issue_tokens(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return Response(serializer.validated_data, status=HTTP_200_OK)
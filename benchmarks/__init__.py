@@ -0,0 +1,74 @@
+"""
+Stand-alone benchmarks of the API hot paths.
+
+Each module runs with `python -m benchmarks.<name>` from the project root, using
+the settings in `DJANGO_SETTINGS_MODULE` (`on_way_study.settings` by default).
+"""
+
+import os
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def setup_django(sqlite_path: Optional[str] = None):
+    """
+    Configures Django so that a benchmark can use the ORM outside `manage.py`.
+
+    Args:
+        sqlite_path: Runs against this SQLite database file instead of the
+            database of the settings.
+    """
+    import django
+    from django.conf import settings
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "on_way_study.settings")
+
+    if sqlite_path:
+        settings.DATABASES = {
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": sqlite_path}
+        }
+
+    django.setup()
+
+
+def measure(operation: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """
+    Runs an operation repeatedly and summarizes its latency.
+
+    Args:
+        operation: The callable to time.
+        iterations: How many times to run it.
+
+    Returns:
+        A dictionary with the mean, p50 and p95 latencies in milliseconds and
+        the throughput in operations per second.
+    """
+    timings: List[float] = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+
+    return {
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        "ops_per_s": 1000 / statistics.fmean(timings),
+    }
+
+
+def print_report(title: str, results: Dict[str, Dict[str, float]]):
+    """Prints the results of `measure` as an aligned table."""
+    width = max(len(name) for name in results)
+    print(title)
+    print(f"{'':{width}}  {'mean ms':>9}  {'p50 ms':>9}  {'p95 ms':>9}  {'ops/s':>10}")
+
+    for name, result in results.items():
+        print(
+            f"{name:{width}}  {result['mean_ms']:9.3f}  {result['p50_ms']:9.3f}  "
+            f"{result['p95_ms']:9.3f}  {result['ops_per_s']:10.1f}"
+        )
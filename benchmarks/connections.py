@@ -0,0 +1,58 @@
+"""
+Connection reuse and prepared statement benchmark.
+
+Times the Basic authentication user lookup three ways against the configured
+database:
+
+- new connection: the connection is closed before every lookup, as happens
+  on every request with `CONN_MAX_AGE = 0`;
+- persistent: the same ORM lookup on a reused connection;
+- prepared: the `user_by_nickname` prepared statement on a reused connection.
+
+Usage: `python -m benchmarks.connections [--iterations N] [--nickname NICK]`
+"""
+
+import argparse
+from benchmarks import measure, print_report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--nickname", default="benchmark")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection
+    from apps.user.models import User
+    from security.authentication import user_by_nickname
+
+    def orm_lookup():
+        return User.objects.filter(nickname=args.nickname).first()
+
+    def new_connection_lookup():
+        connection.close()
+        return orm_lookup()
+
+    orm_lookup()
+    user_by_nickname.fetch_one(args.nickname)
+
+    results = {
+        "new connection": measure(new_connection_lookup, args.iterations),
+        "persistent": measure(orm_lookup, args.iterations),
+        "prepared": measure(
+            lambda: user_by_nickname.fetch_one(args.nickname), args.iterations
+        ),
+    }
+
+    print_report(
+        f"User lookup by nickname on {connection.vendor} ({args.iterations} iterations)",
+        results,
+    )
+    saved = results["new connection"]["mean_ms"] - results["persistent"]["mean_ms"]
+    print(f"\nConnect overhead saved per request: {saved:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
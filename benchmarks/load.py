@@ -0,0 +1,466 @@
+"""
+Load benchmark of the API over HTTP.
+
+Boots the WSGI application on a local threaded server (unless `--url` points
+to a running one), seeds users with realistic study plans through the study
+plan importer and drives concurrent clients against the user, institution and
+study plan endpoints, authenticated with Basic credentials (the
+`OnWayStudyBaseAuthentication` path) or bearer tokens. For every scenario it
+reports the throughput, the latency percentiles and the database queries per
+request (read from the `Server-Timing` header), and writes the results as JSON
+so that runs can be compared with `--compare`.
+
+The seeding is deterministic for a given `--seed` and is skipped for users that
+already exist. With the built-in server, the server and the clients share one
+Python process, so only compare runs made the same way.
+
+Usage: `python -m benchmarks.load [--sqlite PATH] [--users N] [--concurrency N]
+[--duration S] [--output FILE] [--compare FILE] [--url URL]`
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import platform
+import random
+import re
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote, urlsplit
+from benchmarks import setup_django
+
+PASSWORD = "load-benchmark"
+INSTITUTIONS = ["IFSP", "USP", "UNICAMP", "UFSCar", "UNESP", "FATEC"]
+COURSES = [("Análise e Desenvolvimento de Sistemas", "ADS"), ("Engenharia", "ENG")]
+STATUSES = ["PENDING", "IN_PROGRESS", "COMPLETED"]
+QUERIES_PATTERN = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def plan_records(rng: random.Random) -> List[dict]:
+    """
+    Builds the records of a study plan in the export layout.
+
+    A plan has 1 to 3 institutions, 1 or 2 courses per institution, 4 to 8
+    disciplines per course and 3 to 10 activities per discipline, two thirds of
+    them graded.
+    """
+    records = []
+    ids = iter(range(1, 1_000_000))
+
+    for name in rng.sample(INSTITUTIONS, rng.randint(1, 3)):
+        institution = next(ids)
+        records.append({"type": "institution", "id": institution, "name": name})
+
+        for course_name, acronym in COURSES[: rng.randint(1, 2)]:
+            course = next(ids)
+            records.append(
+                {
+                    "type": "course",
+                    "id": course,
+                    "parent": institution,
+                    "name": course_name,
+                    "acronym": acronym,
+                    "semesters": rng.choice([6, 8, 10]),
+                }
+            )
+
+            for d in range(rng.randint(4, 8)):
+                discipline = next(ids)
+                records.append(
+                    {
+                        "type": "discipline",
+                        "id": discipline,
+                        "parent": course,
+                        "name": f"Disciplina {d + 1}",
+                    }
+                )
+
+                for a in range(rng.randint(3, 10)):
+                    graded = rng.random() < 2 / 3
+                    records.append(
+                        {
+                            "type": "activity",
+                            "id": next(ids),
+                            "parent": discipline,
+                            "name": f"Atividade {a + 1}",
+                            "status": "COMPLETED" if graded else rng.choice(STATUSES),
+                            "weight": f"{rng.randint(1, 4)}.00",
+                            "result": f"{rng.uniform(0, 10):.2f}" if graded else None,
+                        }
+                    )
+
+    return records
+
+
+def seed_users(users: int, seed: int) -> List[str]:
+    """
+    Creates the benchmark users and their study plans, skipping existing users.
+
+    Args:
+        users: How many users to create.
+        seed: The seed of the generated plans.
+
+    Returns:
+        The nicknames of the benchmark users.
+    """
+    from django.contrib.auth.hashers import make_password
+    from apps.user.models import User
+    from apps.user.study_plan import StudyPlanImporter
+
+    nicknames = [f"load-{seed}-{i}" for i in range(users)]
+    existing = set(
+        User.objects.filter(nickname__in=nicknames).values_list("nickname", flat=True)
+    )
+    password = make_password(PASSWORD)
+
+    for i, nickname in enumerate(nicknames):
+        if nickname not in existing:
+            user = User.objects.create(nickname=nickname, password=password)
+            records = plan_records(random.Random(seed * 100003 + i))
+            StudyPlanImporter(user).run(enumerate(records, start=1))
+
+    return nicknames
+
+
+def start_server():
+    """Serves `WSGI_APPLICATION` on a free local port from a background thread."""
+    from django.core.servers.basehttp import (
+        ThreadedWSGIServer,
+        WSGIRequestHandler,
+        get_internal_wsgi_application,
+    )
+
+    class QuietHandler(WSGIRequestHandler):
+        # Keep-alive responses are written in several sends; without this,
+        # Nagle and delayed ACKs add ~40 ms to every request.
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler)
+    server.set_app(get_internal_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def build_scenarios(
+    base_url: str, nicknames: List[str], signature: str
+) -> Dict[str, Callable]:
+    """
+    Builds the scenarios, each a function that picks the request of a user.
+
+    Returns:
+        The scenarios by name. A scenario takes a user index and returns the
+        `(path, headers)` to request.
+    """
+    basic = {
+        nickname: "Basic "
+        + base64.b64encode(f"{nickname}:{PASSWORD}".encode()).decode()
+        for nickname in nicknames
+    }
+    bearer = {
+        nickname: f"Bearer {obtain_token(base_url, nickname, signature)}"
+        for nickname in nicknames
+    }
+    institutions = load_institution_names(nicknames)
+
+    def headers(authorization: str) -> Dict[str, str]:
+        return {
+            "Authorization": authorization,
+            "X-On-Way-Study-API-Signature": signature,
+        }
+
+    def scenario(path: Callable[[str], str], credentials: Dict[str, str]) -> Callable:
+        def request(index: int):
+            nickname = nicknames[index % len(nicknames)]
+            return path(nickname), headers(credentials[nickname])
+
+        return request
+
+    return {
+        "user-detail basic": scenario(lambda n: f"/api/users/{n}/", basic),
+        "user-detail bearer": scenario(lambda n: f"/api/users/{n}/", bearer),
+        "institution-list basic": scenario(lambda n: "/api/institutions/", basic),
+        "institution-detail bearer": scenario(
+            lambda n: f"/api/institutions/{quote(institutions[n])}/", bearer
+        ),
+        "course-list bearer": scenario(lambda n: "/api/courses/", bearer),
+        "activity-list bearer": scenario(
+            lambda n: "/api/activities/?page_size=50", bearer
+        ),
+        "study-plan tree basic": scenario(lambda n: f"/api/users/{n}/tree/", basic),
+        "study-plan export bearer": scenario(
+            lambda n: f"/api/users/{n}/export/", bearer
+        ),
+    }
+
+
+def obtain_token(base_url: str, nickname: str, signature: str) -> str:
+    status, body, _ = request(
+        open_connection(base_url),
+        "POST",
+        "/api/tokens/",
+        {"X-On-Way-Study-API-Signature": signature, "Content-Type": "application/json"},
+        json.dumps({"nickname": nickname, "password": PASSWORD}).encode(),
+    )
+
+    if status != 200:
+        raise RuntimeError(
+            f"Could not obtain a token for {nickname}: {status} {body!r}"
+        )
+
+    return json.loads(body)["access"]
+
+
+def load_institution_names(nicknames: List[str]) -> Dict[str, str]:
+    from apps.institution.models import Institution
+
+    names = {}
+
+    for nickname, name in Institution.objects.filter(
+        user__nickname__in=nicknames
+    ).values_list("user__nickname", "name"):
+        names.setdefault(nickname, name)
+
+    return names
+
+
+def open_connection(base_url: str) -> http.client.HTTPConnection:
+    url = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection
+        if url.scheme == "https"
+        else http.client.HTTPConnection
+    )
+
+    return connection_class(url.hostname, url.port, timeout=60)
+
+
+def request(connection, method: str, path: str, headers: Dict[str, str], body=None):
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    content = response.read()
+
+    return response.status, content, response.getheader("Server-Timing")
+
+
+def run_scenario(
+    base_url: str, scenario: Callable, concurrency: int, duration: float
+) -> Dict[str, object]:
+    """
+    Runs one scenario with `concurrency` clients for `duration` seconds.
+
+    Returns:
+        The requests, errors, throughput, latency percentiles (ms) and mean
+        queries per request of the scenario.
+    """
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(number: int):
+        connection = open_connection(base_url)
+        index = number
+        local_latencies, local_queries, local_errors = [], [], 0
+
+        while time.perf_counter() < deadline:
+            path, headers = scenario(index)
+            index += concurrency
+            start = time.perf_counter()
+
+            try:
+                status, _, server_timing = request(connection, "GET", path, headers)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = open_connection(base_url)
+                local_errors += 1
+                continue
+
+            local_latencies.append((time.perf_counter() - start) * 1000)
+
+            if status >= 400:
+                local_errors += 1
+
+            match = QUERIES_PATTERN.search(server_timing or "")
+
+            if match:
+                local_queries.append(int(match.group(1)))
+
+        connection.close()
+
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "requests_per_second": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+        "queries_per_request": statistics.fmean(queries) if queries else None,
+    }
+
+
+def percentile(values: List[float], rank: float) -> Optional[float]:
+    """Returns the nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+
+    return values[max(0, int(round(rank / 100 * len(values))) - 1)]
+
+
+def print_results(results: Dict[str, Dict[str, object]], baseline=None):
+    """Prints the results as a table, with the req/s and p99 changes against a baseline."""
+    width = max(len(name) for name in results)
+    print(
+        f"{'':{width}}  {'req/s':>9}  {'p50 ms':>8}  {'p90 ms':>8}  {'p99 ms':>8}  "
+        f"{'queries':>7}  {'errors':>6}"
+    )
+
+    for name, result in results.items():
+        queries = result["queries_per_request"]
+        line = (
+            f"{name:{width}}  {result['requests_per_second']:9.1f}  "
+            f"{_ms(result['p50_ms'])}  {_ms(result['p90_ms'])}  {_ms(result['p99_ms'])}  "
+            f"{'-' if queries is None else f'{queries:.1f}':>7}  {result['errors']:6}"
+        )
+
+        previous = (baseline or {}).get(name)
+
+        if previous:
+            line += (
+                f"  req/s {_change(result['requests_per_second'], previous['requests_per_second'])}"
+                f"  p99 {_change(result['p99_ms'], previous['p99_ms'])}"
+            )
+
+        print(line)
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{'-':>8}" if value is None else f"{value:8.2f}"
+
+
+def _change(current: Optional[float], previous: Optional[float]) -> str:
+    if not current or not previous:
+        return "n/a"
+
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sqlite", help="Run against this SQLite file (migrated first)."
+    )
+    parser.add_argument(
+        "--url", help="Benchmark a running server instead of booting one."
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per scenario."
+    )
+    parser.add_argument("--scenario", action="append", help="Only run this scenario.")
+    parser.add_argument("--no-response-cache", action="store_true")
+    parser.add_argument("--output", default="load-results.json")
+    parser.add_argument("--compare", help="A previous --output file to compare with.")
+    args = parser.parse_args()
+
+    setup_django(args.sqlite)
+
+    import django
+    from django.core.management import call_command
+    from django.db import connection
+    from environment import ON_WAY_STUDY_API_KEY_SIGNARURE
+    from on_way_study.response_cache import response_cache
+
+    if args.sqlite:
+        call_command("migrate", verbosity=0)
+
+    if args.no_response_cache:
+        response_cache.enabled = False
+
+    nicknames = seed_users(args.users, args.seed)
+    server = None
+    base_url = args.url
+
+    if base_url is None:
+        server, base_url = start_server()
+
+    signature = ON_WAY_STUDY_API_KEY_SIGNARURE or ""
+    scenarios = build_scenarios(base_url, nicknames, signature)
+    results = {}
+
+    for name, scenario in scenarios.items():
+        if args.scenario and name not in args.scenario:
+            continue
+
+        results[name] = run_scenario(
+            base_url, scenario, args.concurrency, args.duration
+        )
+
+    if server is not None:
+        server.shutdown()
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "server": "builtin" if server is not None else base_url,
+            "response_cache": response_cache.enabled,
+        },
+        "parameters": {
+            "users": args.users,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+        },
+        "results": results,
+    }
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+
+    print(
+        f"{len(nicknames)} users, {args.concurrency} clients, {args.duration:g}s per "
+        f"scenario on {connection.vendor}"
+    )
+    print_results(results, baseline)
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
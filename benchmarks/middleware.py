@@ -0,0 +1,69 @@
+"""
+API middleware pipeline benchmark.
+
+Serves the same requests through Django's `WSGIHandler`, which runs the whole
+`MIDDLEWARE` stack, and through `RouteAwareWSGIHandler`, which runs the
+`ON_WAY_STUDY_API_MIDDLEWARE` stack for `/api/`:
+
+- signed: a signed request to `users/availability/`, which needs no
+  authentication nor database query, so the difference is the per-request
+  overhead of the middleware;
+- unsigned: the same request without the signature header, rejected by
+  `RequiredHeaderMiddleware`;
+- bad signature: the same request with a wrong signature.
+
+Usage: `python -m benchmarks.middleware [--iterations N]`
+"""
+
+import argparse
+import logging
+from benchmarks import measure, print_report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from environment import ON_WAY_STUDY_API_KEY_SIGNARURE
+    from on_way_study.handlers import RouteAwareWSGIHandler
+
+    # The rejected requests would log a warning each.
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+    handlers = {
+        "full MIDDLEWARE": WSGIHandler(),
+        "API middleware": RouteAwareWSGIHandler(),
+    }
+    host = (settings.ALLOWED_HOSTS or ["localhost"])[0].lstrip(".") or "localhost"
+    factory = RequestFactory(HTTP_HOST=host)
+    path = "/api/users/availability/?nickname=middleware-benchmark"
+    requests = {
+        "signed": {"HTTP_X_ON_WAY_STUDY_API_SIGNATURE": ON_WAY_STUDY_API_KEY_SIGNARURE},
+        "unsigned": {},
+        "bad signature": {"HTTP_X_ON_WAY_STUDY_API_SIGNATURE": "bad-signature"},
+    }
+
+    for name, headers in requests.items():
+        results = {}
+
+        for handler_name, handler in handlers.items():
+
+            def serve(handler=handler, headers=headers):
+                response = handler.get_response(factory.get(path, **headers))
+                response.close()
+                return response
+
+            status = serve().status_code
+            results[f"{handler_name} ({status})"] = measure(serve, args.iterations)
+
+        print_report(f"{name} ({args.iterations} requests)", results)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+JSON renderer benchmark on a large activity list payload.
+
+Serializes N unsaved activities with `ActivitySerializer` (Decimal weights and
+results, timezone-aware datetimes) and compares `JSONRenderer` with
+`OrjsonRenderer`: render time, peak memory allocated while rendering and
+whether both produce the same bytes.
+
+Usage: `python -m benchmarks.renderers [--activities N] [--iterations N]`
+"""
+
+import argparse
+import tracemalloc
+from decimal import Decimal
+from benchmarks import measure, print_report, setup_django
+
+
+def build_payload(activities: int):
+    from django.utils import timezone
+    from apps.activity.models import Activity
+    from apps.activity.serializers import ActivitySerializer
+
+    now = timezone.localtime()
+    instances = [
+        Activity(
+            id=i,
+            name=f"Activity {i} – revisão",
+            status="COMPLETED" if i % 3 == 0 else "PENDING",
+            weight=Decimal("1.50") + i % 7,
+            result=Decimal("7.25") + i % 3,
+            date=now,
+            created_at=now,
+            updated_at=now,
+            discipline_id=i % 50 + 1,
+            owner_id=1,
+        )
+        for i in range(activities)
+    ]
+
+    return {
+        "next": None,
+        "previous": None,
+        "results": ActivitySerializer(instances, many=True).data,
+    }
+
+
+def peak_allocation(render, data) -> int:
+    tracemalloc.start()
+    render(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--activities", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from on_way_study.renderers import OrjsonRenderer
+
+    data = build_payload(args.activities)
+    renderers = {"JSONRenderer": JSONRenderer(), "OrjsonRenderer": OrjsonRenderer()}
+
+    print_report(
+        f"Render {args.activities} activities ({args.iterations} iterations)",
+        {
+            name: measure(lambda r=renderer: r.render(data), args.iterations)
+            for name, renderer in renderers.items()
+        },
+    )
+    print()
+
+    for name, renderer in renderers.items():
+        peak = peak_allocation(renderer.render, data)
+        print(f"{name}: peak allocation {peak / 1024:.1f} KiB")
+
+    outputs = [renderer.render(data) for renderer in renderers.values()]
+    print(f"\nIdentical output: {outputs[0] == outputs[1]} ({len(outputs[0])} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Lean list serializer benchmark and equivalence check.
+
+Seeds a throwaway study plan (one user, institution, course, N disciplines and
+N activities per discipline, with null and non-null weights, results and
+timestamps) inside a transaction that is rolled back at the end, then, for
+each resource, serializes the list query two ways:
+
+- ModelSerializer: model instances through the resource serializer;
+- LeanSerializer: `.values()` rows through `on_way_study.lean.LeanSerializer`.
+
+It reports both timings and exits with an error if any resource serializes
+differently, so it doubles as the check that the lean path can replace the
+serializers.
+
+Usage: `python -m benchmarks.serializers [--disciplines N] [--activities N] [--iterations N]`
+"""
+
+import argparse
+import sys
+from decimal import Decimal
+from benchmarks import measure, print_report, setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(disciplines: int, activities: int):
+    from datetime import timedelta
+    from apps.activity.models import Activity
+    from apps.course.models import Course
+    from apps.discipline.models import Discipline
+    from apps.institution.models import Institution
+    from apps.user.models import User
+    from environment import get_modification_time
+
+    now = get_modification_time()
+    user = User.objects.create(nickname="lean-serializer-benchmark", password="-")
+    institution = Institution.objects.create(name="Benchmark", user=user)
+    course = Course.objects.create(
+        name="Benchmark",
+        acronym="BM",
+        semesters=8,
+        instituition=institution,
+        graded_weight=Decimal("3.00"),
+        weighted_result_sum=Decimal("22.5000"),
+        completed_count=1,
+        pending_count=2,
+        updated_at=now,
+    )
+    created = Discipline.objects.bulk_create(
+        Discipline(
+            name=f"Discipline {i}",
+            extra_information=None if i % 2 else f"Room {i}",
+            curso=course,
+            owner=user,
+            graded_weight=Decimal(i % 3),
+            weighted_result_sum=Decimal(i % 3) * Decimal("6.3333"),
+            completed_count=i % 4,
+            pending_count=i % 5,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now if i % 2 else None,
+        )
+        for i in range(disciplines)
+    )
+    Activity.objects.bulk_create(
+        Activity(
+            name=f"Activity {d.pk}.{i} – revisão",
+            status="COMPLETED" if i % 3 == 0 else "PENDING",
+            weight=None if i % 4 == 0 else Decimal("1.50") + i % 7,
+            result=None if i % 5 == 0 else Decimal("7.25") + i % 3,
+            date=now,
+            discipline=d,
+            owner=user,
+            created_at=now - timedelta(seconds=i),
+            updated_at=now if i % 2 else None,
+        )
+        for d in created
+        for i in range(activities)
+    )
+
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--disciplines", type=int, default=20)
+    parser.add_argument("--activities", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import transaction
+    from apps.activity.models import Activity
+    from apps.activity.serializers import ActivitySerializer
+    from apps.course.models import Course
+    from apps.course.serializers import CourseSerializer
+    from apps.discipline.models import Discipline
+    from apps.discipline.serializers import DisciplineSerializer
+    from apps.institution.models import Institution
+    from apps.institution.serializers import InstitutionSerializer
+    from on_way_study.lean import LeanSerializer
+
+    mismatches = []
+
+    try:
+        with transaction.atomic():
+            user = seed(args.disciplines, args.activities)
+            resources = {
+                "institution": (
+                    Institution.objects.filter(user=user),
+                    InstitutionSerializer,
+                ),
+                "course": (Course.objects.filter(owner=user), CourseSerializer),
+                "discipline": (
+                    Discipline.objects.filter(owner=user),
+                    DisciplineSerializer,
+                ),
+                "activity": (Activity.objects.filter(owner=user), ActivitySerializer),
+            }
+
+            for name, (queryset, serializer_class) in resources.items():
+                queryset = queryset.order_by("created_at", "id")
+                lean = LeanSerializer.for_serializer(serializer_class)
+
+                def model_serializer(q=queryset, s=serializer_class):
+                    return s(list(q), many=True).data
+
+                def lean_serializer(q=queryset, s=lean):
+                    return s.to_representation(q.values(*s.columns))
+
+                expected = [list(item.items()) for item in model_serializer()]
+
+                if [list(item.items()) for item in lean_serializer()] != expected:
+                    mismatches.append(name)
+
+                print_report(
+                    f"{name}: {len(expected)} rows ({args.iterations} iterations)",
+                    {
+                        "ModelSerializer": measure(model_serializer, args.iterations),
+                        "LeanSerializer": measure(lean_serializer, args.iterations),
+                    },
+                )
+                print()
+
+            raise Rollback
+    except Rollback:
+        pass
+
+    if mismatches:
+        sys.exit(
+            f"Lean output differs from the serializers for: {', '.join(mismatches)}"
+        )
+
+    print("Identical output for every resource.")
+
+
+if __name__ == "__main__":
+    main()
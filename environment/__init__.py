@@ -1,12 +1,31 @@
 import os
 from django.utils import timezone
 
-
 ON_WAY_STUDY_DB_USER = os.getenv("ON_WAY_STUDY_DB_USER")
 ON_WAY_STUDY_DB_PASSWORD = os.getenv("ON_WAY_STUDY_DB_PASSWORD")
 ON_WAY_STUDY_DJANGO_SECRET_KEY = os.getenv("ON_WAY_STUDY_DJANGO_SECRET_KEY")
 ON_WAY_STUDY_API_KEY_SIGNARURE = os.getenv("ON_WAY_STUDY_API_KEY_SIGNARURE")
+ON_WAY_STUDY_DB_CONN_MAX_AGE = int(os.getenv("ON_WAY_STUDY_DB_CONN_MAX_AGE", "600"))
+ON_WAY_STUDY_DB_POOL_MAX_SIZE = int(os.getenv("ON_WAY_STUDY_DB_POOL_MAX_SIZE", "0"))
+ON_WAY_STUDY_DB_PREPARED_STATEMENTS = os.getenv(
+    "ON_WAY_STUDY_DB_PREPARED_STATEMENTS", "true"
+).lower() in ("1", "true")
+ON_WAY_STUDY_STAFF_NICKNAMES = [
+    nickname.strip()
+    for nickname in os.getenv("ON_WAY_STUDY_STAFF_NICKNAMES", "").split(",")
+    if nickname.strip()
+]
 
 
 def get_timezone():
     return timezone.localtime(timezone.now()).replace(microsecond=0)
+
+
+def get_modification_time():
+    """
+    Returns the current local time for `updated_at`, keeping the microseconds.
+
+    `updated_at` drives the ETags of the API, so two writes within the same second
+    must still produce different values.
+    """
+    return timezone.localtime(timezone.now())
@@ -0,0 +1,226 @@
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from on_way_study.conditional import LIST_VALIDATORS, ConditionalResponseMixin
+from on_way_study.lean import LeanSerializer
+from on_way_study.pagination import KeysetCursorPagination
+from on_way_study.response_cache import CachedResponseMixin, response_cache
+from security.authentication import OnWayStudyAsyncAuthentication
+
+
+class AsyncReadView(ConditionalResponseMixin, View):
+    """
+    Native async `list` and `retrieve` for a resource served by a DRF viewset.
+
+    A viewset opts in by naming its subclass in `async_read_view`, and
+    `on_way_study.urls_async` then routes the viewset's list and detail paths to
+    it. Under ASGI the reads never leave the event loop: authentication, the
+    ETag validators and the page are awaited with the async ORM, and the
+    response is rendered with the same serializer, pagination and validators as
+    the viewset. Every other method is handed over, unchanged, to the viewset
+    view in `sync_view`.
+
+    When the viewset uses `CachedResponseMixin`, reads go through
+    `response_cache` under the same keys as the viewset, so both paths share entries, answer conditional
+    requests alike and send the same `X-Cache` header. Its backends are
+    synchronous, so the lookups and stores run through `sync_to_async`.
+
+    Subclasses define `serializer_class`, `get_queryset()` and, for detail routes,
+    `lookup_field`. With `lean_list`, lists are serialized from `.values()` rows
+    by a `LeanSerializer`, like the viewsets' `LeanListMixin`. The
+    `filter_backends` and `keyset_orderings` of the viewset apply as well.
+    """
+
+    serializer_class = None
+    sync_view = None
+    lookup_field = "pk"
+    filter_backends = ()
+    keyset_orderings = None
+    pagination_class = KeysetCursorPagination
+    paginated = True
+    lean_list = False
+    authentication = OnWayStudyAsyncAuthentication()
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def get_queryset(self, request: Request) -> QuerySet:
+        """
+        Returns the rows the request user may read.
+
+        There is no `queryset` attribute to fall back on: like the viewset's
+        `get_queryset`, the scoping to the user must be written out, so every
+        subclass overrides this method.
+
+        Raises:
+            NotImplementedError: If the subclass does not override it.
+        """
+        raise NotImplementedError("Subclasses must define get_queryset().")
+
+    def filter_queryset(self, request: Request, queryset: QuerySet) -> QuerySet:
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(request, queryset, self)
+
+        return queryset
+
+    async def get(self, request, *args, **kwargs):
+        drf_request = Request(request)
+
+        try:
+            drf_request.user, drf_request.auth = await self.authentication.authenticate(
+                request
+            )
+            action = "retrieve" if self.lookup_field in kwargs else "list"
+            cache_key, response = await self.get_cached_response(drf_request, action)
+
+            if response is not None:
+                return response
+
+            if action == "retrieve":
+                response = await self.retrieve(drf_request, kwargs[self.lookup_field])
+            else:
+                response = await self.list(drf_request)
+        except (APIException, Http404) as e:
+            return self.handle_exception(e)
+
+        if cache_key and response.status_code == 200:
+            response["X-Cache"] = "MISS"
+            await sync_to_async(response_cache.set)(cache_key, response)
+
+        return response
+
+    async def get_cached_response(self, request: Request, action: str):
+        """
+        Looks the request up in `response_cache` like `CachedResponseMixin` does.
+
+        Args:
+            request: The authenticated DRF request.
+            action: `list` or `retrieve`.
+
+        Returns:
+            A tuple of (key, response). The key is None when the cache is
+            disabled or the viewset does not use it, and the response is None
+            on a miss.
+        """
+        if not response_cache.enabled or not issubclass(
+            self.sync_view.cls, CachedResponseMixin
+        ):
+            return None, None
+
+        basename = self.sync_view.initkwargs["basename"]
+        key = await sync_to_async(response_cache.build_key)(
+            request, f"{basename}-{action}"
+        )
+
+        return key, await sync_to_async(response_cache.get)(key, request)
+
+    async def post(self, request, *args, **kwargs):
+        """Hands the request over to the synchronous DRF viewset of the same path."""
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    put = patch = delete = options = post
+
+    async def list(self, request: Request) -> HttpResponse:
+        queryset = self.filter_queryset(request, self.get_queryset(request))
+        summary = await queryset.aaggregate(**LIST_VALIDATORS)
+        etag = self.build_etag(request, summary["count"], summary["last_modified"])
+        not_modified = self.get_not_modified_response(request, etag, None)
+
+        if not_modified is not None:
+            return not_modified
+
+        if self.lean_list:
+            lean_serializer = LeanSerializer.for_serializer(self.serializer_class)
+            queryset = queryset.values(*lean_serializer.columns)
+
+        if not self.paginated:
+            objects = [obj async for obj in queryset]
+        else:
+            paginator = self.pagination_class()
+            objects = await paginator.apaginate_queryset(queryset, request, self)
+
+        if self.lean_list:
+            data = lean_serializer.to_representation(objects)
+        else:
+            data = self.get_serializer(request, objects, many=True).data
+
+        if self.paginated:
+            data = paginator.get_paginated_data(data)
+
+        return self.set_validators(self.render(data), etag, None)
+
+    async def retrieve(self, request: Request, lookup_value: str) -> HttpResponse:
+        instance = await (
+            self.filter_queryset(request, self.get_queryset(request))
+            .filter(**{self.lookup_field: lookup_value})
+            .afirst()
+        )
+
+        if instance is None:
+            raise Http404("No object matches the given query.")
+
+        self.check_object_permissions(request, instance)
+        last_modified = instance.updated_at or instance.created_at
+        etag = self.build_etag(request, instance.pk, last_modified)
+        not_modified = self.get_not_modified_response(request, etag, last_modified)
+
+        if not_modified is not None:
+            return not_modified
+
+        data = self.get_serializer(request, instance).data
+
+        return self.set_validators(self.render(data), etag, last_modified)
+
+    def check_object_permissions(self, request: Request, instance):
+        """
+        Hook for object-level checks that the scoped queryset does not cover.
+
+        Raises:
+            PermissionDenied: If the request user cannot read the object.
+        """
+
+    def handle_exception(self, exc: Exception) -> HttpResponse:
+        """
+        Renders an error the way DRF's default exception handler does.
+
+        Authentication errors are answered with 403, like the viewsets, whose
+        authentication classes send no `WWW-Authenticate` challenge.
+        """
+        if isinstance(exc, Http404):
+            exc = NotFound(str(exc))
+
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {"detail": exc.detail}
+
+        status = 403 if exc.status_code == 401 else exc.status_code
+
+        return self.render(data, status=status)
+
+    def get_serializer(self, request: Request, *args, **kwargs):
+        return self.serializer_class(*args, context={"request": request}, **kwargs)
+
+    def render(self, data, status: int = 200) -> HttpResponse:
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            content_type=self.renderer.media_type,
+        )
+
+
+class OwnedObjectAsyncReadView(AsyncReadView):
+    """Async reads of a model whose rows carry a denormalized `owner`."""
+
+    model = None
+
+    def get_queryset(self, request: Request) -> QuerySet:
+        return self.model.objects.filter(owner=request.user)
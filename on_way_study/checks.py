@@ -0,0 +1,82 @@
+"""
+System checks of the project settings, registered by `UserConfig.ready()`.
+"""
+
+from importlib.util import find_spec
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PER_PROCESS_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+
+def check_shared_cache_backends(app_configs, **kwargs):
+    """
+    Warns when the caches that must be shared by every process are per process.
+
+    The response cache generations and the credential cache generations are how
+    a write made by one process invalidates the entries of the others. With an
+    in-memory backend, the other processes keep serving stale responses, and
+    accepting changed passwords, until their entries expire.
+
+    It only runs with `check --deploy`, since a development server is a single
+    process.
+    """
+    errors = []
+    aliases = {
+        "ON_WAY_STUDY_RESPONSE_CACHE": getattr(
+            settings, "ON_WAY_STUDY_RESPONSE_CACHE", {}
+        ).get("ALIAS", "default"),
+        "ON_WAY_STUDY_CREDENTIAL_CACHE": getattr(
+            settings, "ON_WAY_STUDY_CREDENTIAL_CACHE", {}
+        ).get("ALIAS", "default"),
+    }
+
+    for setting, alias in aliases.items():
+        if isinstance(caches[alias], PER_PROCESS_CACHE_BACKENDS):
+            errors.append(
+                checks.Warning(
+                    f"The '{alias}' cache of {setting} is {caches[alias].__class__.__name__}, "
+                    "which is not shared between processes.",
+                    hint=(
+                        "Point the alias to a FileBasedCache, memcached or redis "
+                        "backend when more than one process serves the API."
+                    ),
+                    id="on_way_study.W001",
+                )
+            )
+
+    return errors
+
+
+def check_database_pool_driver(app_configs, **kwargs):
+    """
+    Fails when the connection pool is enabled without psycopg 3 and psycopg_pool.
+
+    `ON_WAY_STUDY_DB_POOL_MAX_SIZE` turns on the `pool` option of the PostgreSQL
+    backend, which psycopg2 does not support: without this check the first
+    query fails instead of the startup.
+    """
+    if not getattr(settings, "ON_WAY_STUDY_DB", {}).get("POOL_MAX_SIZE"):
+        return []
+
+    missing = [
+        module for module in ("psycopg", "psycopg_pool") if not find_spec(module)
+    ]
+
+    if not missing:
+        return []
+
+    return [
+        checks.Error(
+            "ON_WAY_STUDY_DB_POOL_MAX_SIZE enables the connection pool, which needs "
+            f"psycopg 3 and psycopg_pool, but {' and '.join(missing)} cannot be imported.",
+            hint=(
+                "Install the pool extra (`poetry install --extras pool`) or unset "
+                "ON_WAY_STUDY_DB_POOL_MAX_SIZE to keep persistent connections."
+            ),
+            id="on_way_study.E001",
+        )
+    ]
@@ -0,0 +1,132 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+from django.db.models import Count, Max
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+LIST_VALIDATORS = {
+    "last_modified": Max(Coalesce("updated_at", "created_at")),
+    "count": Count("pk"),
+}
+
+
+class ConditionalResponseMixin:
+    """
+    Builds and checks the `ETag` and `Last-Modified` validators of a response.
+
+    The validators are derived from `updated_at` (falling back to `created_at` for
+    rows that were never updated), so they are known before anything is
+    serialized. A request with a matching `If-None-Match` or a recent enough
+    `If-Modified-Since` is answered with `304 Not Modified` without serializing.
+    """
+
+    def build_etag(
+        self, request: Request, key: object, last_modified: Optional[datetime]
+    ) -> str:
+        """
+        Builds a weak ETag for the representation of the requested resource.
+
+        Args:
+            request: The DRF request. Its full path and user are part of the tag,
+                so pages and users never share a validator.
+            key: The object primary key (retrieve) or the row count (list).
+            last_modified: The latest modification of the resource.
+
+        Returns:
+            The quoted weak ETag.
+        """
+        source = "|".join(
+            [
+                request.get_full_path(),
+                str(getattr(request.user, "pk", "")),
+                str(key),
+                last_modified.isoformat() if last_modified else "",
+            ]
+        )
+
+        return "W/" + quote_etag(hashlib.sha1(source.encode()).hexdigest())
+
+    def get_not_modified_response(
+        self, request: Request, etag: str, last_modified: Optional[datetime]
+    ):
+        """
+        Evaluates the conditional request headers against the validators.
+
+        Args:
+            request: The DRF request.
+            etag: The current ETag of the resource.
+            last_modified: The latest modification of the resource.
+
+        Returns:
+            A `304 Not Modified` (or `412 Precondition Failed`) response, or None
+            when the full response must be sent.
+        """
+        response = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+
+        return response
+
+    def set_validators(self, response, etag: str, last_modified: Optional[datetime]):
+        response["ETag"] = etag
+
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+
+        patch_vary_headers(response, ["Accept", "Authorization"])
+
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    """
+    Conditional `retrieve`: the validators come from the object that is loaded anyway.
+
+    It must be listed before `RetrieveModelMixin`.
+    """
+
+    def retrieve(self, request: Request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = instance.updated_at or instance.created_at
+        etag = self.build_etag(request, instance.pk, last_modified)
+        not_modified = self.get_not_modified_response(request, etag, last_modified)
+
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(instance)
+
+        return self.set_validators(Response(serializer.data), etag, last_modified)
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    """
+    Conditional `list`: the validators come from one `MAX(updated_at), COUNT(*)` query.
+
+    Creates and updates move the maximum and deletes change the count, so every
+    write to the filtered queryset changes the ETag. Lists are only validated by
+    their ETag: a delete does not move the maximum, so a `Last-Modified` would
+    let `If-Modified-Since` answer `304` for a list that lost a row. It must be
+    listed before `ListModelMixin`.
+    """
+
+    def list(self, request: Request, *args, **kwargs):
+        summary = self.filter_queryset(self.get_queryset()).aggregate(**LIST_VALIDATORS)
+        etag = self.build_etag(request, summary["count"], summary["last_modified"])
+        not_modified = self.get_not_modified_response(request, etag, None)
+
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+
+        return self.set_validators(response, etag, None)
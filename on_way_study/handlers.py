@@ -0,0 +1,151 @@
+import copy
+from typing import Sequence
+import django
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+
+class RouteAwareMiddlewareMixin:
+    """
+    Serves the API requests through their own, shorter middleware chain.
+
+    The `MIDDLEWARE` setting is loaded as usual and still serves every request
+    outside `ON_WAY_STUDY_API_MIDDLEWARE["PREFIX"]`, e.g. the admin. The
+    requests under the prefix go through `ON_WAY_STUDY_API_MIDDLEWARE["MIDDLEWARE"]`
+    instead, which leaves out the sessions, CSRF, authentication, messages and
+    clickjacking middleware: the API authenticates with its own DRF classes and
+    its views are CSRF exempt.
+
+    Each chain registers the `process_view`, `process_template_response` and
+    `process_exception` hooks of its own middleware only, so e.g. the CSRF
+    `process_view` of the `MIDDLEWARE` chain never runs for the API.
+    """
+
+    def load_middleware(self, is_async=False):
+        super().load_middleware(is_async)
+        api_settings = getattr(settings, "ON_WAY_STUDY_API_MIDDLEWARE", {})
+
+        if api_settings.get("MIDDLEWARE") is None:
+            return
+
+        prefix = api_settings.get("PREFIX", "/api/")
+        default_chain = self._middleware_chain
+        api_chain = copy.copy(self)._build_chain(api_settings["MIDDLEWARE"], is_async)
+
+        def route(request):
+            if request.path_info.startswith(prefix):
+                return api_chain(request)
+
+            return default_chain(request)
+
+        self._middleware_chain = route
+
+    def _build_chain(self, middleware_paths: Sequence[str], is_async: bool):
+        """
+        Builds a middleware chain around the view handling, as `load_middleware` does.
+
+        The hooks of the middleware replace the hook lists of this handler, so it
+        must be a copy of the handler serving the `MIDDLEWARE` chain.
+        """
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+
+        for middleware_path in reversed(middleware_paths):
+            middleware = import_string(middleware_path)
+            middleware_is_async = self._runs_async(middleware, handler_is_async)
+
+            try:
+                instance = middleware(
+                    self.adapt_method_mode(
+                        middleware_is_async,
+                        handler,
+                        handler_is_async,
+                        debug=settings.DEBUG,
+                        name=f"middleware {middleware_path}",
+                    )
+                )
+            except MiddlewareNotUsed:
+                continue
+
+            self._register_hooks(instance, is_async)
+            handler = convert_exception_to_response(instance)
+            handler_is_async = middleware_is_async
+
+        return self.adapt_method_mode(is_async, handler, handler_is_async)
+
+    def _register_hooks(self, instance, is_async: bool):
+        if hasattr(instance, "process_view"):
+            self._view_middleware.insert(
+                0, self.adapt_method_mode(is_async, instance.process_view)
+            )
+
+        if hasattr(instance, "process_template_response"):
+            self._template_response_middleware.append(
+                self.adapt_method_mode(is_async, instance.process_template_response)
+            )
+
+        if hasattr(instance, "process_exception"):
+            # Exception handling is always synchronous, as in `load_middleware`.
+            self._exception_middleware.append(
+                self.adapt_method_mode(False, instance.process_exception)
+            )
+
+    def _runs_async(self, middleware, handler_is_async: bool) -> bool:
+        can_sync = getattr(middleware, "sync_capable", True)
+        can_async = getattr(middleware, "async_capable", False)
+
+        if not can_sync and not can_async:
+            raise RuntimeError(
+                f"Middleware {middleware.__qualname__} must have at least one of "
+                "sync_capable/async_capable set to True."
+            )
+
+        if not handler_is_async and can_sync:
+            return False
+
+        return can_async
+
+
+class RouteAwareWSGIHandler(RouteAwareMiddlewareMixin, WSGIHandler):
+    pass
+
+
+class RouteAwareASGIHandler(RouteAwareMiddlewareMixin, ASGIHandler):
+    pass
+
+
+def get_wsgi_application() -> RouteAwareWSGIHandler:
+    """Sets up Django and returns the WSGI callable, like Django's own helper."""
+    django.setup(set_prefix=False)
+    _start_server_warm_up()
+
+    return RouteAwareWSGIHandler()
+
+
+def get_asgi_application() -> RouteAwareASGIHandler:
+    """Sets up Django and returns the ASGI callable, like Django's own helper."""
+    django.setup(set_prefix=False)
+    _start_server_warm_up()
+
+    return RouteAwareASGIHandler()
+
+
+def _start_server_warm_up():
+    """
+    Starts the in-memory indexes of a serving process before its first request.
+
+    It only runs when a server loads the application, not for management
+    commands or tests, which may run before the tables exist.
+    """
+    from apps.user.nickname_index import nickname_index
+
+    nickname_index.start_background_build()
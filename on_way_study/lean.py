@@ -0,0 +1,247 @@
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from on_way_study.metrics import timed
+
+# Fields whose `to_representation` returns the database value unchanged.
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+    PrimaryKeyRelatedField,
+)
+
+
+class _RowObject:
+    """Attribute access over a `.values()` row, for the model properties of a serializer."""
+
+    __slots__ = ("_row",)
+
+    def __init__(self, row: dict):
+        self._row = row
+
+    def __getattr__(self, name: str):
+        try:
+            return self._row[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class LeanSerializer:
+    """
+    Read-only twin of a `ModelSerializer` that serializes `.values()` rows.
+
+    The serializer class is inspected once: every field is mapped to the column
+    it reads and to a converter (`None` when the field returns the database value
+    as is, e.g. `CharField` or a `PrimaryKeyRelatedField` read from `<fk>_id`,
+    otherwise the bound `to_representation` of the field, e.g. for decimals).
+    ISO 8601 `DateTimeField`s get a converter bound to the current timezone once
+    per call, instead of looking the timezone up for every value. Model
+    properties used as sources, such as `weighted_grade`, are evaluated on the
+    row, so they must only read concrete fields.
+
+    The rows are then turned into dicts with one loop over that plan, without
+    building model instances or running the serializer machinery per field, and
+    the output is identical to the serializer's.
+    """
+
+    _plans: Dict[type, "LeanSerializer"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, serializer_class: Type[serializers.ModelSerializer]):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.columns: List[str] = []
+        self.fields: List[Tuple[str, str, object, Callable]] = []
+        self.datetime_fields: Dict[str, Callable] = {}
+        self._compile()
+
+    @classmethod
+    def for_serializer(cls, serializer_class) -> "LeanSerializer":
+        """
+        Returns the compiled lean serializer of a serializer class, compiling it once.
+
+        Args:
+            serializer_class: A `ModelSerializer` subclass.
+
+        Returns:
+            The cached LeanSerializer.
+        """
+        plan = cls._plans.get(serializer_class)
+
+        if plan is None:
+            with cls._lock:
+                plan = cls._plans.setdefault(serializer_class, cls(serializer_class))
+
+        return plan
+
+    @timed("serialize")
+    def to_representation(self, rows) -> List[dict]:
+        """
+        Serializes `.values(*self.columns)` rows.
+
+        Args:
+            rows: The rows, as dicts keyed by the field attnames.
+
+        Returns:
+            One dict per row, with the same keys, order and values as the serializer.
+        """
+        fields = self._bind_converters()
+        data = []
+
+        for row in rows:
+            item = {}
+            row_object = None
+
+            for name, kind, source, convert in fields:
+                if kind == "column":
+                    value = row[source]
+                else:
+                    if row_object is None:
+                        row_object = _RowObject(row)
+                    value = source(row_object)
+
+                if value is None or convert is None:
+                    item[name] = value
+                else:
+                    item[name] = convert(value)
+
+            data.append(item)
+
+        return data
+
+    def _compile(self):
+        columns = {}
+
+        for field in self.serializer_class().fields.values():
+            if field.write_only:
+                continue
+
+            kind, source = self._resolve_source(field)
+
+            if kind == "column":
+                columns[source] = None
+            else:
+                columns.update(dict.fromkeys(self._concrete_attnames()))
+
+            convert = (
+                None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+            )
+            self.fields.append((field.field_name, kind, source, convert))
+
+            if self._is_iso_datetime(field):
+                self.datetime_fields[field.field_name] = field.to_representation
+
+        self.columns = list(columns)
+
+    def _bind_converters(self) -> List[Tuple[str, str, object, Callable]]:
+        if not self.datetime_fields:
+            return self.fields
+
+        convert_datetime = self._datetime_converter(
+            timezone.get_current_timezone() if settings.USE_TZ else None
+        )
+
+        return [
+            (name, kind, source, convert_datetime.get(name, convert))
+            for name, kind, source, convert in self.fields
+        ]
+
+    def _datetime_converter(self, current_timezone) -> Dict[str, Callable]:
+        """
+        Returns the ISO 8601 `DateTimeField` converters for the current timezone.
+
+        Aware datetimes are converted exactly as `DateTimeField.to_representation`
+        does, anything else is handed over to the field itself.
+        """
+
+        def converter(fallback: Callable) -> Callable:
+            def convert(value):
+                if current_timezone is None or value.utcoffset() is None:
+                    return fallback(value)
+
+                value = value.astimezone(current_timezone).isoformat()
+
+                if value.endswith("+00:00"):
+                    value = value[:-6] + "Z"
+
+                return value
+
+            return convert
+
+        return {
+            name: converter(fallback) for name, fallback in self.datetime_fields.items()
+        }
+
+    def _is_iso_datetime(self, field) -> bool:
+        output_format: Optional[str] = getattr(
+            field, "format", api_settings.DATETIME_FORMAT
+        )
+
+        return (
+            isinstance(field, serializers.DateTimeField)
+            and not hasattr(field, "timezone")
+            and output_format is not None
+            and output_format.lower() == ISO_8601
+        )
+
+    def _resolve_source(self, field) -> Tuple[str, object]:
+        if len(field.source_attrs) != 1:
+            raise ImproperlyConfigured(
+                f"{self.serializer_class.__name__}.{field.field_name}: lean "
+                "serializers only support sources on the model itself."
+            )
+
+        source = field.source_attrs[0]
+
+        try:
+            model_field = self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            model_property = getattr(self.model, source, None)
+
+            if not isinstance(model_property, property):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field.field_name}: "
+                    f"'{source}' is neither a field nor a property of the model."
+                )
+
+            return "property", model_property.fget
+
+        return "column", model_field.attname
+
+    def _concrete_attnames(self) -> List[str]:
+        return [f.attname for f in self.model._meta.concrete_fields]
+
+
+class LeanListMixin:
+    """
+    Serves the `list` action from `.values()` rows through a `LeanSerializer`.
+
+    The fast path is selected per viewset with `lean_list = True`, and it uses
+    the viewset's serializer class, so the response is the same as the regular
+    `list`. It must be listed before `ListModelMixin`.
+    """
+
+    lean_list = False
+
+    def list(self, request: Request, *args, **kwargs):
+        if not self.lean_list:
+            return super().list(request, *args, **kwargs)
+
+        serializer = LeanSerializer.for_serializer(self.get_serializer_class())
+        queryset = self.filter_queryset(self.get_queryset()).values(*serializer.columns)
+        page = self.paginate_queryset(queryset)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+
+        return Response(serializer.to_representation(list(queryset)))
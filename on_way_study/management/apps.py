@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ManagementConfig(AppConfig):
+    """
+    Holds the management commands that exercise the whole project, such as the
+    query budget harness, rather than one of the apps.
+    """
+
+    name = "on_way_study.management"
+    label = "on_way_study_management"
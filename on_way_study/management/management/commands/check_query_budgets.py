@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from on_way_study.query_budget import QueryBudgetHarness
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests every read route at two data scales and fails when a route's "
+        "query count grows with the rows (N+1) or exceeds its declared budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=5,
+            help="Rows of each model seeded for the first run (default: 5).",
+        )
+        parser.add_argument(
+            "--factor",
+            type=int,
+            default=10,
+            help="How many times more rows the second run seeds (default: 10).",
+        )
+
+    def handle(self, *args, **options):
+        harness = QueryBudgetHarness(scale=options["scale"], factor=options["factor"])
+        results = harness.run()
+        failures = []
+
+        for result in results:
+            queries = " -> ".join(
+                str(result.queries[scale]) for scale in harness.scales
+            )
+            budget = "-" if result.budget is None else result.budget
+            statuses = ",".join(
+                sorted({str(status) for status in result.statuses.values()})
+            )
+            self.stdout.write(
+                f"{result.name:32} queries {queries:10} budget {budget!s:4} status {statuses}"
+            )
+
+            for failure in result.failures():
+                failures.append(failure)
+
+                for sql, count in result.duplicated_statements():
+                    self.stdout.write(f"    {count}x {sql}")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(results)} route(s) within their query budgets.")
+        )
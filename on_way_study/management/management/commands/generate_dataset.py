@@ -0,0 +1,72 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from on_way_study.synthetic_dataset import SyntheticDatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users with realistic study plans (about 60 activities per user) "
+        "for capacity testing, deterministically from a seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, required=True)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="The same seed generates the same rows (default: 0).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="synthetic-",
+            help="Prefix of the nicknames (default: synthetic-).",
+        )
+        parser.add_argument(
+            "--password",
+            default="synthetic",
+            help="Password shared by the generated users (default: synthetic).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per INSERT statement when COPY is not used (default: 5000).",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use INSERT statements on PostgreSQL instead of COPY.",
+        )
+
+    def handle(self, *args, **options):
+        generator = SyntheticDatasetGenerator(
+            users=options["users"],
+            seed=options["seed"],
+            prefix=options["prefix"],
+            password=options["password"],
+            batch_size=options["batch_size"],
+            use_copy=False if options["no_copy"] else None,
+        )
+
+        if generator.conflicts():
+            raise CommandError(
+                f"Users prefixed '{options['prefix']}{options['seed']}-' already exist. "
+                "Use another --seed or --prefix."
+            )
+
+        started = time.perf_counter()
+
+        def progress(written: int):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{written}/{options['users']} users ({elapsed:.1f}s)")
+
+        counts = generator.run(progress)
+        summary = ", ".join(
+            f"{count} {model._meta.model_name}(s)" for model, count in counts.items()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {summary} in {time.perf_counter() - started:.1f}s."
+            )
+        )
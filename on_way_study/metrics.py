@@ -0,0 +1,427 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from rest_framework.status import HTTP_403_FORBIDDEN
+from apps.user.nickname_index import nickname_index
+from environment import ON_WAY_STUDY_API_KEY_SIGNARURE
+from on_way_study.response_cache import response_cache
+from security.credential_cache import credential_cache
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PHASES = ("auth", "db", "serialize")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class RequestMetrics:
+    """
+    Time spent by one request in each phase, plus its database query count.
+
+    The metrics of the request being served are reachable through
+    `current_request_metrics`, so the authentication, the serializers and the
+    database execute wrapper can record into them without being handed the request.
+
+    With `track_statements`, the SQL of every query (before its parameters are
+    bound) is counted too, which exposes the N+1 patterns in `duplicated_statements`.
+    """
+
+    def __init__(self, track_statements: bool = False):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.queries = 0
+        self.statements: Optional[Counter] = Counter() if track_statements else None
+        self._active = set()
+
+    @contextmanager
+    def timed(self, phase: str):
+        """
+        Adds the duration of the block to `phase`.
+
+        Nested blocks of the same phase (e.g. a serializer inside a serializer)
+        are only counted once, by the outermost one.
+        """
+        if phase in self._active:
+            yield
+            return
+
+        self._active.add(phase)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+            self._active.discard(phase)
+
+    def add(self, phase: str, seconds: float):
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def duplicated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Returns the statements that ran at least `threshold` times, most frequent first.
+
+        Args:
+            threshold: The minimum number of executions to report a statement.
+
+        Returns:
+            A list of `(sql, executions)`, empty when statements are not tracked.
+        """
+        return duplicated_statements(self.statements or Counter(), threshold)
+
+    def server_timing(self, total: float) -> str:
+        """
+        Builds the `Server-Timing` header value, in milliseconds.
+
+        Args:
+            total: The total duration of the request, in seconds.
+
+        Returns:
+            The header value, e.g. `auth;dur=1.2, db;dur=3.4;desc="2 queries", total;dur=9.8`.
+        """
+        entries = []
+
+        for phase in PHASES:
+            if phase == "db":
+                entries.append(
+                    f'db;dur={self.durations.get("db", 0.0) * 1000:.3f};'
+                    f'desc="{self.queries} queries"'
+                )
+            elif phase in self.durations:
+                entries.append(f"{phase};dur={self.durations[phase] * 1000:.3f}")
+
+        entries.append(f"total;dur={total * 1000:.3f}")
+
+        return ", ".join(entries)
+
+
+current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+@contextmanager
+def timed(phase: str):
+    """
+    Adds the duration of the block to `phase` of the request being served, if any.
+
+    It also decorates synchronous functions, e.g. `@timed("auth")`.
+
+    Args:
+        phase: One of `PHASES`.
+    """
+    metrics = current_request_metrics.get()
+
+    if metrics is None:
+        yield
+        return
+
+    with metrics.timed(phase):
+        yield
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding each query to the `db` phase of the current request.
+
+    It is installed on every connection when it is opened, rather than around
+    each request, because the async views run their queries on the connections
+    of the `sync_to_async` worker threads. Those threads inherit the context of
+    the request, so `current_request_metrics` is the one of the request that
+    runs the query, even when connections serve several requests over time.
+    """
+    metrics = current_request_metrics.get()
+
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.add("db", time.perf_counter() - start)
+
+        if metrics.statements is not None:
+            metrics.statements[sql] += 1
+
+
+def duplicated_statements(statements: Counter, threshold: int) -> List[Tuple[str, int]]:
+    """
+    Returns the `SELECT` statements of a counter that ran at least `threshold` times.
+
+    The SQL is counted before its parameters are bound, so the same lookup
+    repeated for every row of a list (an N+1) shows up as one statement. Writes
+    are left out: a batched `bulk_create` repeats the same `INSERT` by design.
+
+    Args:
+        statements: The executions of each SQL statement.
+        threshold: The minimum number of executions to report a statement.
+
+    Returns:
+        A list of `(sql, executions)`, most frequent first.
+    """
+    return [
+        (sql, count)
+        for sql, count in statements.most_common()
+        if count >= threshold and sql.lstrip()[:6].upper() == "SELECT"
+    ]
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class DuplicateQueryWarning(RuntimeWarning):
+    """Warns, in development, about a statement repeated within a single request."""
+
+
+class TimedSerializerMixin:
+    """
+    Records `to_representation` of a serializer under the `serialize` phase.
+
+    For `many=True` every row is timed by its child serializer, and the lookups
+    of the list queryset stay in the `db` phase.
+    """
+
+    def to_representation(self, instance):
+        metrics = current_request_metrics.get()
+
+        if metrics is None:
+            return super().to_representation(instance)
+
+        with metrics.timed("serialize"):
+            return super().to_representation(instance)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus sense: `le` bounds, a sum and a count."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+
+        if index < len(self.buckets):
+            self.counts[index] += 1
+
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Yields the `(suffix, le, value)` samples, with cumulative bucket counts."""
+        cumulative = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield "_bucket", _format_value(bound), cumulative
+
+        yield "_bucket", "+Inf", self.count
+        yield "_sum", None, self.sum
+        yield "_count", None, self.count
+
+
+class MetricsRegistry:
+    """
+    Per-route request histograms of this process, rendered in the Prometheus text format.
+
+    Routes are labelled with the URL name of the view (e.g. `course-list`), so the
+    number of series stays bounded whatever the paths requested.
+    """
+
+    HELP = {
+        "on_way_study_request_duration_seconds": (
+            "Total time spent serving the request, middleware included."
+        ),
+        "on_way_study_request_phase_duration_seconds": (
+            "Time spent by the request in authentication, database queries and serialization."
+        ),
+        "on_way_study_request_db_queries": "Number of database queries run by the request.",
+    }
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {
+            name: {} for name in self.HELP
+        }
+        self._lock = threading.Lock()
+
+    def observe_request(
+        self, route: str, method: str, metrics: RequestMetrics, total: float
+    ):
+        """
+        Adds one served request to the histograms of its route.
+
+        Args:
+            route: The URL name of the view.
+            method: The HTTP method.
+            metrics: The phases recorded while serving the request.
+            total: The total duration of the request, in seconds.
+        """
+        labels = (("route", route), ("method", method))
+
+        with self._lock:
+            self._observe("on_way_study_request_duration_seconds", labels, total)
+            self._observe(
+                "on_way_study_request_db_queries",
+                labels,
+                metrics.queries,
+                QUERY_COUNT_BUCKETS,
+            )
+
+            for phase in PHASES:
+                if phase in metrics.durations:
+                    self._observe(
+                        "on_way_study_request_phase_duration_seconds",
+                        labels + (("phase", phase),),
+                        metrics.durations[phase],
+                    )
+
+    def render(self) -> str:
+        """
+        Renders the histograms and the cache counters in the Prometheus text format.
+
+        Returns:
+            The exposition text, ending with a newline.
+        """
+        lines: List[str] = []
+
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self.HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+
+                for labels, histogram in sorted(series.items()):
+                    for suffix, le, value in histogram.samples():
+                        sample_labels = labels + ((("le", le),) if le else ())
+                        lines.append(
+                            f"{name}{suffix}{_format_labels(sample_labels)} {_format_value(value)}"
+                        )
+
+        for name, metric_type, help_text, value in _cache_samples():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            for series in self._histograms.values():
+                series.clear()
+
+    def _observe(self, name: str, labels: Labels, value: float, buckets=None):
+        histogram = self._histograms[name].get(labels)
+
+        if histogram is None:
+            histogram = self._histograms[name][labels] = Histogram(
+                buckets or self.buckets
+            )
+
+        histogram.observe(value)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Serves `metrics_registry` in the Prometheus text format.
+
+    The endpoint is not tied to a user, so it is protected by the API signature
+    header alone, compared in constant time.
+    """
+    signature = request.META.get("HTTP_X_ON_WAY_STUDY_API_SIGNATURE", "")
+
+    if not ON_WAY_STUDY_API_KEY_SIGNARURE or not hmac.compare_digest(
+        signature.encode(), ON_WAY_STUDY_API_KEY_SIGNARURE.encode()
+    ):
+        return JsonResponse(
+            {"error": "Invalid header API Signature"}, status=HTTP_403_FORBIDDEN
+        )
+
+    return HttpResponse(
+        metrics_registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _cache_samples() -> Iterable[Tuple[str, str, str, float]]:
+    response_stats = response_cache.stats()
+    credential_stats = credential_cache.stats()
+
+    for counter in ("hits", "misses", "stores", "invalidations"):
+        yield (
+            f"on_way_study_response_cache_{counter}_total",
+            "counter",
+            f"Response cache {counter} of this process.",
+            response_stats[counter],
+        )
+
+    for counter in ("hits", "misses"):
+        yield (
+            f"on_way_study_credential_cache_{counter}_total",
+            "counter",
+            f"Verified credential cache {counter} of this process.",
+            credential_stats[counter],
+        )
+
+    yield (
+        "on_way_study_credential_cache_size",
+        "gauge",
+        "Credentials currently held by the verified credential cache.",
+        credential_stats["size"],
+    )
+
+    for counter in ("lookups", "database_checks", "false_positives"):
+        yield (
+            f"on_way_study_nickname_index_{counter}_total",
+            "counter",
+            f"Nickname index {counter.replace('_', ' ')} of this process.",
+            getattr(nickname_index, counter),
+        )
+
+
+def _format_labels(labels: Labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+
+    return repr(float(value))
+
+
+_metrics_settings = getattr(settings, "ON_WAY_STUDY_METRICS", {})
+
+metrics_registry = MetricsRegistry(
+    buckets=_metrics_settings.get("BUCKETS", DEFAULT_BUCKETS),
+)
+
+if _metrics_settings.get("ENABLED", True):
+    connection_created.connect(
+        install_query_recorder, dispatch_uid="on_way_study.metrics.record_query"
+    )
+
+    for _connection in connections.all(initialized_only=True):
+        install_query_recorder(None, _connection)
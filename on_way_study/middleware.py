@@ -0,0 +1,35 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+class AsyncReadRoutingMiddleware:
+    """
+    Routes the requests served over ASGI with the async URLconf.
+
+    When the middleware chain runs in async mode, `request.urlconf` is set to
+    `ON_WAY_STUDY_ASYNC["URLCONF"]`, which serves the list and retrieve reads
+    with native async views. Under WSGI the requests keep the default URLconf and
+    the synchronous viewsets.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.urlconf = getattr(settings, "ON_WAY_STUDY_ASYNC", {}).get("URLCONF")
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.urlconf:
+            request.urlconf = self.urlconf
+
+        return await self.get_response(request)
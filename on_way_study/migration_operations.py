@@ -0,0 +1,91 @@
+"""
+Migration operations that change large tables without blocking their writes on PostgreSQL.
+
+On the other databases they behave like the Django operations they extend.
+"""
+
+from django.contrib.postgres import operations as postgres_operations
+from django.db import migrations
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    """
+    `AddIndex` built with `CREATE INDEX CONCURRENTLY` on PostgreSQL.
+
+    The table stays writable while the index is built. Like Django's operation,
+    it needs a migration with `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        return migrations.AddIndex.database_forwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        return migrations.AddIndex.database_backwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+
+class AlterFieldNotNull(migrations.AlterField):
+    """
+    `AlterField` that only makes a backfilled column `NOT NULL`.
+
+    On PostgreSQL, `AlterField` drops and re-creates the foreign key of the
+    column, and `SET NOT NULL` scans the table. Both hold a lock that blocks
+    writes for the whole scan. Instead, a `CHECK (column IS NOT NULL)`
+    constraint is added `NOT VALID` and validated, which scans the table without
+    blocking writes. `SET NOT NULL` then relies on that constraint and skips the
+    scan, and the constraint is dropped. The foreign key is left untouched. The
+    migration must have `atomic = False`, so that each step commits on its own.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        table, column, check = self._names(app_label, to_state, schema_editor)
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {check} "
+            f"CHECK ({column} IS NOT NULL) NOT VALID"
+        )
+        schema_editor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")
+        schema_editor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {check}")
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        table, column, _ = self._names(app_label, from_state, schema_editor)
+        schema_editor.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL"
+        )
+
+    def describe(self):
+        return f"Set NOT NULL on {self.model_name_lower}.{self.name}"
+
+    def _names(self, app_label, state, schema_editor):
+        model = state.apps.get_model(app_label, self.model_name)
+        column = model._meta.get_field(self.name).column
+        quote = schema_editor.quote_name
+
+        return (
+            quote(model._meta.db_table),
+            quote(column),
+            quote(f"{model._meta.db_table}_{column}_not_null"),
+        )
@@ -0,0 +1,241 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from django.db.models import F, QuerySet
+from django.db.models.fields import tuple_lookups
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination ordered by `(created_at, id)` with opaque cursors.
+
+    Querysets of model instances and of `.values()` rows (which must include
+    the ordering field and `id`) are both supported.
+
+    Each page is fetched with a `WHERE (created_at, id) > (last_created_at, last_id)`
+    row-value comparison and a `LIMIT`, so it costs the same regardless of how
+    deep the page is, and no `COUNT(*)` is ever executed. Querysets should be
+    backed by an index that ends with `(created_at, id)`, which the comparison
+    reads as a single range scan. Backends without row values (SQLite) get the
+    equivalent `OR` of comparisons instead.
+
+    A view can offer other orderings in `keyset_orderings`, which maps the
+    values of the `ordering` query parameter to a `(field, "id")` ordering,
+    e.g. `{"-date": ("-date", "-id")}`. The field must be a non-null datetime,
+    sorted in the same direction as `id`, and backed by an index as well.
+
+    Query parameters:
+        cursor: The opaque cursor returned in `next` or `previous`.
+        page_size: Number of results per page, up to `max_page_size`.
+        ordering: One of the view's `keyset_orderings`, if it has any.
+    """
+
+    ordering = ("created_at", "id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering_query_param = "ordering"
+    max_page_size = 200
+    max_cursor_id = 2**63 - 1
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None):
+        page, position, reverse = self._get_page_queryset(queryset, request, view)
+
+        return self._build_page(list(page), position, reverse)
+
+    async def apaginate_queryset(self, queryset: QuerySet, request: Request, view=None):
+        """
+        Async version of `paginate_queryset`, fetching the page with `async for`.
+
+        Args:
+            queryset: The queryset to paginate.
+            request: The DRF request.
+            view: The view, whose `keyset_orderings` are offered.
+
+        Returns:
+            The objects of the requested page.
+        """
+        page, position, reverse = self._get_page_queryset(queryset, request, view)
+
+        return self._build_page([obj async for obj in page], position, reverse)
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE or self.max_page_size
+
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request: Request, view=None) -> Tuple[str, ...]:
+        """
+        Returns the ordering requested with the `ordering` query parameter.
+
+        Raises:
+            ValidationError: If the ordering is not one of the view's `keyset_orderings`.
+
+        Returns:
+            The `(field, "id")` ordering, `ordering` when none is requested.
+        """
+        orderings = getattr(view, "keyset_orderings", None) or {}
+        value = request.query_params.get(self.ordering_query_param)
+
+        if value is None:
+            return self.ordering
+
+        if value not in orderings:
+            raise ValidationError(
+                {
+                    self.ordering_query_param: (
+                        f'"{value}" is not a valid choice. '
+                        f"Choices: {', '.join(orderings) or 'none'}."
+                    )
+                }
+            )
+
+        return orderings[value]
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if self.previous_position is None:
+            return None
+
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def encode_cursor(self, position: Tuple[datetime, int], reverse: bool) -> str:
+        """
+        Builds the URL of the page that follows (or precedes) the given position.
+
+        Args:
+            position: The `(ordering field, id)` of the last row seen.
+            reverse: True to walk backwards from the position.
+
+        Returns:
+            The absolute URL with the opaque `cursor` query parameter.
+        """
+        payload = json.dumps([position[0].isoformat(), position[1], int(reverse)])
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request: Request) -> Tuple[Optional[tuple], bool]:
+        """
+        Decodes the cursor sent by the client.
+
+        Args:
+            request: The DRF request.
+
+        Raises:
+            ValidationError: If the cursor is malformed.
+
+        Returns:
+            A tuple with the `(ordering field, id)` position (or None for the first page)
+            and whether the page must be fetched backwards.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if not cursor:
+            self.base_url = remove_query_param(self.base_url, self.cursor_query_param)
+            return None, False
+
+        try:
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(cursor))
+            position = (datetime.fromisoformat(value), int(pk))
+        except (TypeError, ValueError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+        if not 0 < position[1] <= self.max_cursor_id:
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+        return position, bool(reverse)
+
+    def _get_page_queryset(self, queryset: QuerySet, request: Request, view=None):
+        self.request = request
+        self.keyset = self.get_ordering(request, view)
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self._ordering(reverse))
+
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(position, reverse))
+
+        return queryset[: self.page_size + 1], position, reverse
+
+    def _build_page(self, results: list, position, reverse: bool) -> list:
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+
+        self.next_position = None
+        self.previous_position = None
+
+        if results and (has_more or reverse):
+            self.next_position = self._position_of(results[-1])
+
+        if results and (position is not None) and (not reverse or has_more):
+            self.previous_position = self._position_of(results[0])
+
+        return results
+
+    def _ordering(self, reverse: bool) -> Tuple[str, ...]:
+        if reverse:
+            return tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in self.keyset
+            )
+
+        return self.keyset
+
+    def _seek_filter(self, position: tuple, reverse: bool):
+        field = self.keyset[0].lstrip("-")
+        lookup = (
+            tuple_lookups.TupleLessThan
+            if reverse != self.keyset[0].startswith("-")
+            else tuple_lookups.TupleGreaterThan
+        )
+
+        return lookup(tuple_lookups.Tuple(F(field), F("id")), position)
+
+    def _position_of(self, instance) -> Tuple[datetime, int]:
+        field = self.keyset[0].lstrip("-")
+
+        if isinstance(instance, dict):
+            return (instance[field], instance["id"])
+
+        return (getattr(instance, field), instance.pk)
@@ -0,0 +1,25 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from on_way_study.renderers import OrjsonRenderer, orjson
+
+
+class OrjsonParser(JSONParser):
+    """
+    Drop-in `JSONParser` that decodes with orjson when it is installed.
+
+    orjson only reads UTF-8 and always rejects `NaN` and `Infinity`, so other
+    encodings, the non-strict mode and a missing orjson fall back to `JSONParser`.
+    """
+
+    renderer_class = OrjsonRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8").lower()
+
+        if orjson is None or not self.strict or encoding not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
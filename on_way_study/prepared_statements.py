@@ -0,0 +1,116 @@
+import threading
+import weakref
+from typing import Optional, Sequence, Type
+from django.conf import settings
+from django.db import connections, models
+
+
+class PreparedStatement:
+    """
+    Single-row `SELECT` of a model executed as a PostgreSQL server-side prepared statement.
+
+    The statement is parsed and planned once per database connection with
+    `PREPARE` and then run with `EXECUTE`, which skips the parse and plan steps
+    of the hot lookups. This pays off together with persistent or pooled
+    connections, which keep the prepared statements alive across requests.
+
+    Other database vendors, or `ON_WAY_STUDY_DB["PREPARED_STATEMENTS"]` set to
+    False (e.g. behind a transaction-mode PgBouncer), run the same `SELECT`
+    directly.
+    """
+
+    _prepared = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str,
+        model: Type[models.Model],
+        lookups: Sequence[str],
+        using: str = "default",
+    ):
+        self.name = name
+        self.model = model
+        self.lookups = lookups
+        self.using = using
+        self.enabled = getattr(settings, "ON_WAY_STUDY_DB", {}).get(
+            "PREPARED_STATEMENTS", True
+        )
+
+    def fetch_one(self, *params) -> Optional[models.Model]:
+        """
+        Runs the statement and builds the model instance of the first row.
+
+        Args:
+            params: One value per lookup field, in the same order.
+
+        Returns:
+            The model instance, or None when no row matches.
+        """
+        connection = connections[self.using]
+        fields = self.model._meta.concrete_fields
+        sql = self._build_sql(connection, fields)
+
+        with connection.cursor() as cursor:
+            if self.enabled and connection.vendor == "postgresql":
+                self._prepare(connection, cursor, sql)
+                placeholders = ", ".join(["%s"] * len(params))
+                cursor.execute(f"EXECUTE {self.name}({placeholders})", params)
+            else:
+                cursor.execute(sql, params)
+
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        values = [
+            self._convert(connection, field, value) for field, value in zip(fields, row)
+        ]
+
+        return self.model.from_db(self.using, [f.attname for f in fields], values)
+
+    def _convert(self, connection, field, value):
+        """Applies the backend and field converters the ORM would apply to the value."""
+        column = field.get_col(self.model._meta.db_table)
+        converters = connection.ops.get_db_converters(column) + field.get_db_converters(
+            connection
+        )
+
+        for converter in converters:
+            value = converter(value, column, connection)
+
+        return value
+
+    def _build_sql(self, connection, fields) -> str:
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(f.column) for f in fields)
+        conditions = " AND ".join(
+            f"{quote_name(self.model._meta.get_field(lookup).column)} = %s"
+            for lookup in self.lookups
+        )
+
+        return (
+            f"SELECT {columns} FROM {quote_name(self.model._meta.db_table)} "
+            f"WHERE {conditions} LIMIT 1"
+        )
+
+    def _prepare(self, connection, cursor, sql: str):
+        """Prepares the statement on the current raw connection, once per connection."""
+        connection.ensure_connection()
+        raw_connection = connection.connection
+
+        with self._lock:
+            prepared = self._prepared.setdefault(raw_connection, set())
+
+            if self.name in prepared:
+                return
+
+        positional_sql = sql
+        for position in range(1, len(self.lookups) + 1):
+            positional_sql = positional_sql.replace("%s", f"${position}", 1)
+
+        cursor.execute(f"PREPARE {self.name} AS {positional_sql}")
+
+        with self._lock:
+            prepared.add(self.name)
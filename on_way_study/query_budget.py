@@ -0,0 +1,285 @@
+import base64
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from apps.activity.models import Activity
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+from environment import ON_WAY_STUDY_API_KEY_SIGNARURE, get_modification_time
+from on_way_study.metrics import duplicated_statements
+from on_way_study.response_cache import response_cache
+
+
+class RouteQueries:
+    """Queries run by one read route at each seeded scale, checked against its budget."""
+
+    def __init__(self, name: str, budget: Optional[int], duplicate_threshold: int):
+        self.name = name
+        self.budget = budget
+        self.duplicate_threshold = duplicate_threshold
+        self.queries: Dict[int, int] = {}
+        self.statuses: Dict[int, int] = {}
+        self.statements: Dict[int, Counter] = {}
+
+    def failures(self) -> List[str]:
+        """
+        Returns why the route fails its checks, if it does.
+
+        Returns:
+            One message per failed check: the route does not answer with a 2xx
+            status, the query count grows with the number of rows, or it exceeds
+            the declared budget.
+        """
+        failures = []
+        counts = [self.queries[scale] for scale in sorted(self.queries)]
+        errors = sorted(
+            {status for status in self.statuses.values() if not 200 <= status < 300}
+        )
+
+        if errors:
+            failures.append(
+                f"{self.name}: answered {', '.join(map(str, errors))}, so its "
+                f"queries are not the ones of a successful read."
+            )
+
+        if counts and counts[-1] > counts[0]:
+            failures.append(
+                f"{self.name}: the query count grows with the rows "
+                f"({' -> '.join(map(str, counts))})."
+            )
+
+        if self.budget is not None and counts and max(counts) > self.budget:
+            failures.append(
+                f"{self.name}: {max(counts)} queries exceed the budget of {self.budget}."
+            )
+
+        return failures
+
+    def duplicated_statements(self) -> List[Tuple[str, int]]:
+        """Returns the statements repeated at the largest scale, the likely N+1 culprits."""
+        if not self.statements:
+            return []
+
+        return duplicated_statements(
+            self.statements[max(self.statements)], self.duplicate_threshold
+        )
+
+
+class QueryBudgetHarness:
+    """
+    Checks that every read route of the API runs a bounded number of queries.
+
+    For each scale (`scale` rows, then `scale * factor` rows) a user is seeded
+    with that many institutions, courses, disciplines and activities, and every
+    `GET` viewset route of `urlconf` is requested with that user's credentials
+    (detail routes with the user's first object of the viewset model). A route
+    fails when it does not answer with a 2xx status, when its query count grows
+    with the number of rows, which is what an N+1 looks like, or when it exceeds
+    the budget declared by its viewset in `query_budgets`, e.g.
+    `{"list": 2, "retrieve": 1}`.
+
+    Each route is requested once to warm the in-process caches before it is
+    measured, the response cache is bypassed, and everything seeded is rolled
+    back at the end. The seeded users are staff, so the staff-only routes are
+    measured too.
+    """
+
+    password = "query-budget"
+    query_params = {
+        "user-availability": {"nickname": "query-budget-free"},
+        "search-list": {"q": "institution"},
+    }
+
+    def __init__(
+        self,
+        scale: int = 5,
+        factor: int = 10,
+        urlconf: Optional[str] = None,
+        duplicate_threshold: int = 3,
+    ):
+        self.scales = (scale, scale * factor)
+        self.urlconf = urlconf
+        self.duplicate_threshold = duplicate_threshold
+
+    def run(self) -> List[RouteQueries]:
+        """
+        Seeds every scale, requests every read route and counts its queries.
+
+        Returns:
+            The results, one per route, in URLconf order.
+        """
+        results: Dict[str, RouteQueries] = {}
+        cache_enabled = response_cache.enabled
+        response_cache.enabled = False
+
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                ON_WAY_STUDY_STAFF={
+                    "NICKNAMES": [self._nickname(scale) for scale in self.scales]
+                },
+            ):
+                with transaction.atomic():
+                    for scale in self.scales:
+                        self._measure_scale(scale, results)
+
+                    transaction.set_rollback(True)
+        finally:
+            response_cache.enabled = cache_enabled
+
+        return list(results.values())
+
+    def routes(self) -> Iterable[Tuple[str, type, str, bool]]:
+        """
+        Yields the `GET` viewset routes of the URLconf.
+
+        Returns:
+            Tuples of `(url_name, viewset, action, is_detail)`, format-suffixed
+            variants excluded.
+        """
+        yield from self._iter_routes(get_resolver(self.urlconf).url_patterns)
+
+    def seed(self, scale: int) -> Tuple[User, Dict[type, object]]:
+        """
+        Creates a user owning `scale` institutions, courses, disciplines and activities.
+
+        Args:
+            scale: How many rows of each model to create.
+
+        Returns:
+            The user and the first object created for each model.
+        """
+        now = get_modification_time()
+        user = User.objects.create(
+            nickname=self._nickname(scale), password=make_password(self.password)
+        )
+        institutions = Institution.objects.bulk_create(
+            Institution(name=f"Institution {i}", user=user, updated_at=now)
+            for i in range(scale)
+        )
+        courses = Course.objects.bulk_create(
+            Course(
+                name=f"Course {i}",
+                acronym=f"C{i}",
+                semesters=8,
+                instituition=institution,
+                owner=user,
+                updated_at=now,
+            )
+            for i, institution in enumerate(institutions)
+        )
+        disciplines = Discipline.objects.bulk_create(
+            Discipline(name=f"Discipline {i}", curso=course, owner=user, updated_at=now)
+            for i, course in enumerate(courses)
+        )
+        activities = Activity.objects.bulk_create(
+            Activity(
+                name=f"Activity {i}", discipline=discipline, owner=user, updated_at=now
+            )
+            for i, discipline in enumerate(disciplines)
+        )
+
+        return user, {
+            User: user,
+            Institution: institutions[0],
+            Course: courses[0],
+            Discipline: disciplines[0],
+            Activity: activities[0],
+        }
+
+    def _nickname(self, scale: int) -> str:
+        return f"query-budget-{scale}"
+
+    def _measure_scale(self, scale: int, results: Dict[str, RouteQueries]):
+        user, objects = self.seed(scale)
+        credentials = base64.b64encode(f"{user.nickname}:{self.password}".encode())
+        client = Client(
+            headers={
+                "Authorization": f"Basic {credentials.decode()}",
+                "X-On-Way-Study-API-Signature": ON_WAY_STUDY_API_KEY_SIGNARURE or "",
+            }
+        )
+
+        for name, viewset, action, is_detail in self.routes():
+            path = self._build_path(name, viewset, is_detail, objects)
+
+            if path is None:
+                continue
+
+            result = results.setdefault(
+                name,
+                RouteQueries(
+                    name,
+                    getattr(viewset, "query_budgets", {}).get(action),
+                    self.duplicate_threshold,
+                ),
+            )
+            self._request(client, path, name)
+            statements = Counter()
+
+            def count_statement(execute, sql, params, many, context):
+                statements[sql] += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_statement):
+                result.statuses[scale] = self._request(client, path, name)
+
+            result.queries[scale] = sum(statements.values())
+            result.statements[scale] = statements
+
+    def _request(self, client: Client, path: str, name: str) -> int:
+        response = client.get(path, self.query_params.get(name, {}))
+
+        if response.streaming:
+            b"".join(response.streaming_content)
+
+        return response.status_code
+
+    def _build_path(
+        self, name: str, viewset: type, is_detail: bool, objects: Dict[type, object]
+    ) -> Optional[str]:
+        if not is_detail:
+            return reverse(name, urlconf=self.urlconf)
+
+        model = self._get_model(viewset)
+
+        if model not in objects:
+            return None
+
+        lookup_value = getattr(objects[model], viewset.lookup_field)
+        lookup_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+
+        return reverse(name, urlconf=self.urlconf, kwargs={lookup_kwarg: lookup_value})
+
+    def _get_model(self, viewset: type):
+        if getattr(viewset, "queryset", None) is not None:
+            return viewset.queryset.model
+
+        return viewset.serializer_class.Meta.model
+
+    def _iter_routes(self, patterns) -> Iterable[Tuple[str, type, str, bool]]:
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from self._iter_routes(pattern.url_patterns)
+                continue
+
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+
+            viewset = getattr(pattern.callback, "cls", None)
+            actions = getattr(pattern.callback, "actions", None) or {}
+
+            groups = pattern.pattern.regex.groupindex
+
+            if "get" not in actions or "format" in groups:
+                continue
+
+            lookup_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+            yield pattern.name, viewset, actions["get"], lookup_kwarg in groups
@@ -0,0 +1,67 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson
+    else 0
+)
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    Drop-in `JSONRenderer` that encodes with orjson when it is installed.
+
+    The output is the same as DRF's compact JSON, byte for byte: datetimes and
+    every other non-native type go through DRF's own `JSONEncoder.default`, and
+    `\\u2028`/`\\u2029` are escaped the same way. Indented output (`indent=`
+    in the `Accept` header or the browsable API), non-default JSON settings, a
+    missing orjson and payloads orjson cannot encode (e.g. integers wider than
+    64 bits) all fall back to `JSONRenderer`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+
+        return ret
+
+
+class ICalendarRenderer(BaseRenderer):
+    """
+    Lets content negotiation accept `text/calendar` for the iCalendar feeds.
+
+    The feeds stream their document themselves, so this renderer only renders
+    the error payloads, as JSON.
+    """
+
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data, accepted_media_type, renderer_context)
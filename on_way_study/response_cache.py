@@ -0,0 +1,260 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.request import Request
+
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Vary")
+
+
+class ResponseCache:
+    """
+    Per-user cache of rendered `list` and `retrieve` responses.
+
+    Every key holds a per-user generation number, and any write of the user bumps
+    that number. Entries of older generations are never read again (they simply
+    expire), so invalidation is a single `incr` whatever the number of cached
+    responses, and a write is never followed by a stale read.
+
+    The entries live in the Django cache selected by `ALIAS`, so the backend is
+    pluggable: the in-memory backend only suits a single process, while several
+    processes must share a file, memcached or redis backend to see each other's
+    generation bumps. With the in-memory backend, the other processes keep
+    serving the responses cached before a write until `TIMEOUT` expires, and
+    `check --deploy` warns about it (`on_way_study.W001`).
+    """
+
+    def __init__(self, alias: str = "default", timeout: int = 300, enabled=True):
+        self.alias = alias
+        self.timeout = timeout
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def build_key(self, request: Request, scope: str) -> str:
+        """
+        Builds the cache key of a request for the current generation of its user.
+
+        The key must be built before the data is read: a response is then stored
+        under the generation it was read in, so a write that lands meanwhile
+        still invalidates it.
+
+        Args:
+            request: The authenticated DRF request.
+            scope: The endpoint and action, e.g. `course-list`.
+
+        Returns:
+            The cache key.
+        """
+        user_id = request.user.pk
+        variant = hashlib.sha1(
+            f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}".encode()
+        ).hexdigest()
+
+        return f"response-cache:{user_id}:{self._generation(user_id)}:{scope}:{variant}"
+
+    def get(self, key: str, request: Request) -> Optional[HttpResponse]:
+        """
+        Returns the cached response of the request, or None on a miss.
+
+        The conditional headers of the request are evaluated against the cached
+        validators, so a matching `If-None-Match` is answered with a `304` without
+        touching the database.
+
+        Args:
+            key: The key built by `build_key`.
+            request: The authenticated DRF request.
+
+        Returns:
+            The cached response or a `304 Not Modified`, or None on a miss.
+        """
+        entry = self.cache.get(key)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        response = HttpResponse(entry["content"], status=entry["status"])
+
+        for header, value in entry["headers"].items():
+            response[header] = value
+
+        response = get_conditional_response(
+            request._request,
+            etag=entry["headers"].get("ETag"),
+            last_modified=parse_http_date_safe(entry["headers"].get("Last-Modified")),
+            response=response,
+        )
+        response["X-Cache"] = "HIT"
+
+        return response
+
+    def set(self, key: str, response):
+        """
+        Stores a rendered response.
+
+        Args:
+            key: The key built by `build_key` before the response data was read.
+            response: The rendered 200 response.
+        """
+        entry = {
+            "status": response.status_code,
+            "content": response.content,
+            "headers": {h: response[h] for h in CACHED_HEADERS if h in response},
+        }
+        self.cache.set(key, entry, self.timeout)
+
+        with self._lock:
+            self.stores += 1
+
+    def invalidate(self, user_id: int):
+        """
+        Bumps the generation of the user once the current transaction commits.
+
+        Bumping after the commit ensures a concurrent read cannot store the
+        pre-write data under the new generation.
+
+        Args:
+            user_id: The primary key of the user whose data changed.
+        """
+        if not self.enabled or user_id is None:
+            return
+
+        transaction.on_commit(lambda: self._bump(user_id))
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Returns the hit ratio and the counters of this process.
+
+        Returns:
+            A dictionary with the hits, misses, stores, invalidations and hit ratio.
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            "backend": self.cache.__class__.__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _bump(self, user_id: int):
+        key = self._generation_key(user_id)
+
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self._generation(user_id)
+
+        with self._lock:
+            self.invalidations += 1
+
+    def _generation(self, user_id: int) -> int:
+        """
+        Returns the current generation of the user.
+
+        A missing (or evicted) generation restarts from the current time in
+        nanoseconds, never from a number that older entries may still carry.
+        """
+        key = self._generation_key(user_id)
+        generation = self.cache.get(key)
+
+        if generation is None:
+            self.cache.add(key, time.time_ns(), None)
+            generation = self.cache.get(key)
+
+        return generation
+
+    def _generation_key(self, user_id: int) -> str:
+        return f"response-cache:generation:{user_id}"
+
+
+class CachedResponseMixin:
+    """
+    Serves the `list` and `retrieve` actions of a viewset from `response_cache`.
+
+    A miss runs the action as usual and stores the rendered 200 response. Writes
+    made through the viewset invalidate the user's entries: creates and updates
+    through `ResponseCacheInvalidationMixin` serializers and deletes through
+    `perform_destroy`. It must be listed before the mixins that implement the
+    cached actions.
+    """
+
+    def list(self, request: Request, *args, **kwargs):
+        return self._get_cached_response(request) or super().list(
+            request, *args, **kwargs
+        )
+
+    def retrieve(self, request: Request, *args, **kwargs):
+        return self._get_cached_response(request) or super().retrieve(
+            request, *args, **kwargs
+        )
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        response_cache.invalidate(self.request.user.pk)
+
+    def finalize_response(self, request: Request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        key = getattr(self, "_response_cache_key", None)
+
+        if key and response.status_code == 200 and "X-Cache" not in response:
+            response["X-Cache"] = "MISS"
+            response.add_post_render_callback(
+                lambda rendered: response_cache.set(key, rendered)
+            )
+
+        return response
+
+    def _get_cached_response(self, request: Request):
+        if not response_cache.enabled:
+            return None
+
+        self._response_cache_key = response_cache.build_key(
+            request, f"{self.basename}-{self.action}"
+        )
+
+        return response_cache.get(self._response_cache_key, request)
+
+
+class ResponseCacheInvalidationMixin:
+    """
+    Invalidates the cached responses of the request user whenever the serializer saves.
+
+    It works for `ModelSerializer` and `ListSerializer` subclasses alike.
+    """
+
+    def save(self, **kwargs):
+        instance = super().save(**kwargs)
+        request = self.context.get("request")
+        response_cache.invalidate(getattr(getattr(request, "user", None), "pk", None))
+
+        return instance
+
+
+_response_cache_settings = getattr(settings, "ON_WAY_STUDY_RESPONSE_CACHE", {})
+
+response_cache = ResponseCache(
+    alias=_response_cache_settings.get("ALIAS", "default"),
+    timeout=_response_cache_settings.get("TIMEOUT", 300),
+    enabled=_response_cache_settings.get("ENABLED", True),
+)
@@ -12,9 +12,13 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from environment import (
+    ON_WAY_STUDY_DB_CONN_MAX_AGE,
+    ON_WAY_STUDY_DB_POOL_MAX_SIZE,
+    ON_WAY_STUDY_DB_PREPARED_STATEMENTS,
     ON_WAY_STUDY_DB_USER,
     ON_WAY_STUDY_DB_PASSWORD,
     ON_WAY_STUDY_DJANGO_SECRET_KEY,
+    ON_WAY_STUDY_STAFF_NICKNAMES,
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,9 +48,12 @@ INSTALLED_APPS = [
     "apps.course",
     "apps.discipline",
     "apps.activity",
+    "apps.search",
+    "on_way_study.management",
 ]
 
 MIDDLEWARE = [
+    "security.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -56,8 +63,24 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "security.middleware.RequiredHeaderMiddleware",
+    "on_way_study.middleware.AsyncReadRoutingMiddleware",
 ]
 
+# The /api/ requests only go through this chain (see on_way_study.handlers):
+# sessions, CSRF, auth, messages and clickjacking are only needed by the admin.
+# The signature is checked before any authentication or database work.
+ON_WAY_STUDY_API_MIDDLEWARE = {
+    "PREFIX": "/api/",
+    "MIDDLEWARE": [
+        "security.middleware.ServerTimingMiddleware",
+        "django.middleware.security.SecurityMiddleware",
+        "corsheaders.middleware.CorsMiddleware",
+        "django.middleware.common.CommonMiddleware",
+        "security.middleware.RequiredHeaderMiddleware",
+        "on_way_study.middleware.AsyncReadRoutingMiddleware",
+    ],
+}
+
 CORS_ALLOWED_ORIGINS = ["http://localhost:4200"]
 CORS_ALLOW_HEADERS = [
     "accept",
@@ -75,7 +98,87 @@ CORS_ALLOW_HEADERS = [
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "security.permissions.IsOwner",
-    ]
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "on_way_study.renderers.OrjsonRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "on_way_study.parsers.OrjsonParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "on_way_study.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": 50,
+}
+
+# Verified credentials are kept per process, but their generations live in the
+# ALIAS cache, which must be shared by every process serving the API (see CACHES)
+# for a password change or a delete to reach the other processes before TTL.
+ON_WAY_STUDY_CREDENTIAL_CACHE = {
+    "MAX_SIZE": 1024,
+    "TTL": 300,
+    "ALIAS": "default",
+}
+
+# Calendar apps cannot send headers: the FEED_PATHS requests that carry a feed
+# token in their URL are answered without the API signature header.
+ON_WAY_STUDY_TOKENS = {
+    "ACCESS_TTL": 900,
+    "REFRESH_TTL": 86400,
+    "FEED_PATHS": ["/api/activities/calendar/", "/api/activities/calendar.ics"],
+}
+
+# The "responses" cache and the "default" one, which holds the credential cache
+# generations, must be shared by every process serving the API (e.g. a
+# FileBasedCache or a memcached/redis backend) once more than one process runs.
+# `manage.py check --deploy` warns while they are in-memory caches.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "on-way-study-responses",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+ON_WAY_STUDY_RESPONSE_CACHE = {
+    "ENABLED": True,
+    "ALIAS": "responses",
+    "TIMEOUT": 300,
+}
+
+ON_WAY_STUDY_ASYNC = {
+    "URLCONF": "on_way_study.urls_async",
+    "PASSWORD_HASHING_WORKERS": 4,
+}
+
+# Server-Timing headers on every response and per-route latency histograms (in
+# seconds) served in the Prometheus text format on /metrics/, which requires the
+# API signature header. With DEBUG, a statement run DUPLICATE_QUERY_THRESHOLD
+# times by one request raises a DuplicateQueryWarning (0 disables it).
+ON_WAY_STUDY_METRICS = {
+    "ENABLED": True,
+    "SERVER_TIMING": True,
+    "BUCKETS": [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+    "DUPLICATE_QUERY_THRESHOLD": 3,
+}
+
+# A failed build of the nickname index is retried after RETRY_BACKOFF seconds,
+# doubled after each consecutive failure up to REBUILD_INTERVAL.
+ON_WAY_STUDY_NICKNAME_INDEX = {
+    "CAPACITY": 100000,
+    "FALSE_POSITIVE_RATE": 0.01,
+    "REBUILD_INTERVAL": 300,
+    "RETRY_BACKOFF": 5,
+}
+
+# Nicknames of the users allowed to read the operational endpoints, such as
+# users/availability/stats/ (comma-separated in ON_WAY_STUDY_STAFF_NICKNAMES).
+ON_WAY_STUDY_STAFF = {
+    "NICKNAMES": ON_WAY_STUDY_STAFF_NICKNAMES,
 }
 
 
@@ -106,9 +209,35 @@ DATABASES = {
         "PASSWORD": ON_WAY_STUDY_DB_PASSWORD,
         "HOST": "localhost",
         "PORT": "5432",
+        "CONN_MAX_AGE": ON_WAY_STUDY_DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Each worker thread keeps its connection open for CONN_MAX_AGE seconds and checks
+# it before reusing it. Setting ON_WAY_STUDY_DB_POOL_MAX_SIZE switches to a
+# connection pool of that size per worker process instead, which requires
+# psycopg 3 and psycopg_pool from the `pool` extra (on_way_study.E001 fails
+# the system checks without them).
+ON_WAY_STUDY_DB = {
+    "POOL_MIN_SIZE": 1,
+    "POOL_MAX_SIZE": ON_WAY_STUDY_DB_POOL_MAX_SIZE,
+    "POOL_TIMEOUT": 10,
+    "PREPARED_STATEMENTS": ON_WAY_STUDY_DB_PREPARED_STATEMENTS,
+}
+
+if ON_WAY_STUDY_DB["POOL_MAX_SIZE"]:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": min(
+                ON_WAY_STUDY_DB["POOL_MIN_SIZE"], ON_WAY_STUDY_DB["POOL_MAX_SIZE"]
+            ),
+            "max_size": ON_WAY_STUDY_DB["POOL_MAX_SIZE"],
+            "timeout": ON_WAY_STUDY_DB["POOL_TIMEOUT"],
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,442 @@
+import csv
+import io
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from apps.activity.models import Activity
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+
+MODELS = (User, Institution, Course, Discipline, Activity)
+SUMMARY_COLUMNS = (
+    "total_weight",
+    "graded_weight",
+    "weighted_result_sum",
+    "completed_count",
+    "pending_count",
+)
+COLUMNS = {
+    User: (
+        "id",
+        "nickname",
+        "password",
+        "created_at",
+        "updated_at",
+        "calendar_feed_version",
+    ),
+    Institution: ("id", "name", "user_id", "created_at", "updated_at"),
+    Course: (
+        "id",
+        "name",
+        "acronym",
+        "semesters",
+        "instituition_id",
+        "owner_id",
+        "created_at",
+        "updated_at",
+    )
+    + SUMMARY_COLUMNS,
+    Discipline: (
+        "id",
+        "name",
+        "extra_information",
+        "curso_id",
+        "owner_id",
+        "created_at",
+        "updated_at",
+    )
+    + SUMMARY_COLUMNS,
+    Activity: (
+        "id",
+        "name",
+        "status",
+        "weight",
+        "result",
+        "date",
+        "discipline_id",
+        "owner_id",
+        "created_at",
+        "updated_at",
+    ),
+}
+
+INSTITUTION_NAMES = [
+    "IFSP",
+    "USP",
+    "UNICAMP",
+    "UNESP",
+    "UFSCar",
+    "UFABC",
+    "UNIFESP",
+    "FATEC",
+    "Mackenzie",
+    "PUC-SP",
+    "UFMG",
+    "UFRJ",
+    "UFPR",
+    "UFRGS",
+    "UnB",
+    "UFSC",
+    "UFPE",
+    "UFBA",
+    "UFC",
+    "Insper",
+]
+COURSES = [
+    ("Análise e Desenvolvimento de Sistemas", "ADS", 6),
+    ("Ciência da Computação", "CC", 8),
+    ("Engenharia de Computação", "EC", 10),
+    ("Sistemas de Informação", "SI", 8),
+    ("Engenharia de Software", "ES", 8),
+    ("Matemática", "MAT", 8),
+    ("Administração", "ADM", 8),
+    ("Direito", "DIR", 10),
+]
+DISCIPLINE_NAMES = [
+    "Algoritmos",
+    "Estruturas de Dados",
+    "Banco de Dados",
+    "Cálculo",
+    "Álgebra Linear",
+    "Redes de Computadores",
+    "Sistemas Operacionais",
+    "Engenharia de Software",
+    "Programação Orientada a Objetos",
+    "Desenvolvimento Web",
+    "Estatística",
+    "Inglês Técnico",
+]
+ACTIVITY_KINDS = ["Prova", "Trabalho", "Lista de exercícios", "Seminário", "Projeto"]
+
+# Timestamps are spread over the two years before this instant rather than
+# before "now", so the same seed always generates the same rows.
+REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+Rows = Dict[type, List[tuple]]
+
+
+class SyntheticDatasetGenerator:
+    """
+    Generates users with realistic study plans, deterministically from a seed.
+
+    Each user gets 1 to 3 institutions (most have one), 1 or 2 courses per
+    institution, 4 to 10 disciplines per course and a long-tailed number of
+    activities per discipline, averaging about 60 activities per user. Every
+    user draws from its own random generator derived from the seed and its
+    index, so the rows do not depend on the batch sizes.
+
+    The ids are allocated after the largest existing id of each table, so the
+    rows of a whole chunk of users are written parent before child without
+    reading generated keys back. The grade summaries of the courses and
+    disciplines are computed while generating, as `recompute_grade_summaries`
+    would. It must not run while the API writes to the same tables.
+
+    Nicknames are `<prefix><seed>-<index>` and institution names are drawn
+    without replacement per user, so the nickname uniqueness and the
+    `unique_institution_user_name` constraint hold.
+    """
+
+    USERS_PER_CHUNK = 1000
+
+    def __init__(
+        self,
+        users: int,
+        seed: int = 0,
+        prefix: str = "synthetic-",
+        password: str = "synthetic",
+        batch_size: int = 5000,
+        use_copy: Optional[bool] = None,
+    ):
+        self.users = users
+        self.seed = seed
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.use_copy = (
+            connection.vendor == "postgresql" if use_copy is None else use_copy
+        )
+        # Hashing a password per user would take longer than generating all the
+        # rest, so every synthetic user shares the same hash.
+        self.password = make_password(password)
+        self.counts = {model: 0 for model in MODELS}
+        self._next_ids: Dict[type, int] = {}
+
+    def nickname(self, index: int) -> str:
+        return f"{self.prefix}{self.seed}-{index}"
+
+    def conflicts(self) -> bool:
+        """Returns whether users of this prefix and seed already exist."""
+        return User.objects.filter(
+            nickname__startswith=f"{self.prefix}{self.seed}-"
+        ).exists()
+
+    def run(self, progress: Optional[Callable[[int], None]] = None) -> Dict[type, int]:
+        """
+        Generates and writes every user, one transaction per chunk of users.
+
+        Args:
+            progress: Called with the number of users written after each chunk.
+
+        Returns:
+            How many rows of each model were written.
+        """
+        self._next_ids = {
+            model: (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            for model in MODELS
+        }
+
+        for start in range(0, self.users, self.USERS_PER_CHUNK):
+            rows: Rows = {model: [] for model in MODELS}
+
+            for index in range(start, min(start + self.USERS_PER_CHUNK, self.users)):
+                self._generate_user(index, rows)
+
+            with transaction.atomic():
+                for model in MODELS:
+                    self._write(model, rows[model])
+                    self.counts[model] += len(rows[model])
+
+            if progress is not None:
+                progress(min(start + self.USERS_PER_CHUNK, self.users))
+
+        self._finish()
+
+        return self.counts
+
+    def _generate_user(self, index: int, rows: Rows):
+        rng = random.Random(f"{self.seed}-{index}")
+        user_id = self._allocate(User)
+        joined = REFERENCE_TIME - timedelta(seconds=rng.randrange(730 * 86400))
+        rows[User].append(
+            (user_id, self.nickname(index), self.password, joined, None, 0)
+        )
+        institutions = rng.choices((1, 2, 3), weights=(70, 25, 5))[0]
+
+        for name in rng.sample(INSTITUTION_NAMES, institutions):
+            institution_id = self._allocate(Institution)
+            created = joined + timedelta(minutes=rng.randrange(60 * 24 * 30))
+            rows[Institution].append((institution_id, name, user_id, created, None))
+            courses = rng.choices((1, 2), weights=(80, 20))[0]
+
+            for course_name, acronym, semesters in rng.sample(COURSES, courses):
+                self._generate_course(
+                    rng,
+                    rows,
+                    (course_name, acronym, semesters, institution_id),
+                    user_id,
+                    created,
+                )
+
+    def _generate_course(
+        self, rng: random.Random, rows: Rows, course: tuple, user_id: int, created
+    ):
+        course_id = self._allocate(Course)
+        course_summary = [0] * len(SUMMARY_COLUMNS)
+
+        for number in range(rng.randint(4, 10)):
+            discipline_id = self._allocate(Discipline)
+            summary = self._generate_activities(
+                rng, rows, discipline_id, user_id, created
+            )
+            name = f"{rng.choice(DISCIPLINE_NAMES)} {number // 2 + 1}"
+            extra_information = (
+                f"Sala {rng.randint(1, 40)}" if rng.random() < 0.3 else None
+            )
+            rows[Discipline].append(
+                (
+                    discipline_id,
+                    name,
+                    extra_information,
+                    course_id,
+                    user_id,
+                    created,
+                    None,
+                )
+                + _summary_values(summary)
+            )
+            course_summary = [a + b for a, b in zip(course_summary, summary)]
+
+        rows[Course].append(
+            (course_id, *course, user_id, created, None)
+            + _summary_values(course_summary)
+        )
+
+    def _generate_activities(
+        self,
+        rng: random.Random,
+        rows: Rows,
+        discipline_id: int,
+        user_id: int,
+        created,
+    ) -> List[int]:
+        """
+        Generates the activities of a discipline.
+
+        Returns:
+            The grade summary of the activities, with the weights in hundredths
+            and the weighted result sum in ten-thousandths.
+        """
+        total_weight = graded_weight = weighted_result_sum = completed = 0
+        count = min(int(rng.expovariate(1 / 5.5)), 40)
+
+        for number in range(count):
+            date = created + timedelta(hours=rng.randrange(24 * 180))
+            weight = rng.choice((None, 100, 100, 200, 250, 300, 400))
+            status = rng.choices(
+                ("COMPLETED", "IN_PROGRESS", "PENDING"), weights=(60, 15, 25)
+            )[0]
+            result = rng.randrange(0, 1001, 25) if status == "COMPLETED" else None
+
+            if weight is not None:
+                total_weight += weight
+
+                if result is not None:
+                    graded_weight += weight
+                    weighted_result_sum += weight * result
+
+            completed += status == "COMPLETED"
+            rows[Activity].append(
+                (
+                    self._allocate(Activity),
+                    f"{rng.choice(ACTIVITY_KINDS)} {number + 1}",
+                    status,
+                    _hundredths(weight),
+                    _hundredths(result),
+                    date,
+                    discipline_id,
+                    user_id,
+                    date,
+                    date if status == "COMPLETED" else None,
+                )
+            )
+
+        return [
+            total_weight,
+            graded_weight,
+            weighted_result_sum,
+            completed,
+            count - completed,
+        ]
+
+    def _allocate(self, model: type) -> int:
+        value = self._next_ids[model]
+        self._next_ids[model] = value + 1
+
+        return value
+
+    def _write(self, model: type, rows: List[tuple]):
+        if not rows:
+            return
+
+        if self.use_copy:
+            copy_rows(model, COLUMNS[model], rows)
+        else:
+            insert_rows(model, COLUMNS[model], rows, self.batch_size)
+
+    def _finish(self):
+        """Moves the id sequences past the written ids and refreshes the planner statistics."""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), MODELS):
+                cursor.execute(sql)
+
+            if connection.vendor == "postgresql":
+                tables = ", ".join(
+                    connection.ops.quote_name(model._meta.db_table) for model in MODELS
+                )
+                cursor.execute(f"ANALYZE {tables}")
+
+
+def insert_rows(
+    model: type, columns: Sequence[str], rows: List[tuple], batch_size: int
+):
+    """
+    Inserts rows with batched `executemany` statements.
+
+    `bulk_create` would build a model instance per row, so the rows are written
+    as they are, converted with the `get_db_prep_save` of their fields.
+
+    Args:
+        model: The model of the table.
+        columns: The column (attribute) names of the values of each row.
+        rows: The rows to insert.
+        batch_size: How many rows are sent per statement.
+    """
+    fields = [model._meta.get_field(column) for column in columns]
+    converters = [
+        (i, field.get_db_prep_save)
+        for i, field in enumerate(fields)
+        if field.get_internal_type() in ("DateTimeField", "DecimalField")
+    ]
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)} "
+        f"({', '.join(quote(field.column) for field in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = []
+
+            for row in rows[start : start + batch_size]:
+                row = list(row)
+
+                for i, convert in converters:
+                    if row[i] is not None:
+                        row[i] = convert(row[i], connection)
+
+                batch.append(row)
+
+            cursor.executemany(sql, batch)
+
+
+def copy_rows(model: type, columns: Sequence[str], rows: List[tuple]):
+    """
+    Streams rows into a PostgreSQL table with `COPY ... FROM STDIN` in CSV format.
+
+    Works with psycopg 3 (`cursor.copy`) and psycopg2 (`copy_expert`). An empty
+    unquoted CSV field is read as NULL, and the generator never produces empty
+    strings.
+    """
+    quote = connection.ops.quote_name
+    sql = (
+        f"COPY {quote(model._meta.db_table)} "
+        f"({', '.join(quote(model._meta.get_field(c).column) for c in columns)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        ["" if value is None else value for value in row] for row in rows
+    )
+
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+
+        if hasattr(raw_cursor, "copy"):
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            raw_cursor.copy_expert(sql, buffer)
+
+
+def _hundredths(value: Optional[int]) -> Optional[Decimal]:
+    return None if value is None else Decimal(value).scaleb(-2)
+
+
+def _summary_values(summary: List[int]) -> Tuple:
+    total_weight, graded_weight, weighted_result_sum, completed, pending = summary
+
+    return (
+        Decimal(total_weight).scaleb(-2),
+        Decimal(graded_weight).scaleb(-2),
+        Decimal(weighted_result_sum).scaleb(-4),
+        completed,
+        pending,
+    )
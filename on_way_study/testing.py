@@ -0,0 +1,93 @@
+"""
+Helpers shared by the test modules of the apps.
+"""
+
+from decimal import Decimal
+from typing import Dict, Optional
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.activity.models import Activity
+from apps.course.models import Course
+from apps.discipline.models import Discipline
+from apps.institution.models import Institution
+from apps.user.models import User
+from apps.user.nickname_index import nickname_index
+from on_way_study.response_cache import response_cache
+from security.credential_cache import credential_cache
+from security.tokens import issue_tokens
+
+TEST_SIGNATURE = "test-signature"
+TEST_PASSWORD = "test-password"
+
+
+def create_study_plan(nickname: str, activities: int = 1) -> Dict[type, object]:
+    """
+    Creates a user owning one institution, course and discipline.
+
+    Args:
+        nickname: The nickname of the user, whose password is `TEST_PASSWORD`.
+        activities: How many activities the discipline has.
+
+    Returns:
+        The first object of each model, by model.
+    """
+    user = User.objects.create(nickname=nickname, password=make_password(TEST_PASSWORD))
+    institution = Institution.objects.create(name=f"{nickname} institution", user=user)
+    course = Course.objects.create(
+        name=f"{nickname} course", acronym="C", semesters=8, instituition=institution
+    )
+    discipline = Discipline.objects.create(name=f"{nickname} discipline", curso=course)
+    created = [
+        Activity.objects.create(
+            name=f"{nickname} activity {i}",
+            discipline=discipline,
+            weight=Decimal("2.00"),
+        )
+        for i in range(activities)
+    ]
+
+    return {
+        User: user,
+        Institution: institution,
+        Course: course,
+        Discipline: discipline,
+        Activity: created[0] if created else None,
+    }
+
+
+class ApiTestCase(TestCase):
+    """
+    `TestCase` for requests to the API.
+
+    The API signature is set to `TEST_SIGNATURE`, and the in-process caches are
+    emptied before each test, since the primary keys of the rolled back rows
+    are reused by the next tests. The nickname index is rebuilt from the test
+    database, so no background build races the test transaction.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        for module in ("security.middleware", "on_way_study.query_budget"):
+            self.enterContext(
+                mock.patch(f"{module}.ON_WAY_STUDY_API_KEY_SIGNARURE", TEST_SIGNATURE)
+            )
+
+        response_cache.cache.clear()
+        credential_cache.clear()
+        nickname_index.rebuild()
+
+    def api_client(self, user: Optional[User] = None) -> APIClient:
+        """
+        Returns a client sending the API signature and, for a user, its access token.
+        """
+        client = APIClient(HTTP_X_ON_WAY_STUDY_API_SIGNATURE=TEST_SIGNATURE)
+
+        if user is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {issue_tokens(user)['access']}"
+            )
+
+        return client
@@ -0,0 +1,564 @@
+import base64
+import json
+import re
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.signals import request_started
+from django.db import close_old_connections, connection
+from django.middleware.csrf import CsrfViewMiddleware
+from django.conf import settings
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from rest_framework.utils.encoders import JSONEncoder
+from apps.activity.models import Activity
+from apps.activity.serializers import ActivitySerializer
+from apps.activity.summaries import recompute_grade_summaries
+from apps.course.models import Course
+from apps.course.serializers import CourseSerializer
+from apps.discipline.models import Discipline
+from apps.discipline.serializers import DisciplineSerializer
+from apps.institution.models import Institution
+from apps.institution.serializers import InstitutionSerializer
+from apps.user.models import User
+from benchmarks.load import QUERIES_PATTERN
+from environment import get_modification_time
+from on_way_study.checks import (
+    check_database_pool_driver,
+    check_shared_cache_backends,
+)
+from on_way_study.handlers import RouteAwareWSGIHandler
+from on_way_study.lean import LeanSerializer
+from on_way_study.metrics import RequestMetrics, metrics_registry
+from on_way_study.query_budget import QueryBudgetHarness, RouteQueries
+from on_way_study.testing import TEST_SIGNATURE, ApiTestCase, create_study_plan
+from on_way_study.synthetic_dataset import (
+    COLUMNS,
+    SUMMARY_COLUMNS,
+    SyntheticDatasetGenerator,
+)
+from security.tokens import issue_tokens
+
+
+class ConditionalListTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("conditional", activities=2)
+        self.client = self.api_client(self.plan[User])
+
+    def delete_activity(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/activities/{self.plan[Activity].pk}/")
+
+    def test_list_is_validated_by_its_etag_only(self):
+        response = self.client.get("/api/activities/")
+
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(
+            304,
+            self.client.get(
+                "/api/activities/", HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+        )
+
+    def test_delete_changes_the_list_validators(self):
+        etag = self.client.get("/api/activities/")["ETag"]
+        since = http_date()
+        self.delete_activity()
+
+        for headers in (
+            {"HTTP_IF_NONE_MATCH": etag},
+            {"HTTP_IF_MODIFIED_SINCE": since},
+            {"HTTP_IF_NONE_MATCH": etag, "HTTP_IF_MODIFIED_SINCE": since},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get("/api/activities/", **headers)
+
+                self.assertEqual(200, response.status_code)
+                self.assertEqual(1, len(response.json()["results"]))
+
+    def test_retrieve_keeps_last_modified(self):
+        path = f"/api/courses/{self.plan[Course].pk}/"
+        response = self.client.get(path)
+
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(
+            304,
+            self.client.get(
+                path, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            ).status_code,
+        )
+
+    def test_agenda_is_validated_by_its_etag_only(self):
+        response = self.client.get("/api/activities/agenda/")
+        self.delete_activity()
+
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(
+            200,
+            self.client.get(
+                "/api/activities/agenda/", HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+        )
+
+
+class MetricsTests(ApiTestCase):
+    SERVER_TIMING = re.compile(
+        r'^auth;dur=\d+\.\d{3}, db;dur=\d+\.\d{3};desc="\d+ queries", '
+        r"serialize;dur=\d+\.\d{3}, total;dur=\d+\.\d{3}$"
+    )
+    SAMPLE = re.compile(r'^[a-z_]+(\{[a-z]+="[^"]*"(,[a-z]+="[^"]*")*\})? \d+(\.\d+)?$')
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(
+            mock.patch(
+                "on_way_study.metrics.ON_WAY_STUDY_API_KEY_SIGNARURE", TEST_SIGNATURE
+            )
+        )
+        metrics_registry.reset()
+        self.plan = create_study_plan("metrics", activities=2)
+        self.client = self.api_client(self.plan[User])
+
+    def test_server_timing_reports_the_queries_of_the_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/activities/")
+
+        self.assertRegex(response["Server-Timing"], self.SERVER_TIMING)
+        self.assertEqual(
+            str(len(queries)),
+            QUERIES_PATTERN.search(response["Server-Timing"]).group(1),
+        )
+
+    def test_server_timing_always_reports_the_database(self):
+        metrics = RequestMetrics()
+        metrics.add("auth", 0.0012)
+
+        self.assertEqual(
+            'auth;dur=1.200, db;dur=0.000;desc="0 queries", total;dur=9.800',
+            metrics.server_timing(0.0098),
+        )
+
+    def test_metrics_require_the_api_signature(self):
+        self.assertEqual(403, self.client_class().get("/metrics/").status_code)
+
+    def test_metrics_are_rendered_in_the_prometheus_text_format(self):
+        self.client.get("/api/activities/")
+        response = self.client.get("/metrics/")
+        lines = response.content.decode().splitlines()
+        samples = [line for line in lines if not line.startswith("#")]
+        route = 'route="activity-list",method="GET"'
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            "text/plain; version=0.0.4; charset=utf-8", response["Content-Type"]
+        )
+        self.assertTrue(response.content.endswith(b"\n"))
+        self.assertIn("# TYPE on_way_study_request_duration_seconds histogram", lines)
+        self.assertIn(
+            "on_way_study_request_duration_seconds_bucket{" + route + ',le="+Inf"} 1',
+            samples,
+        )
+        self.assertIn(
+            "on_way_study_request_duration_seconds_count{" + route + "} 1", samples
+        )
+        self.assertTrue(
+            any(
+                line.startswith(
+                    "on_way_study_request_phase_duration_seconds_sum{"
+                    + route
+                    + ',phase="db"}'
+                )
+                for line in samples
+            )
+        )
+        self.assertIn("# TYPE on_way_study_credential_cache_size gauge", lines)
+        self.assertIn("# TYPE on_way_study_response_cache_misses_total counter", lines)
+
+        for line in samples:
+            with self.subTest(line=line):
+                self.assertRegex(line, self.SAMPLE)
+
+
+class KeysetCursorPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("keyset", activities=7)
+        self.client = self.api_client(self.plan[User])
+        now = get_modification_time()
+        activities = list(Activity.objects.order_by("id"))
+
+        for i, activity in enumerate(activities):
+            # The first four activities share their creation time.
+            activity.created_at = now + timedelta(seconds=max(i - 3, 0))
+
+        Activity.objects.bulk_update(activities, ["created_at"])
+        self.ordered_ids = [
+            activity.pk for activity in sorted(activities, key=lambda a: a.created_at)
+        ]
+
+    def walk(self, path, link):
+        ids = []
+
+        while path is not None:
+            page = self.client.get(path).json()
+            ids += [activity["id"] for activity in page["results"]]
+            path = page[link]
+
+        return ids, page
+
+    def test_next_cursors_walk_every_row_once_across_ties(self):
+        ids, last_page = self.walk("/api/activities/?page_size=2", "next")
+
+        self.assertEqual(self.ordered_ids, ids)
+        self.assertIsNotNone(last_page["previous"])
+
+    def test_previous_cursors_walk_back_to_the_first_page(self):
+        _, last_page = self.walk("/api/activities/?page_size=2", "next")
+        pages = []
+        path = last_page["previous"]
+
+        while path is not None:
+            page = self.client.get(path).json()
+            pages.insert(0, [activity["id"] for activity in page["results"]])
+            path = page["previous"]
+
+        ids = [pk for page in pages for pk in page]
+        last_ids = [activity["id"] for activity in last_page["results"]]
+
+        self.assertEqual(self.ordered_ids, ids + last_ids)
+        self.assertEqual([2] * len(pages), [len(page) for page in pages])
+
+    def test_malformed_cursors_are_rejected_with_400(self):
+        def encode(value):
+            return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+        for cursor in (
+            "!!!",
+            base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+            encode(["2024-01-01T00:00:00+00:00", 1]),
+            encode(["not-a-date", 1, 0]),
+            encode([["2024-01-01"], 1, 0]),
+            encode(["2024-01-01T00:00:00+00:00", 2**64, 0]),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/activities/", {"cursor": cursor})
+
+                self.assertEqual(400, response.status_code)
+                self.assertEqual({"cursor": "Invalid cursor."}, response.json())
+
+
+class AsyncReadViewTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("async-read")
+        self.headers = {
+            "X-On-Way-Study-Api-Signature": TEST_SIGNATURE,
+            "Authorization": f"Bearer {issue_tokens(self.plan[User])['access']}",
+        }
+
+    def async_get(self, path: str, **headers):
+        return AsyncClient().get(path, headers={**self.headers, **headers})
+
+    async def test_malformed_basic_credentials_are_rejected(self):
+        response = await self.async_get("/api/courses/", Authorization="Basic !!!")
+
+        self.assertEqual(403, response.status_code)
+        self.assertIn("Invalid credentials", response.json()["detail"])
+
+    async def test_reads_share_the_response_cache_with_the_viewset(self):
+        for path in ("/api/courses/", f"/api/courses/{self.plan[Course].pk}/"):
+            with self.subTest(path=path):
+                response = await self.async_get(path)
+                cached = await sync_to_async(self.api_client(self.plan[User]).get)(path)
+
+                self.assertEqual(
+                    ("MISS", "HIT"), (response["X-Cache"], cached["X-Cache"])
+                )
+                self.assertEqual(response.content, cached.content)
+                self.assertEqual(response["ETag"], cached["ETag"])
+
+                not_modified = await self.async_get(
+                    path, **{"If-None-Match": response["ETag"]}
+                )
+
+                self.assertEqual(
+                    (304, "HIT"), (not_modified.status_code, not_modified["X-Cache"])
+                )
+
+
+class RecordingMiddleware:
+    """Records in `calls` which chain served a request and ran its `process_view`."""
+
+    calls: List[str] = []
+    chain = ""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        self.calls.append(self.chain)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.calls.append(f"{self.chain}.process_view")
+
+
+class DefaultChainMiddleware(RecordingMiddleware):
+    chain = "default"
+
+
+class ApiChainMiddleware(RecordingMiddleware):
+    chain = "api"
+
+
+@override_settings(
+    MIDDLEWARE=settings.MIDDLEWARE + ["on_way_study.tests.DefaultChainMiddleware"],
+    ON_WAY_STUDY_API_MIDDLEWARE={
+        **settings.ON_WAY_STUDY_API_MIDDLEWARE,
+        "MIDDLEWARE": settings.ON_WAY_STUDY_API_MIDDLEWARE["MIDDLEWARE"]
+        + ["on_way_study.tests.ApiChainMiddleware"],
+    },
+)
+class RouteAwareHandlerTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        RecordingMiddleware.calls.clear()
+        # The handler would close the connection of the test transaction.
+        request_started.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.csrf_view = self.enterContext(
+            mock.patch.object(
+                CsrfViewMiddleware, "process_view", autospec=True, return_value=None
+            )
+        )
+        self.handler = RouteAwareWSGIHandler()
+
+    def serve(self, path: str, **headers) -> int:
+        environ = RequestFactory().get(path, **headers).environ
+        statuses = []
+        self.handler(environ, lambda status, _: statuses.append(status))
+
+        return int(statuses[0].split()[0])
+
+    def test_api_requests_only_run_the_api_chain(self):
+        user = create_study_plan("handler")[User]
+        status = self.serve(
+            "/api/institutions/",
+            HTTP_X_ON_WAY_STUDY_API_SIGNATURE=TEST_SIGNATURE,
+            HTTP_AUTHORIZATION=f"Bearer {issue_tokens(user)['access']}",
+        )
+
+        self.assertEqual(200, status)
+        self.assertEqual(["api", "api.process_view"], RecordingMiddleware.calls)
+        self.csrf_view.assert_not_called()
+
+    def test_admin_requests_only_run_the_default_chain(self):
+        status = self.serve("/admin/login/")
+
+        self.assertEqual(200, status)
+        self.assertEqual(["default", "default.process_view"], RecordingMiddleware.calls)
+        self.csrf_view.assert_called()
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_in_memory_caches_are_reported(self):
+        self.assertEqual(
+            ["on_way_study.W001", "on_way_study.W001"],
+            [warning.id for warning in check_shared_cache_backends(None)],
+        )
+
+    def test_shared_caches_pass(self):
+        shared = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/on-way-study-check",
+        }
+
+        with override_settings(CACHES={"default": shared, "responses": shared}):
+            self.assertEqual([], check_shared_cache_backends(None))
+
+
+class DatabasePoolCheckTests(SimpleTestCase):
+    def check(self, pool_max_size, installed):
+        with override_settings(ON_WAY_STUDY_DB={"POOL_MAX_SIZE": pool_max_size}):
+            with mock.patch(
+                "on_way_study.checks.find_spec",
+                side_effect=lambda module: module in installed or None,
+            ):
+                return [error.id for error in check_database_pool_driver(None)]
+
+    def test_pool_without_psycopg3_fails(self):
+        self.assertEqual(["on_way_study.E001"], self.check(4, {"psycopg"}))
+        self.assertEqual(["on_way_study.E001"], self.check(4, set()))
+
+    def test_pool_with_psycopg3_passes(self):
+        self.assertEqual([], self.check(4, {"psycopg", "psycopg_pool"}))
+
+    def test_persistent_connections_need_no_psycopg3(self):
+        self.assertEqual([], self.check(0, set()))
+
+
+class QueryBudgetTests(ApiTestCase):
+    def test_every_read_route_stays_within_its_budget(self):
+        harness = QueryBudgetHarness(scale=2, factor=5)
+        results = harness.run()
+
+        self.assertTrue(results)
+
+        for result in results:
+            with self.subTest(route=result.name):
+                self.assertEqual([], result.failures())
+
+    def test_every_budgeted_route_is_checked(self):
+        names = {result.name for result in QueryBudgetHarness(scale=1).run()}
+        budgeted = {
+            name
+            for name, viewset, action, _ in QueryBudgetHarness().routes()
+            if action in getattr(viewset, "query_budgets", {})
+        }
+
+        self.assertEqual(set(), budgeted - names)
+
+    def test_route_failing_with_an_error_status_fails_its_budget(self):
+        result = RouteQueries("user-detail", budget=1, duplicate_threshold=3)
+        result.queries = {1: 0, 10: 0}
+        result.statuses = {1: 403, 10: 403}
+
+        self.assertEqual(1, len(result.failures()))
+        self.assertIn("403", result.failures()[0])
+
+
+class SyntheticDatasetTests(TestCase):
+    def generate(self, seed: int, prefix: str):
+        generator = SyntheticDatasetGenerator(users=3, seed=seed, prefix=prefix)
+        counts = generator.run()
+        self.assertEqual(3, counts[User])
+
+        return self.dataset(f"{prefix}{seed}-")
+
+    def dataset(self, nickname_prefix: str) -> Dict[type, list]:
+        """The generated rows, in id order, without the ids and the nicknames."""
+        owners = {
+            User: "nickname__startswith",
+            Institution: "user__nickname__startswith",
+            Course: "owner__nickname__startswith",
+            Discipline: "owner__nickname__startswith",
+            Activity: "owner__nickname__startswith",
+        }
+
+        return {
+            model: list(
+                model.objects.filter(**{lookup: nickname_prefix})
+                .order_by("id")
+                .values_list(
+                    *(
+                        column
+                        for column in COLUMNS[model]
+                        if column not in ("nickname", "password")
+                        and not column.endswith("id")
+                    )
+                )
+            )
+            for model, lookup in owners.items()
+        }
+
+    def summaries(self) -> Dict[type, list]:
+        return {
+            model: list(model.objects.order_by("id").values_list(*SUMMARY_COLUMNS))
+            for model in (Course, Discipline)
+        }
+
+    def test_same_seed_generates_the_same_rows(self):
+        first = self.generate(7, "first-")
+
+        self.assertTrue(first[Activity])
+        self.assertEqual(first, self.generate(7, "second-"))
+        self.assertNotEqual(first, self.generate(8, "second-"))
+
+    def test_generated_summaries_match_a_recompute(self):
+        self.generate(7, "synthetic-")
+        generated = self.summaries()
+        recompute_grade_summaries()
+
+        self.assertEqual(self.summaries(), generated)
+
+
+class LeanSerializerTests(ApiTestCase):
+    """The lean list path serializes exactly like the `ModelSerializer`s."""
+
+    def setUp(self):
+        super().setUp()
+        self.plan = create_study_plan("lean", activities=0)
+        now = get_modification_time()
+        discipline = self.plan[Discipline]
+        Discipline.objects.bulk_create(
+            Discipline(
+                name=f"Discipline {i}",
+                extra_information=None if i % 2 else f"Room {i}",
+                curso=self.plan[Course],
+                owner=self.plan[User],
+                graded_weight=Decimal(i % 3),
+                weighted_result_sum=Decimal(i % 3) * Decimal("6.3333"),
+                completed_count=i % 4,
+                pending_count=i % 5,
+                updated_at=now if i % 2 else None,
+            )
+            for i in range(6)
+        )
+        Activity.objects.bulk_create(
+            Activity(
+                name=f"Activity {i} – revisão",
+                status="COMPLETED" if i % 3 == 0 else "PENDING",
+                weight=None if i % 4 == 0 else Decimal("1.50") + i,
+                result=None if i % 5 == 0 else Decimal("7.25"),
+                date=now - timedelta(days=i),
+                discipline=discipline,
+                owner=self.plan[User],
+                created_at=now - timedelta(seconds=i),
+                updated_at=now if i % 2 else None,
+            )
+            for i in range(10)
+        )
+
+    def test_lean_output_matches_the_model_serializer(self):
+        user = self.plan[User]
+        resources = [
+            (Institution.objects.filter(user=user), InstitutionSerializer),
+            (Course.objects.filter(owner=user), CourseSerializer),
+            (Discipline.objects.filter(owner=user), DisciplineSerializer),
+            (Activity.objects.filter(owner=user), ActivitySerializer),
+        ]
+
+        for queryset, serializer_class in resources:
+            queryset = queryset.order_by("created_at", "id")
+            lean = LeanSerializer.for_serializer(serializer_class)
+            expected = serializer_class(list(queryset), many=True).data
+            actual = lean.to_representation(queryset.values(*lean.columns))
+
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertEqual(
+                    [list(item.items()) for item in expected],
+                    [list(item.items()) for item in actual],
+                )
+
+    def test_lean_list_response_matches_the_serializer(self):
+        client = self.api_client(self.plan[User])
+        data = client.get("/api/activities/?page_size=200").json()["results"]
+        activities = Activity.objects.filter(owner=self.plan[User]).order_by(
+            "created_at", "id"
+        )
+        expected = ActivitySerializer(activities, many=True).data
+
+        self.assertEqual(json.loads(json.dumps(expected, cls=JSONEncoder)), data)
+        self.assertIn(None, [item["weight"] for item in data])
+        self.assertIn("2.50", [item["weight"] for item in data])
@@ -1,8 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
+from on_way_study.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("apps.user.urls")),
     path("api/", include("apps.institution.urls")),
+    path("api/", include("apps.course.urls")),
+    path("api/", include("apps.discipline.urls")),
+    path("api/", include("apps.activity.urls")),
+    path("api/", include("apps.search.urls")),
+    path("metrics/", metrics_view, name="metrics"),
 ]
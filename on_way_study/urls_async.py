@@ -0,0 +1,60 @@
+"""
+URLconf used for requests served over ASGI (see `AsyncReadRoutingMiddleware`).
+
+It is `on_way_study.urls` with the list and detail routes of the viewsets that
+define an `async_read_view` pointing to that native async view. The routes keep
+their order, so the extra actions of a viewset still win over its detail route.
+"""
+
+from django.urls import URLPattern, URLResolver
+from on_way_study.urls import urlpatterns as sync_urlpatterns
+
+ASYNC_READ_ACTIONS = ("list", "retrieve")
+
+
+def build_async_urlpatterns(patterns):
+    """
+    Copies the URL patterns, routing the eligible viewset reads to their async views.
+
+    Args:
+        patterns: The URL patterns (and nested resolvers) to copy.
+
+    Returns:
+        The list of URL patterns.
+    """
+    async_patterns = []
+
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            async_patterns.append(
+                URLResolver(
+                    pattern.pattern,
+                    build_async_urlpatterns(pattern.url_patterns),
+                    pattern.default_kwargs,
+                    pattern.app_name,
+                    pattern.namespace,
+                )
+            )
+        else:
+            async_patterns.append(_build_async_urlpattern(pattern))
+
+    return async_patterns
+
+
+def _build_async_urlpattern(pattern: URLPattern) -> URLPattern:
+    viewset = getattr(pattern.callback, "cls", None)
+    actions = getattr(pattern.callback, "actions", None) or {}
+    async_read_view = getattr(viewset, "async_read_view", None)
+
+    if async_read_view is None or actions.get("get") not in ASYNC_READ_ACTIONS:
+        return pattern
+
+    return URLPattern(
+        pattern.pattern,
+        async_read_view.as_view(sync_view=pattern.callback),
+        pattern.default_args,
+        pattern.name,
+    )
+
+
+urlpatterns = build_async_urlpatterns(sync_urlpatterns)
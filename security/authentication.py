@@ -1,11 +1,31 @@
+import asyncio
 import base64
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.hashers import check_password
 from rest_framework import authentication
 from rest_framework import exceptions
 from apps.user.models import User
-from typing import List
+from on_way_study.metrics import timed
+from on_way_study.prepared_statements import PreparedStatement
+from security import tokens
+from security.credential_cache import credential_cache
+from typing import List, Optional, Tuple
 from rest_framework.request import HttpRequest
 
+user_by_nickname = PreparedStatement("user_by_nickname", User, ["nickname"])
+user_by_feed_token = PreparedStatement(
+    "user_by_feed_token", User, ["id", "calendar_feed_version"]
+)
+
+password_hashing_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "ON_WAY_STUDY_ASYNC", {}).get(
+        "PASSWORD_HASHING_WORKERS", 4
+    ),
+    thread_name_prefix="password-hashing",
+)
+
 
 class OnWayStudyBaseAuthentication(authentication.BaseAuthentication):
     """
@@ -17,8 +37,13 @@ class OnWayStudyBaseAuthentication(authentication.BaseAuthentication):
     This authentication backend is designed to work with the custom `User`
     model, authenticating against the `nickname` field instead of
     the standard `username`.
+
+    Successfully verified credentials are kept in `credential_cache`, so repeated
+    requests with the same nickname and password skip the database lookup and
+    the password hashing.
     """
 
+    @timed("auth")
     def authenticate(self, request: HttpRequest):
         """
         Authenticates the request based on `nickname` and `password`.
@@ -45,8 +70,13 @@ class OnWayStudyBaseAuthentication(authentication.BaseAuthentication):
         self._validate_auth_header(basic_auth_header)
         nickname, password = self._get_auth_data(basic_auth_header)
 
-        user = self._get_user(nickname)
-        self._check_password(password, user)
+        cache_key = credential_cache.build_key(nickname, password)
+        user = credential_cache.get(cache_key)
+
+        if user is None:
+            user = self._get_user(nickname)
+            self._check_password(password, user)
+            credential_cache.set(cache_key, user)
 
         return (user, None)
 
@@ -132,16 +162,25 @@ class OnWayStudyBaseAuthentication(authentication.BaseAuthentication):
                 cannot be decoded, or does not split correctly.
         """
         try:
-            return base64.b64decode(basic_auth_header[1]).decode().split(":", 1)
+            auth_data = base64.b64decode(basic_auth_header[1], validate=True).decode()
         except (UnicodeDecodeError, ValueError, TypeError) as e:
             raise exceptions.AuthenticationFailed(
                 f"Invalid credentials. Could not decode: {e}"
             )
 
+        if ":" not in auth_data:
+            raise exceptions.AuthenticationFailed(
+                "Invalid credentials. The token must be 'nickname:password' encoded in Base64."
+            )
+
+        return auth_data.split(":", 1)
+
     def _get_user(self, nickname: str) -> User:
         """
         Retrieves the user from the database by their nickname.
 
+        The lookup runs as the `user_by_nickname` prepared statement.
+
         Args:
             nickname: The nickname provided in the credentials.
 
@@ -151,13 +190,15 @@ class OnWayStudyBaseAuthentication(authentication.BaseAuthentication):
         Raises:
             exceptions.AuthenticationFailed: If the user does not exist.
         """
-        try:
-            return User.objects.get(nickname=nickname)
-        except User.DoesNotExist:
+        user = user_by_nickname.fetch_one(nickname)
+
+        if user is None:
             raise exceptions.AuthenticationFailed(
                 f"The basic authenticate user nickname '{nickname}' was not found."
             )
 
+        return user
+
     def _check_password(self, password: str, user: User):
         """
         Validates the provided password against the user's stored hash.
@@ -171,3 +212,192 @@ class OnWayStudyBaseAuthentication(authentication.BaseAuthentication):
         """
         if not check_password(password, user.password):
             raise exceptions.AuthenticationFailed("Incorrect password.")
+
+
+class OnWayStudyTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Stateless authentication using the signed access tokens issued by `security.tokens`.
+
+    Clients must provide an `Authorization` header in the format:
+        `Bearer <access_token>`
+
+    The token is validated purely in memory (signature and lifetime) and the
+    `User` is rebuilt from its payload, so no database access and no password
+    hashing happen on authenticated requests.
+
+    Since the user is rebuilt from the `sub` and `nck` claims without reading
+    the database, an access token stays valid for its whole lifetime
+    (`ACCESS_TOKEN_TTL`) even after the user is deleted, renamed or changes
+    the password. Only the refresh token checks the current credentials.
+    """
+
+    keyword = b"bearer"
+
+    @timed("auth")
+    def authenticate(self, request: HttpRequest):
+        """
+        Authenticates the request based on a signed access token.
+
+        Args:
+            request: The HttpRequest object.
+
+        Returns:
+            A tuple of (user, token) on successful authentication.
+            Returns None if the authentication scheme is not `Bearer`.
+
+        Raises:
+            exceptions.AuthenticationFailed: If the token is missing, malformed,
+                tampered with or expired.
+        """
+        bearer_auth_header = authentication.get_authorization_header(request).split()
+
+        if not bearer_auth_header or bearer_auth_header[0].lower() != self.keyword:
+            return None
+
+        if len(bearer_auth_header) != 2:
+            raise exceptions.AuthenticationFailed(
+                "Invalid token header. The format must be 'Bearer <access_token>'."
+            )
+
+        try:
+            token = bearer_auth_header[1].decode()
+            payload = tokens.read_token(token, tokens.ACCESS_TOKEN)
+        except (UnicodeDecodeError, tokens.InvalidToken) as e:
+            raise exceptions.AuthenticationFailed(f"Invalid token. {e}")
+
+        return (self._build_user(payload), token)
+
+    def _build_user(self, payload: dict) -> User:
+        """
+        Rebuilds the authenticated user from the token payload without a database hit.
+
+        Args:
+            payload: The validated access token payload.
+
+        Returns:
+            A User instance with its `id` and `nickname` filled.
+        """
+        user = User(id=payload["sub"], nickname=payload["nck"])
+        user._state.adding = False
+        user._state.db = "default"
+
+        return user
+
+
+class OnWayStudyFeedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authentication of the calendar feeds by the feed token of their URL.
+
+    Calendar apps cannot send an `Authorization` header, so the token issued by
+    `security.tokens.issue_feed_token` is read from the `token` query parameter.
+    Unlike the access tokens, the user is loaded to check that the token was
+    not revoked, with the `user_by_feed_token` prepared statement.
+    """
+
+    query_param = "token"
+
+    @timed("auth")
+    def authenticate(self, request: HttpRequest):
+        """
+        Authenticates the request based on the feed token of its URL.
+
+        Args:
+            request: The HttpRequest object.
+
+        Returns:
+            A tuple of (user, token) on successful authentication.
+            Returns None if the URL has no token.
+
+        Raises:
+            exceptions.AuthenticationFailed: If the token is tampered with or
+                was revoked.
+        """
+        token = request.query_params.get(self.query_param)
+
+        if not token:
+            return None
+
+        try:
+            payload = tokens.read_token(token, tokens.FEED_TOKEN)
+        except tokens.InvalidToken as e:
+            raise exceptions.AuthenticationFailed(f"Invalid feed token. {e}")
+
+        user = user_by_feed_token.fetch_one(payload["sub"], payload["ver"])
+
+        if user is None:
+            raise exceptions.AuthenticationFailed("The feed token was revoked.")
+
+        return (user, token)
+
+
+class OnWayStudyAsyncAuthentication:
+    """
+    Async counterpart of `OnWayStudyTokenAuthentication` and `OnWayStudyBaseAuthentication`.
+
+    It accepts the same `Bearer` and `Basic` headers for the async read views.
+    Tokens and cached credentials are checked in memory, the generation of the
+    cached credentials is read from its synchronous cache backend through
+    `sync_to_async`, the user is loaded with the async ORM and the password
+    hashing, which is CPU bound, runs on the bounded `password_hashing_executor`
+    instead of blocking the event loop.
+    """
+
+    def __init__(self):
+        self.token_authentication = OnWayStudyTokenAuthentication()
+        self.base_authentication = OnWayStudyBaseAuthentication()
+
+    async def authenticate(self, request: HttpRequest) -> Tuple[User, Optional[str]]:
+        """
+        Authenticates the request with a bearer token or basic credentials.
+
+        Args:
+            request: The HttpRequest object.
+
+        Returns:
+            A tuple of (user, token), the token being None for basic credentials.
+
+        Raises:
+            exceptions.NotAuthenticated: If no supported `Authorization` header is sent.
+            exceptions.AuthenticationFailed: If the token or the credentials are invalid.
+        """
+        with timed("auth"):
+            token_result = self.token_authentication.authenticate(request)
+
+            if token_result is not None:
+                return token_result
+
+            basic_auth_header = authentication.get_authorization_header(request).split()
+
+            if not basic_auth_header or basic_auth_header[0].lower() != b"basic":
+                raise exceptions.NotAuthenticated(
+                    "Clients must provide an 'Authorization' header in the format "
+                    "'Basic <base64_encoded_nickname:password>' or 'Bearer <access_token>'."
+                )
+
+            self.base_authentication._validate_auth_header(basic_auth_header)
+            nickname, password = self.base_authentication._get_auth_data(
+                basic_auth_header
+            )
+            cache_key = await sync_to_async(credential_cache.build_key)(
+                nickname, password
+            )
+            user = credential_cache.get(cache_key)
+
+            if user is None:
+                user = await User.objects.filter(nickname=nickname).afirst()
+
+                if user is None:
+                    raise exceptions.AuthenticationFailed(
+                        f"The basic authenticate user nickname '{nickname}' was not found."
+                    )
+
+                is_valid = await asyncio.get_running_loop().run_in_executor(
+                    password_hashing_executor, check_password, password, user.password
+                )
+
+                if not is_valid:
+                    raise exceptions.AuthenticationFailed("Incorrect password.")
+
+                credential_cache.set(cache_key, user)
+
+            return (user, None)
@@ -0,0 +1,198 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from apps.user.models import User
+
+
+class VerifiedCredentialCache:
+    """
+    Bounded LRU + TTL cache of credentials that already passed `check_password`.
+
+    Each entry is keyed by the nickname, the nickname's generation and an
+    HMAC-SHA256 digest of the presented secret (keyed with the Django
+    `SECRET_KEY`), so the plain-text password is never kept in memory. The value
+    is the resolved `User` instance.
+
+    The entries live in this process, but the generations live in the Django
+    cache selected by `ALIAS`, like the ones of `ResponseCache`. A password
+    change, rename or delete bumps the generation of the nickname, and every
+    process then stops matching its older entries, which simply expire. With
+    the in-memory backend the generations are per process as well, so the other
+    processes keep accepting the old credentials until `TTL` expires: several
+    processes must share a file, memcached or redis backend.
+    """
+
+    def __init__(
+        self, max_size: int = 1024, ttl: float = 300.0, alias: str = "default"
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[User, float]]" = (
+            OrderedDict()
+        )
+        self._keys_by_nickname: Dict[str, Set[Tuple[str, int, str]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def build_key(self, nickname: str, password: str) -> Tuple[str, int, str]:
+        """
+        Builds the key of the credentials for the current generation of the nickname.
+
+        The key must be built before the user is read: a credential is then stored
+        under the generation it was verified in, so a password change that lands
+        meanwhile still invalidates it.
+
+        Args:
+            nickname: The nickname provided in the credentials.
+            password: The plain-text password provided in the credentials.
+
+        Returns:
+            The cache key.
+        """
+        digest = hmac.new(
+            settings.SECRET_KEY.encode(), password.encode(), hashlib.sha256
+        ).hexdigest()
+
+        return (nickname, self._generation(nickname), digest)
+
+    def get(self, key: Tuple[str, int, str]) -> Optional[User]:
+        """
+        Returns the cached user for the given credentials, if still valid.
+
+        Args:
+            key: The key built by `build_key`.
+
+        Returns:
+            The cached User instance, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Tuple[str, int, str], user: User):
+        """
+        Stores a verified credential, evicting the least recently used entry when full.
+
+        Args:
+            key: The key built by `build_key` before the user was read.
+            user: The User instance the credentials resolved to.
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_nickname.setdefault(key[0], set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, nickname: str):
+        """
+        Drops every cached credential of the given nickname, in every process.
+
+        The entries of this process are dropped at once, and the generation of the
+        nickname is bumped once the current transaction commits, which makes the
+        entries of the other processes unreachable. Bumping after the commit
+        ensures a concurrent login cannot store the old credentials under the
+        new generation.
+
+        Args:
+            nickname: The nickname whose entries must be removed.
+        """
+        with self._lock:
+            for key in list(self._keys_by_nickname.get(nickname, ())):
+                self._remove(key)
+
+        transaction.on_commit(lambda: self._bump(nickname))
+
+    def clear(self):
+        """Drops every cached credential and resets the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_nickname.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            A dictionary with the `hits`, `misses` and current `size` of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def _remove(self, key: Tuple[str, int, str]):
+        self._entries.pop(key, None)
+        keys = self._keys_by_nickname.get(key[0])
+
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_nickname[key[0]]
+
+    def _bump(self, nickname: str):
+        key = self._generation_key(nickname)
+
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self._generation(nickname)
+
+    def _generation(self, nickname: str) -> int:
+        """
+        Returns the current generation of the nickname.
+
+        A missing (or evicted) generation restarts from the current time in
+        nanoseconds, never from a number that older entries may still carry.
+        """
+        key = self._generation_key(nickname)
+        generation = self.cache.get(key)
+
+        if generation is None:
+            self.cache.add(key, time.time_ns(), None)
+            generation = self.cache.get(key)
+
+        return generation
+
+    def _generation_key(self, nickname: str) -> str:
+        digest = hashlib.sha1(nickname.encode()).hexdigest()
+
+        return f"credential-cache:generation:{digest}"
+
+
+_cache_settings = getattr(settings, "ON_WAY_STUDY_CREDENTIAL_CACHE", {})
+
+credential_cache = VerifiedCredentialCache(
+    max_size=_cache_settings.get("MAX_SIZE", 1024),
+    ttl=_cache_settings.get("TTL", 300),
+    alias=_cache_settings.get("ALIAS", "default"),
+)
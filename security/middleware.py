@@ -1,33 +1,177 @@
+import hmac
+import warnings
+from typing import Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.http import JsonResponse
 from rest_framework.status import HTTP_403_FORBIDDEN
 from environment import ON_WAY_STUDY_API_KEY_SIGNARURE
+from on_way_study.metrics import (
+    DuplicateQueryWarning,
+    RequestMetrics,
+    current_request_metrics,
+    metrics_registry,
+)
 
 
 class RequiredHeaderMiddleware:
+    """
+    Rejects the requests without a valid `X-On-Way-Study-API-Signature` header.
+
+    The rejection is answered from here, before authentication or any database
+    work, and the signature is compared in constant time. The admin and the
+    CORS preflight (`OPTIONS`) requests are not checked, nor are the requests
+    to `ON_WAY_STUDY_TOKENS["FEED_PATHS"]` with a feed `token` in their URL,
+    which the view authenticates instead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
         self.header_name = "HTTP_X_ON_WAY_STUDY_API_SIGNATURE"
-        self.expected_value = ON_WAY_STUDY_API_KEY_SIGNARURE
+        self.expected_value = (ON_WAY_STUDY_API_KEY_SIGNARURE or "").encode()
+        self.feed_paths = frozenset(
+            getattr(settings, "ON_WAY_STUDY_TOKENS", {}).get("FEED_PATHS", [])
+        )
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        rejection = self._check_request(request)
+
+        if rejection is not None:
+            return rejection
+
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        rejection = self._check_request(request)
+
+        if rejection is not None:
+            return rejection
+
+        return await self.get_response(request)
+
+    def _check_request(self, request) -> Optional[JsonResponse]:
         if request.path.startswith("/admin/"):
-            return self.get_response(request)
+            return None
 
         if request.method == "OPTIONS":
-            return self.get_response(request)
+            return None
 
-        self._validate_header_value(request.META.get(self.header_name, None))
+        if request.path in self.feed_paths and "token" in request.GET:
+            return None
 
-        return self.get_response(request)
+        return self._validate_header_value(request.META.get(self.header_name, None))
 
-    def _validate_header_value(self, header_value: str):
+    def _validate_header_value(
+        self, header_value: Optional[str]
+    ) -> Optional[JsonResponse]:
         if header_value is None:
             return JsonResponse(
                 {"error": "Missing header required API Signature"},
                 status=HTTP_403_FORBIDDEN,
             )
 
-        if header_value != self.expected_value:
+        if not self.expected_value or not hmac.compare_digest(
+            header_value.encode(), self.expected_value
+        ):
             return JsonResponse(
                 {"error": "Invalid header API Signature"}, status=HTTP_403_FORBIDDEN
             )
+
+        return None
+
+
+class ServerTimingMiddleware:
+    """
+    Measures every request and reports where its time went.
+
+    While the request is served, its `RequestMetrics` are the
+    `current_request_metrics`: authentication and serializers record their
+    phases into them and the `record_query` execute wrapper counts and times the
+    database queries. The result is sent back as a `Server-Timing` header
+    (`auth`, `db`, `serialize` and `total`, in milliseconds) and added to the
+    per-route histograms of `metrics_registry`.
+
+    With `DEBUG`, a `DuplicateQueryWarning` reports every SQL statement run at
+    least `DUPLICATE_QUERY_THRESHOLD` times by a single request, the usual sign
+    of a lookup repeated for each row of a list (N+1).
+
+    It should be the first middleware, so that `total` covers the whole chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics_settings = getattr(settings, "ON_WAY_STUDY_METRICS", {})
+        self.enabled = metrics_settings.get("ENABLED", True)
+        self.server_timing = metrics_settings.get("SERVER_TIMING", True)
+        self.duplicate_query_threshold = metrics_settings.get(
+            "DUPLICATE_QUERY_THRESHOLD", 3
+        )
+        self.track_statements = settings.DEBUG and bool(self.duplicate_query_threshold)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics = RequestMetrics(self.track_statements)
+        token = current_request_metrics.set(metrics)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+
+        return self._report(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics(self.track_statements)
+        token = current_request_metrics.set(metrics)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+
+        return self._report(request, response, metrics)
+
+    def _report(self, request, response, metrics: RequestMetrics):
+        total = metrics.elapsed()
+        resolver_match = getattr(request, "resolver_match", None)
+        route = (resolver_match.view_name if resolver_match else None) or "unmatched"
+        metrics_registry.observe_request(route, request.method, metrics, total)
+
+        if self.server_timing:
+            response["Server-Timing"] = metrics.server_timing(total)
+
+        if self.track_statements:
+            self._warn_duplicated_statements(request, route, metrics)
+
+        return response
+
+    def _warn_duplicated_statements(self, request, route: str, metrics: RequestMetrics):
+        for sql, count in metrics.duplicated_statements(self.duplicate_query_threshold):
+            warnings.warn(
+                f"{request.method} {request.path} ({route}) ran the same query "
+                f"{count} times, a possible N+1: {sql}",
+                DuplicateQueryWarning,
+            )
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -10,6 +11,10 @@ class IsOwner(permissions.BasePermission):
         """
         Allows access if the logged-in user is the same as the object they are trying to access.
 
+        The owner is compared by primary key, so no related object is fetched:
+        institutions expose `user_id`, and courses, disciplines and activities
+        store a denormalized `owner_id`.
+
         Args:
             request: `request.user` is the user who was authenticated by **OnWayStudyBaseAuthentication** class.
             obj: `obj` is the instance of the User being accessed.
@@ -17,7 +22,32 @@ class IsOwner(permissions.BasePermission):
         Returns:
             _type_: True if the user owns the object. False otherwise.
         """
-        if hasattr(obj, "user"):
-            return obj.user == request.user
+        if hasattr(obj, "owner_id"):
+            return obj.owner_id == request.user.pk
+
+        if hasattr(obj, "user_id"):
+            return obj.user_id == request.user.pk
 
         return obj == request.user
+
+
+class IsStaff(permissions.BasePermission):
+    """
+    Allows access only to the users listed in `ON_WAY_STUDY_STAFF["NICKNAMES"]`.
+    """
+
+    def has_permission(self, request, view):
+        """
+        Allows access if the logged-in user's nickname is a staff nickname.
+
+        The nickname is read from `request.user`, so no query is needed.
+
+        Args:
+            request: `request.user` is the user who was authenticated by the view.
+
+        Returns:
+            bool: True if the user is staff. False otherwise.
+        """
+        staff_settings = getattr(settings, "ON_WAY_STUDY_STAFF", {})
+
+        return request.user.nickname in staff_settings.get("NICKNAMES", [])
@@ -0,0 +1,165 @@
+import base64
+import time
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework.exceptions import AuthenticationFailed
+from apps.user.models import User
+from on_way_study.testing import TEST_PASSWORD, ApiTestCase
+from security import tokens
+from security.authentication import (
+    OnWayStudyAsyncAuthentication,
+    OnWayStudyBaseAuthentication,
+)
+from security.credential_cache import VerifiedCredentialCache
+
+MALFORMED_BASIC_HEADERS = [
+    "Basic !!!",
+    f"Basic {base64.b64encode(b'no-colon').decode()}",
+    f"Basic {base64.b64encode(bytes([255, 254])).decode()}",
+]
+
+
+class MalformedBasicCredentialsTests(SimpleTestCase):
+    def requests(self):
+        for header in MALFORMED_BASIC_HEADERS:
+            yield header, RequestFactory().get(
+                "/api/courses/", HTTP_AUTHORIZATION=header
+            )
+
+    def test_sync_authentication_rejects_them(self):
+        for header, request in self.requests():
+            with self.subTest(header=header):
+                with self.assertRaises(AuthenticationFailed):
+                    OnWayStudyBaseAuthentication().authenticate(request)
+
+    async def test_async_authentication_rejects_them(self):
+        for header, request in self.requests():
+            with self.subTest(header=header):
+                with self.assertRaises(AuthenticationFailed):
+                    await OnWayStudyAsyncAuthentication().authenticate(request)
+
+
+class VerifiedCredentialCacheTests(TestCase):
+    def setUp(self):
+        self.user = User(nickname="cached", password="-")
+        self.worker, self.other_worker = (
+            VerifiedCredentialCache(),
+            VerifiedCredentialCache(),
+        )
+
+    def invalidate_in_other_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_worker.invalidate("cached")
+
+    def test_invalidation_reaches_every_worker(self):
+        self.worker.set(self.worker.build_key("cached", "old"), self.user)
+        self.invalidate_in_other_worker()
+
+        self.assertIsNone(self.worker.get(self.worker.build_key("cached", "old")))
+
+    def test_login_verified_before_an_invalidation_is_not_served(self):
+        key = self.worker.build_key("cached", "old")
+        self.invalidate_in_other_worker()
+        self.worker.set(key, self.user)
+
+        self.assertIsNone(self.worker.get(self.worker.build_key("cached", "old")))
+
+
+class TokenFlowTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(
+            nickname="holder", password=make_password(TEST_PASSWORD)
+        )
+        self.client = self.api_client()
+
+    def obtain(self, nickname="holder", password=TEST_PASSWORD):
+        return self.client.post(
+            "/api/tokens/", {"nickname": nickname, "password": password}, format="json"
+        )
+
+    def refresh(self, refresh_token):
+        return self.client.post(
+            "/api/tokens/refresh/", {"refresh": refresh_token}, format="json"
+        )
+
+    def get_user(self, access_token):
+        return self.client.get(
+            "/api/users/holder/", HTTP_AUTHORIZATION=f"Bearer {access_token}"
+        )
+
+    def update_user(self, data):
+        client = self.api_client(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch("/api/users/holder/", data, format="json")
+
+        self.assertEqual(200, response.status_code)
+
+    def assertRejected(self, response):
+        # Neither authentication class sends a WWW-Authenticate challenge, so
+        # DRF answers a failed authentication with 403 instead of 401.
+        self.assertEqual(403, response.status_code)
+        self.assertIn("detail", response.json())
+
+    def expire(self, ttl):
+        return mock.patch(
+            "django.core.signing.time.time", return_value=time.time() + ttl + 1
+        )
+
+    def test_obtains_a_token_pair_with_the_credentials(self):
+        response = self.obtain()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(tokens.ACCESS_TOKEN_TTL, response.json()["expires_in"])
+        self.assertEqual(200, self.get_user(response.json()["access"]).status_code)
+
+    def test_rejects_wrong_credentials(self):
+        self.assertRejected(self.obtain(password="wrong"))
+        self.assertRejected(self.obtain(nickname="nobody"))
+
+    def test_refreshes_the_token_pair(self):
+        refreshed = self.refresh(self.obtain().json()["refresh"])
+
+        self.assertEqual(200, refreshed.status_code)
+        self.assertEqual(200, self.get_user(refreshed.json()["access"]).status_code)
+
+    def test_rejects_expired_tokens(self):
+        pair = self.obtain().json()
+
+        with self.expire(tokens.ACCESS_TOKEN_TTL):
+            self.assertRejected(self.get_user(pair["access"]))
+
+        with self.expire(tokens.REFRESH_TOKEN_TTL):
+            self.assertRejected(self.refresh(pair["refresh"]))
+
+    def test_rejects_tampered_tokens(self):
+        pair = self.obtain().json()
+
+        for token in (pair["access"], pair["refresh"]):
+            value, signature = token.rsplit(":", 1)
+            flipped = "A" if signature[0] != "A" else "B"
+
+            with self.subTest(token=token):
+                tampered = f"{value}:{flipped}{signature[1:]}"
+                self.assertRejected(self.get_user(tampered))
+                self.assertRejected(self.refresh(tampered))
+
+    def test_rejects_a_token_of_the_other_type(self):
+        pair = self.obtain().json()
+
+        self.assertRejected(self.get_user(pair["refresh"]))
+        self.assertRejected(self.refresh(pair["access"]))
+
+    def test_rejects_the_refresh_token_after_a_password_change(self):
+        refresh_token = self.obtain().json()["refresh"]
+        self.update_user({"password": "another-password"})
+
+        self.assertRejected(self.refresh(refresh_token))
+
+    def test_rejects_the_refresh_token_after_a_rename(self):
+        refresh_token = self.obtain().json()["refresh"]
+        self.update_user({"nickname": "renamed"})
+
+        self.assertRejected(self.refresh(refresh_token))
@@ -0,0 +1,134 @@
+from typing import Dict
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+from apps.user.models import User
+from environment import ON_WAY_STUDY_DJANGO_SECRET_KEY
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+FEED_TOKEN = "feed"
+
+_SALT = "security.tokens"
+_token_settings = getattr(settings, "ON_WAY_STUDY_TOKENS", {})
+
+ACCESS_TOKEN_TTL = _token_settings.get("ACCESS_TTL", 900)
+REFRESH_TOKEN_TTL = _token_settings.get("REFRESH_TTL", 86400)
+
+
+class InvalidToken(Exception):
+    """Raised when a token is malformed, tampered with, expired or of the wrong type."""
+
+
+def issue_tokens(user: User) -> Dict[str, object]:
+    """
+    Issues a new pair of access and refresh tokens for the user.
+
+    The access token is short-lived and carries everything needed to authenticate
+    a request. The refresh token lives longer and carries a fingerprint of the
+    user's credentials, so it stops working once the nickname or password change.
+
+    Args:
+        user: The authenticated User instance.
+
+    Returns:
+        A dictionary with the `access` and `refresh` tokens and the access token
+        lifetime in seconds (`expires_in`).
+    """
+    access = _sign({"typ": ACCESS_TOKEN, "sub": user.pk, "nck": user.nickname})
+    refresh = _sign(
+        {"typ": REFRESH_TOKEN, "sub": user.pk, "fpr": credentials_fingerprint(user)}
+    )
+
+    return {"access": access, "refresh": refresh, "expires_in": ACCESS_TOKEN_TTL}
+
+
+def issue_feed_token(user: User) -> str:
+    """
+    Issues the token of the user's calendar feed.
+
+    Calendar apps poll the feed URL for months without sending headers, so the
+    token does not expire. It carries the user's `calendar_feed_version`
+    instead, and bumping the version revokes every feed token issued before.
+
+    Args:
+        user: The User instance, loaded from the database.
+
+    Returns:
+        The feed token.
+    """
+    return _sign({"typ": FEED_TOKEN, "sub": user.pk, "ver": user.calendar_feed_version})
+
+
+def read_token(token: str, token_type: str) -> Dict[str, object]:
+    """
+    Validates the signature, the lifetime and the type of a token.
+
+    The validation is done purely in memory: no database access and no
+    password hashing are involved.
+
+    Args:
+        token: The token sent by the client.
+        token_type: The expected token type (`access`, `refresh` or `feed`).
+            Feed tokens do not expire.
+
+    Raises:
+        InvalidToken: If the token is malformed, tampered with, expired or
+            is not of the expected type.
+
+    Returns:
+        The token payload.
+    """
+    max_age = {ACCESS_TOKEN: ACCESS_TOKEN_TTL, REFRESH_TOKEN: REFRESH_TOKEN_TTL}.get(
+        token_type
+    )
+
+    try:
+        payload = signing.loads(
+            token, key=ON_WAY_STUDY_DJANGO_SECRET_KEY, salt=_SALT, max_age=max_age
+        )
+    except signing.SignatureExpired:
+        raise InvalidToken("The token has expired.")
+    except signing.BadSignature:
+        raise InvalidToken("The token signature is invalid.")
+
+    if not isinstance(payload, dict) or payload.get("typ") != token_type:
+        raise InvalidToken(f"The token is not a valid {token_type} token.")
+
+    return payload
+
+
+def credentials_fingerprint(user: User) -> str:
+    """
+    Builds a keyed fingerprint of the user's current nickname and password hash.
+
+    Args:
+        user: The User instance.
+
+    Returns:
+        The hexadecimal fingerprint.
+    """
+    return salted_hmac(
+        _SALT,
+        f"{user.nickname}:{user.password}",
+        secret=ON_WAY_STUDY_DJANGO_SECRET_KEY,
+        algorithm="sha256",
+    ).hexdigest()
+
+
+def is_fingerprint_valid(user: User, fingerprint: str) -> bool:
+    """
+    Checks, in constant time, if a fingerprint matches the user's current credentials.
+
+    Args:
+        user: The User instance.
+        fingerprint: The fingerprint carried by a refresh token.
+
+    Returns:
+        bool: True if the fingerprint matches, otherwise False.
+    """
+    return constant_time_compare(credentials_fingerprint(user), fingerprint)
+
+
+def _sign(payload: Dict[str, object]) -> str:
+    return signing.dumps(payload, key=ON_WAY_STUDY_DJANGO_SECRET_KEY, salt=_SALT)